@@ -1,18 +1,76 @@
 # api/api_server.py
-from fastapi import FastAPI, HTTPException, Query, Request, Path, Body
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query, Request, Path, Body, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Extra
 
-from batch import BatchPipeline
-from batch import PipelineManager
-from typing import List, Literal, Optional, Dict, Any
-import pandas as pd
+from typing import TYPE_CHECKING, List, Literal, Optional, Dict, Any
 import json
+import urllib.error
+from starlette.concurrency import run_in_threadpool
+from cluster import FORWARDED_HEADER
 from config import ConfigProvider, config_manager
 from config import ConfigManager
-from validation.gx_init import GXInitializer
+from monitoring import REGISTRY, CONTENT_TYPE, PROFILE_MODES
+from monitoring.startup_trace import STARTUP
+from utils.lazy import lazy_import
+
+# pandas / batch / GX are imported by the background bootstrap, not by the server
+pd = lazy_import("pandas")
+
+if TYPE_CHECKING:
+    from batch import BatchPipeline, PipelineManager
+    from validation.gx_init import GXInitializer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run `app.state.bootstrap(app)` (set by main.py) in the background once the server is up."""
+    app.state.loop = asyncio.get_running_loop()     # the asyncio MQTT transport runs on it
+    bootstrap = getattr(app.state, "bootstrap", None)
+    if bootstrap is not None:
+        threading.Thread(target=bootstrap, args=(app,), name="bootstrap", daemon=True).start()
+    yield
+    client = getattr(app.state, "mqtt_client", None)
+    if client is not None:
+        aclose = getattr(client, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        else:
+            client.stop()
+
+
+app = FastAPI(title="Data Ingestion API", lifespan=lifespan)
+app.state.manager = None
+app.state.gx = None
+
+
+def _manager_or_503(request: Request) -> "PipelineManager":
+    manager = request.app.state.manager
+    if manager is None:
+        raise HTTPException(status_code=503, detail="Service is starting up, pipelines are not ready yet")
+    return manager
+
+
+def _gx_or_503(request: Request) -> "GXInitializer":
+    gx = request.app.state.gx
+    if gx is None:
+        raise HTTPException(status_code=503, detail="Service is starting up, expectation suites are not ready yet")
+    return gx
 
 
-app = FastAPI(title="Data Ingestion API")
+@app.get("/ready",
+         summary="Readiness",
+         description="200 once expectation suites, MQTT and pipelines are up, 503 while starting. The body holds the startup trace.")
+async def get_ready():
+    report = STARTUP.report()
+    cluster = getattr(app.state, "cluster", None)
+    if cluster is not None:
+        report["cluster"] = {"worker": cluster.index, "workers": cluster.workers, "group": cluster.group}
+    return JSONResponse(content=report, status_code=200 if report["ready"] else 503)
 
 class LoosePayload(BaseModel):
     """
@@ -31,10 +89,21 @@ async def ingest_data_item(
     Receives POSTs to /ingest/{topic}, where:
       - `topic` is taken from the URL path (supports slashes via `{topic:path}`).
       - `payload` is any JSON object, with fields dynamically allowed.
-    Dispatches into the same BatchPipeline(s) as MQTT.
+    Dispatches into the same BatchPipeline(s) as MQTT.  In cluster mode a
+    payload owned by another worker is proxied to that worker's /ingest.
     """
-    manager = request.app.state.manager
-    ok = manager.dispatch(topic, payload.dict())
+    manager = _manager_or_503(request)
+    row = payload.dict()
+    owner = manager.owner_of(topic, row)
+    if owner is not None and FORWARDED_HEADER not in request.headers:
+        try:
+            answer = await run_in_threadpool(manager.cluster.forward_http, owner, topic, row)
+        except urllib.error.HTTPError as e:
+            raise HTTPException(status_code=e.code, detail=f"Worker {owner}: {e.read().decode('utf-8', 'replace')}")
+        except (urllib.error.URLError, OSError) as e:
+            raise HTTPException(status_code=502, detail=f"Worker {owner} unreachable: {e}")
+        return {**answer, "worker": owner}
+    ok = manager.dispatch(topic, row)
     if not ok:
         raise HTTPException(status_code=404, detail=f"No pipeline for topic '{topic}'")
     return {"status": "queued", "topic": topic}
@@ -52,9 +121,13 @@ async def ingest_data_batch(
         description="Array of records to process"
     ),
 ):
+    _gx_or_503(request)
+    from batch import process_sync
+    from batch.batch_validator import load_rules
 
     config_name = f"{config_id}_{topic}"
-    pipeline = BatchPipeline(topic, config_name, batch_size=1) # batch size of 1 for synchronous processing irrelevant
+    if load_rules(config_name, topic) is None:
+        raise HTTPException(status_code=404, detail=f"No validation config '{config_id}' for topic '{topic}'")
 
     # Convert your Pydantic models into plain dicts
     raw_dicts = [p.dict() for p in payloads]
@@ -63,7 +136,7 @@ async def ingest_data_batch(
     
 
     # Run your synchronous processing
-    cleaned_df = pipeline.process_sync(df)
+    cleaned_df = process_sync(topic, config_name, df)
     cleaned = json.loads(cleaned_df.to_json(orient="records"))
 
     return {
@@ -75,6 +148,89 @@ async def ingest_data_batch(
 
 
 
+@app.get("/metrics",
+         summary="Prometheus metrics",
+         description="Per-topic stage timings, queue depth/lag, throughput counters and MQTT publish backlog in Prometheus text format.")
+async def get_metrics():
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+
+def _pipeline_or_404(request: Request, topic: str) -> "BatchPipeline":
+    manager = _manager_or_503(request)
+    try:
+        return manager.get_pipeline(topic)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No pipeline for topic '{topic}'")
+
+
+@app.post("/admin/profiling/{topic}",
+          summary="Start profiling a pipeline",
+          description="Profile the next N batches of a topic with cProfile or a stack sampler, optionally with tracemalloc snapshots.")
+async def start_profiling(
+    request: Request,
+    topic: str = Path(..., description="Subscribed topic of the pipeline, e.g. air-quality"),
+    batches: int = Query(10, ge=1, le=10_000, description="Number of batches to profile"),
+    mode: Literal["cprofile", "sampling"] = Query("cprofile", description=f"One of {PROFILE_MODES}"),
+    interval_ms: float = Query(5.0, gt=0, description="Sampling interval (mode=sampling)"),
+    memory: bool = Query(False, description="Take tracemalloc snapshots for memory growth"),
+):
+    pipeline = _pipeline_or_404(request, topic)
+    try:
+        session = pipeline.start_profiling(batches, mode=mode, interval=interval_ms / 1000.0, memory=memory)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return session.status()
+
+
+@app.get("/admin/profiling/{topic}", summary="Profiling status of a pipeline")
+async def get_profiling_status(request: Request, topic: str = Path(...)):
+    pipeline = _pipeline_or_404(request, topic)
+    if pipeline.profile_session is None:
+        raise HTTPException(status_code=404, detail=f"No profiling session for topic '{topic}'")
+    return pipeline.profile_session.status()
+
+
+@app.delete("/admin/profiling/{topic}", summary="Cancel a running profiling session")
+async def cancel_profiling(request: Request, topic: str = Path(...)):
+    pipeline = _pipeline_or_404(request, topic)
+    if pipeline.profile_session is None:
+        raise HTTPException(status_code=404, detail=f"No profiling session for topic '{topic}'")
+    pipeline.profile_session.cancel()
+    return pipeline.profile_session.status()
+
+
+@app.get("/admin/profiling/{topic}/result",
+         summary="Download profiling results",
+         description="format=pstats (binary, for pstats/snakeviz), pstats_text, collapsed (flamegraph stacks) or memory (tracemalloc growth).")
+async def download_profiling_result(
+    request: Request,
+    topic: str = Path(...),
+    format: Literal["pstats", "pstats_text", "collapsed", "memory"] = Query("pstats"),
+):
+    pipeline = _pipeline_or_404(request, topic)
+    session = pipeline.profile_session
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"No profiling session for topic '{topic}'")
+    safe_topic = topic.strip("/").replace("/", "_")
+    try:
+        if format == "pstats":
+            content, media_type, filename = session.pstats_bytes(), "application/octet-stream", f"{safe_topic}.pstats"
+        elif format == "pstats_text":
+            content, media_type, filename = session.pstats_text(), "text/plain", f"{safe_topic}.pstats.txt"
+        elif format == "collapsed":
+            content, media_type, filename = session.collapsed_stacks(), "text/plain", f"{safe_topic}.collapsed"
+        else:
+            content, media_type, filename = session.memory_report(), "text/plain", f"{safe_topic}.tracemalloc.txt"
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return Response(content=content, media_type=media_type,
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+
 @app.get("/configs/{cfg_type}", 
          summary="List configurations",
         description="Retrieve configurations filtered by kind. Use pagination via limit/offset.")
@@ -129,17 +285,24 @@ async def ingest_config(
         raise HTTPException(status_code=500, detail=f"Failed to write config: {e}")
     
 
-    # reload gx and pipelines
+    # reload gx and pipelines (built off the event loop; ingestion continues meanwhile)
     try:
         provider = ConfigProvider()
 
         if cfg_type == "mqtt":
-            request.app.state.manager.reload_from_provider(provider)
+            await run_in_threadpool(_manager_or_503(request).reload_from_provider, provider)
+            # parallel validation is compiled into the suites
+            if await run_in_threadpool(_gx_or_503(request).refresh_parallel):
+                await run_in_threadpool(_manager_or_503(request).refresh_validation)
         elif cfg_type == "validation":
-            gx_initializer: GXInitializer =  request.app.state.gx
-            gx_initializer.reload_gx()
+            gx_initializer: GXInitializer = _gx_or_503(request)
+            await run_in_threadpool(gx_initializer.reload_gx)
+            # pipelines read their rules once; rebuild the ones whose rules changed
+            await run_in_threadpool(_manager_or_503(request).refresh_validation)
         else:
             raise HTTPException(status_code=400, detail="Invalid configuration type. Use 'mqtt' or 'validation'.")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reload configurations: {e}")
     
@@ -167,9 +330,11 @@ async def delete_config(
         # keep this explicit for now; you can enable later if desired
         raise HTTPException(status_code=400, detail="MQTT config deletion is disabled via this endpoint.")
 
+    pipelines = _manager_or_503(request).pipelines
+    gx = _gx_or_503(request)
     manager = ConfigManager(base_path="config")
     try:
-        removed_paths = manager.delete("validation", cfg_id, missing_ok=False, pipelines = request.app.state.manager.pipelines)
+        removed_paths = manager.delete("validation", cfg_id, missing_ok=False, pipelines = pipelines)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
@@ -179,10 +344,8 @@ async def delete_config(
 
     # reload GX after modification to validation states
     try:
-        gx = request.app.state.gx
-        gx.reload_gx()
-    except AttributeError:
-        raise HTTPException(status_code=500, detail="GX initializer missing on app.state (app.state.gx).")
+        await run_in_threadpool(gx.reload_gx)
+        await run_in_threadpool(_manager_or_503(request).refresh_validation)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reload GX after deletion: {e}")
 
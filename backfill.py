@@ -0,0 +1,347 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+#!/usr/bin/env python3
+"""backfill.py
+
+Re‑clean a (large) history file with a validation config, offline: the
+same `BatchValidator` and `CorrectionEngine` the service runs, without
+MQTT, in chunks across a pool of worker processes.
+
+    python3 backfill.py history.ndjson --topic air-quality \\
+        --config-id 8b550c05-8cfa-4c5c-8842-1ecfc1ce8798 --out backfill/ --workers 4
+
+Input is a JSON array, NDJSON, CSV or Parquet file (by extension, or
+`--format`); it is streamed, never loaded whole.  Every chunk is validated
+together with `--overlap` rows of its neighbours on either side, so
+corrections that look at neighbouring rows (`SmoothingOutliers` uses
+three each way) see the same values as in one long run; only the chunk's
+own rows are written.  A topic's `"flatten"` setting from the MQTT config
+is applied as on ingest.  Streaming aggregate rules start a fresh window
+per chunk.
+
+The output directory holds
+
+    cleaned/part-<chunk>.<ext>   cleaned rows, in input order across parts
+    report/part-<chunk>.ndjson   one line per alarm (`"kind": "alarm"`) and
+                                 per corrected cell (`"kind": "correction"`,
+                                 with the value before and after), with the
+                                 row's position in the input
+    checkpoint.json              finished chunks and their counts
+    summary.json                 totals once every chunk is done
+
+An interrupted run started again with the same arguments skips the
+chunks in `checkpoint.json`; `--restart` discards them and their parts
+(other files in `--out` are left alone).  Progress (rows, rows/s) goes
+to stderr.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from batch.flattening import from_config as flattening_from_config
+from loadtest.sources import iter_records
+
+FORMATS = ("json", "ndjson", "csv", "parquet")
+DEFAULT_OVERLAP = 3          # neighbours SmoothingOutliers looks at on either side
+_EXTENSIONS = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv",
+               ".parquet": "parquet", ".pq": "parquet"}
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Validate and correct a history file offline.")
+    p.add_argument("input", help="JSON array, NDJSON, CSV or Parquet file")
+    p.add_argument("--topic", required=True, help="Topic whose rules apply (key in the validation config)")
+    p.add_argument("--config-id", required=True, help="Validation config id (file stem in config/validations)")
+    p.add_argument("--out", required=True, help="Output directory (created if missing)")
+    p.add_argument("--format", choices=FORMATS, help="Input format (default: from the extension)")
+    p.add_argument("--output-format", choices=("ndjson", "csv", "parquet"),
+                   help="Format of the cleaned parts (default: the input's; JSON becomes NDJSON)")
+    p.add_argument("--workers", "-n", type=int, default=os.cpu_count() or 1,
+                   help="Worker processes (default: CPU count)")
+    p.add_argument("--chunk-size", type=int, default=10_000, help="Rows per chunk (default 10000)")
+    p.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP,
+                   help=f"Neighbour rows validated with each chunk on either side (default {DEFAULT_OVERLAP})")
+    p.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    return p.parse_args(argv)
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+def detect_format(path: str | Path) -> str:
+    fmt = _EXTENSIONS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Cannot tell the format of '{path}'; pass --format")
+    return fmt
+
+
+def read_chunks(path: str | Path, fmt: str, chunk_size: int, flatten: Any = None) -> Iterator[pd.DataFrame]:
+    """DataFrames of `chunk_size` rows (the last one shorter), streamed from `path`."""
+    if fmt in ("json", "ndjson"):
+        flattener = flattening_from_config(flatten)
+        rows: List[dict] = []
+        for record in iter_records(path, fmt):
+            if flattener is None:
+                rows.append(record)
+            else:
+                rows.extend(flattener(record))
+            while len(rows) >= chunk_size:
+                yield pd.DataFrame(rows[:chunk_size])
+                rows = rows[chunk_size:]
+        if rows:
+            yield pd.DataFrame(rows)
+        return
+
+    if fmt == "csv":
+        frames: Iterator[pd.DataFrame] = pd.read_csv(path, chunksize=chunk_size)
+    else:
+        import pyarrow.parquet as pq
+        frames = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size))
+    # parquet batches end at row group boundaries: cut into exact chunks again
+    pending: Optional[pd.DataFrame] = None
+    for frame in frames:
+        pending = frame if pending is None else pd.concat([pending, frame], ignore_index=True)
+        while len(pending) >= chunk_size:
+            yield pending.iloc[:chunk_size].reset_index(drop=True)
+            pending = pending.iloc[chunk_size:]
+    if pending is not None and len(pending):
+        yield pending.reset_index(drop=True)
+
+
+def with_neighbours(chunks: Iterator[pd.DataFrame], overlap: int
+                    ) -> Iterator[Tuple[int, int, pd.DataFrame, pd.DataFrame, pd.DataFrame]]:
+    """(chunk number, first row, rows before, chunk, rows after) for every chunk."""
+    empty = pd.DataFrame()
+    previous: Optional[pd.DataFrame] = None
+    before, start, number = empty, 0, 0
+    for chunk in chunks:
+        if previous is not None:
+            yield number, start, before, previous, chunk.iloc[:overlap]
+            before = previous.iloc[len(previous) - overlap:] if overlap else empty
+            start += len(previous)
+            number += 1
+        previous = chunk
+    if previous is not None:
+        yield number, start, before, previous, empty
+
+
+# ---------------------------------------------------------------------------
+# Cleaning (runs in the workers)
+# ---------------------------------------------------------------------------
+def clean_chunk(validator, engine, start: int, before: pd.DataFrame, core: pd.DataFrame,
+                after: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Validate and correct `core` with its neighbours; returns the cleaned rows of
+    `core` and its report lines (row numbers relative to the input)."""
+    frame = pd.concat([before, core, after], ignore_index=True)
+    lo, hi = len(before), len(before) + len(core)
+    results = validator(frame)
+    cleaned, alarms, _corrected = engine.run(results, frame)
+
+    report: List[Dict[str, Any]] = []
+    for res in alarms:
+        config = res["expectation_config"]
+        meta = config.get("meta") if hasattr(config, "get") else getattr(config, "meta", None)
+        for index in res["result"].get("unexpected_index_list", []):
+            if lo <= index < hi:
+                report.append({"kind": "alarm", "row": start + index - lo, "column": config["kwargs"].get("column"),
+                               "rule": config["type"], "rule_id": (meta or {}).get("rule_id")})
+
+    raw, out = frame.iloc[lo:hi], cleaned.iloc[lo:hi]
+    for column in out.columns:
+        if column not in raw.columns:
+            continue
+        before_values, after_values = raw[column], out[column]
+        changed = ~((before_values == after_values) | (before_values.isna() & after_values.isna()))
+        for index in changed[changed].index:
+            report.append({"kind": "correction", "row": start + index - lo, "column": column,
+                           "before": _plain(before_values[index]), "after": _plain(after_values[index])})
+    report.sort(key=lambda line: line["row"])
+    return out.reset_index(drop=True), report
+
+
+def _plain(value: Any) -> Any:
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(config_id: str, topic: str, gx_parent: str) -> None:
+    from great_expectations.data_context.types.base import ProgressBarsConfig
+
+    from data_correction import CorrectionEngine, DataCorrection
+    from batch.batch_validator import BatchValidator
+    from validation.gx_init import GXInitializer
+
+    config_name = f"{config_id}_{topic}"
+    _worker["gx"] = GXInitializer(tempfile.mkdtemp(dir=gx_parent))
+    # GX metric progress bars would interleave with ours
+    _worker["gx"].context.variables.progress_bars = ProgressBarsConfig(globally=False)
+    _worker["validator"] = BatchValidator(config_name, topic)
+    _worker["engine"] = CorrectionEngine(topic, config_name, DataCorrection())
+    _worker["topic"] = topic
+
+
+def _process_chunk(number: int, start: int, before: pd.DataFrame, core: pd.DataFrame,
+                   after: pd.DataFrame, out: str, output_format: str) -> Dict[str, Any]:
+    from validation.streaming_aggregates import StreamingSuite
+
+    validator = _worker["validator"]
+    validator.streaming = StreamingSuite(validator.rules, _worker["topic"])   # fresh windows per chunk
+    cleaned, report = clean_chunk(validator, _worker["engine"], start, before, core, after)
+
+    name = f"part-{number:05d}"
+    _write_atomic(Path(out) / "cleaned" / f"{name}.{output_format}",
+                  lambda path: _write_frame(cleaned, path, output_format))
+    _write_atomic(Path(out) / "report" / f"{name}.ndjson",
+                  lambda path: path.write_text("".join(json.dumps(line, default=str) + "\n" for line in report)))
+    return {"rows": len(cleaned),
+            "alarms": sum(1 for line in report if line["kind"] == "alarm"),
+            "corrections": sum(1 for line in report if line["kind"] == "correction")}
+
+
+def _write_frame(df: pd.DataFrame, path: Path, fmt: str) -> None:
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_json(path, orient="records", lines=True, date_format="iso")
+
+
+def _write_atomic(path: Path, write) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint
+# ---------------------------------------------------------------------------
+class Checkpoint:
+    """Finished chunks of one run, rewritten after every chunk."""
+
+    def __init__(self, path: Path, run: Dict[str, Any], restart: bool = False) -> None:
+        self.path = path
+        self.run = run
+        self.done: Dict[int, Dict[str, Any]] = {}
+        if path.exists() and not restart:
+            saved = json.loads(path.read_text())
+            if saved.get("run") != run:
+                raise SystemExit(f"✖ {path} belongs to a run with other arguments; use --restart")
+            self.done = {int(k): v for k, v in saved.get("done", {}).items()}
+
+    def mark(self, number: int, stats: Dict[str, Any]) -> None:
+        self.done[number] = stats
+        _write_atomic(self.path, lambda tmp: tmp.write_text(json.dumps(
+            {"run": self.run, "done": {str(k): v for k, v in sorted(self.done.items())}}, indent=1)))
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def _progress(rows: int, skipped: int, chunks: int, started: float) -> None:
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    sys.stderr.write(f"\r⏳ {rows:,} rows in {chunks} chunk(s), {rows / elapsed:,.0f} rows/s"
+                     f"{f', {skipped} chunk(s) from checkpoint' if skipped else ''}   ")
+    sys.stderr.flush()
+
+
+def _discard(out: Path) -> None:
+    """Remove what an earlier run wrote to `out` (its parts, checkpoint and summary);
+    anything else in the directory stays."""
+    for name in ("checkpoint.json", "summary.json"):
+        (out / name).unlink(missing_ok=True)
+    for sub in ("cleaned", "report"):
+        for part in (out / sub).glob("part-*"):
+            part.unlink()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    fmt = args.format or detect_format(args.input)
+    output_format = args.output_format or ("ndjson" if fmt == "json" else fmt)
+    out = Path(args.out)
+    if args.restart:
+        _discard(out)
+    (out / "cleaned").mkdir(parents=True, exist_ok=True)
+    (out / "report").mkdir(parents=True, exist_ok=True)
+
+    from config import ConfigProvider
+    provider = ConfigProvider()
+    if args.topic not in provider.validation().get(args.config_id, {}):
+        print(f"✖ No rules for topic '{args.topic}' in validation config '{args.config_id}'")
+        return 2
+    flatten = next((cfg.get("flatten") for cfg in provider.mqtt().get("topics", {}).values()
+                    if cfg.get("validation_config") == f"{args.config_id}_{args.topic}"), None)
+
+    run = {"input": str(Path(args.input).resolve()), "topic": args.topic, "config_id": args.config_id,
+           "chunk_size": args.chunk_size, "overlap": args.overlap, "output_format": output_format}
+    checkpoint = Checkpoint(out / "checkpoint.json", run, restart=args.restart)
+
+    gx_parent = tempfile.mkdtemp(prefix="ds2-backfill-")
+    workers = max(1, args.workers)
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(args.config_id, args.topic, gx_parent))
+    started = time.perf_counter()
+    rows = chunks = skipped = 0
+    pending = {}
+    try:
+        for number, start, before, core, after in with_neighbours(
+                read_chunks(args.input, fmt, args.chunk_size, flatten), args.overlap):
+            if number in checkpoint.done:
+                skipped += 1
+                continue
+            # bounded: at most two chunks per worker are read ahead
+            while len(pending) >= 2 * workers:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stats = future.result()
+                    checkpoint.mark(pending.pop(future), stats)
+                    rows, chunks = rows + stats["rows"], chunks + 1
+                _progress(rows, skipped, chunks, started)
+            future = pool.submit(_process_chunk, number, start, before, core, after, str(out), output_format)
+            pending[future] = number
+        for future in list(pending):
+            stats = future.result()
+            checkpoint.mark(pending.pop(future), stats)
+            rows, chunks = rows + stats["rows"], chunks + 1
+            _progress(rows, skipped, chunks, started)
+    except KeyboardInterrupt:
+        print("\n✖ Interrupted; run again with the same arguments to resume")
+        pool.shutdown(wait=False, cancel_futures=True)
+        return 130
+    finally:
+        pool.shutdown(wait=True)
+        shutil.rmtree(gx_parent, ignore_errors=True)
+    sys.stderr.write("\n")
+
+    totals = {key: sum(stats[key] for stats in checkpoint.done.values()) for key in ("rows", "alarms", "corrections")}
+    summary = {**run, **totals, "chunks": len(checkpoint.done),
+               "seconds": round(time.perf_counter() - started, 3)}
+    (out / "summary.json").write_text(json.dumps(summary, indent=1))
+    print(f"✅ {totals['rows']:,} rows, {totals['corrections']:,} corrected cell(s), "
+          f"{totals['alarms']:,} alarm(s) → {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
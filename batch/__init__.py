@@ -4,5 +4,6 @@
 # batch/__init__.py
 
 from .data_queue import DataQueue
-from .batch_pipeline import BatchPipeline
+from .scheduler import BatchScheduler, TopicLane
+from .batch_pipeline import BatchPipeline, process_sync
 from .pipeline_manager import PipelineManager
\ No newline at end of file
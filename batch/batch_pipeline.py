@@ -2,62 +2,281 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # batch_pipeline.py
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable
 
 from data_correction import DataCorrection, CorrectionEngine
 from .data_queue import DataQueue
+from .wal import WriteAheadLog
+from .dedupe import from_config as dedupe_from_config
+from .projection import from_config as projection_from_config
+from .flattening import from_config as flattening_from_config
+from .overload import from_config as overload_from_config
+from .batch_sizer import from_config as batch_sizer_from_config
+from .scheduler import BatchScheduler
 from .batch_validator import BatchValidator
+from .warmup import synthetic_batch
 from mqtt import AlarmPublisher, ResultPublisher
 from config import ConfigProvider
+from monitoring import PipelineMetrics, ProfileSession
+from validation.gx_validation import validate_batch
+from validation.streaming_aggregates import StreamingSuite
+from monitoring.log import get_logger, hot_path
+from sinks import ParquetArchiveSink
 import pandas as pd
 
+log = get_logger(__name__)
+_ADDED = hot_path("pipeline.add", __name__)
+
 class BatchPipeline:
     """Glue DataQueue → BatchValidator → ResultHandler."""
 
     _default_publish: Callable[[str, dict], None] | None = None   # class‑level
+    _offload: bool = False
+    _scheduler: BatchScheduler | None = None
 
     @classmethod
     def set_default_publisher(cls, fn: Callable[[str, dict], None]) -> None:
         """Register a process‑wide publish‑callable (e.g. MqttPublisher.publish)."""
         cls._default_publish = fn
 
+    @classmethod
+    def set_offload(cls, enabled: bool) -> None:
+        """Process full batches on a per‑pipeline worker thread instead of the adding thread
+        (needed when rows arrive on the event loop)."""
+        cls._offload = enabled
+
+    @classmethod
+    def set_scheduler(cls, scheduler: BatchScheduler | None) -> None:
+        """Run full batches of all topics on a shared `BatchScheduler` (weights,
+        priorities and latency SLOs from each topic's `"schedule"` setting)."""
+        cls._scheduler = scheduler
+
 
-    def __init__(self, topic:str,  config_name: str, batch_size: int):
-        self.validator = BatchValidator(config_name)
-        self.queue = DataQueue(batch_size, self._process)
+    def __init__(self, topic:str,  config_name: str, batch_size: int | str | dict, durable=None, archive=None, dedupe=None,
+                 projection=None, overload=None, schedule=None, flatten=None,
+                 predecessor: "BatchPipeline | None" = None):
+        """`predecessor` is the running pipeline of the same topic this one will replace
+        (see `take_over`): its write‑ahead log, worker thread, dedupe window,
+        streaming windows and batch sizer are carried over where the new settings allow it.
+        `batch_size` is a number of rows, or `"auto"`/a dict of bounds (see `batch_sizer`)."""
+        self.topic = topic
+        self.validator = BatchValidator(config_name, topic)
+        if (predecessor is not None and predecessor.validator.config_name == config_name
+                and predecessor.validator.rules == self.validator.rules):
+            self.validator.streaming = predecessor.validator.streaming
+        # one worker per pipeline: batches of a topic stay in order (also across a replacement)
+        self._executor = None
+        if BatchPipeline._scheduler is not None:
+            self._executor = BatchPipeline._scheduler.lane(topic, schedule)
+        elif BatchPipeline._offload:
+            self._executor = (predecessor._executor if predecessor is not None and predecessor._executor
+                              else ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"batch-{topic}"))
+        inherited = predecessor.queue.wal if predecessor is not None else None
+        wal = WriteAheadLog.from_config(topic, durable, reuse=inherited)
+        self._batch_size_config = batch_size
+        if (predecessor is not None and predecessor._sizer is not None
+                and predecessor._batch_size_config == batch_size):
+            self._sizer = predecessor._sizer
+            size = self._sizer.size
+        else:
+            size, self._sizer = batch_sizer_from_config(batch_size, topic)
+        self.queue = DataQueue(size, self._process, wal=wal, executor=self._executor, sizer=self._sizer)
         self.correction_engine = CorrectionEngine(topic, config_name, DataCorrection())
+        self.metrics = PipelineMetrics(topic)
+        self.profile_session: ProfileSession | None = None
+        self._successor: BatchPipeline | None = None
         publish = BatchPipeline._default_publish
         cfg_provider = ConfigProvider()
+        self._dedupe = None
+        self._dedupe_config = dedupe
+        if dedupe:
+            if predecessor is not None and predecessor._dedupe is not None and predecessor._dedupe_config == dedupe:
+                self._dedupe = predecessor._dedupe
+            else:
+                topic_cfg = cfg_provider.mqtt()['topics'].get(topic, {})
+                self._dedupe = dedupe_from_config(dedupe, topic_cfg.get("timestamp_attribute"))
+            self.metrics.track_dedupe(lambda: len(self._dedupe))
+        # nested payloads → flat rows, before dedupe and projection see them
+        self._flatten = flattening_from_config(flatten)
+        self._project = None
+        if projection:
+            # the rules the validator checks: a validation reload that changes them
+            # rebuilds the pipeline (`PipelineManager.refresh_validation`), projection included
+            topic_cfg = cfg_provider.mqtt()['topics'].get(topic, {})
+            self._project = projection_from_config(projection, topic_cfg, self.validator.rules)
+        # degraded validation modes while the topic cannot keep up
+        self._overload = overload_from_config(overload, topic, self.validator.rules)
         if publish:
             self._alarms  = AlarmPublisher(cfg_provider.mqtt()['topics'][topic], publish)
             self._results = ResultPublisher(cfg_provider.mqtt()['topics'][topic], publish)
+        self._archive: ParquetArchiveSink | None = None
+        if archive:
+            topic_cfg = cfg_provider.mqtt()['topics'].get(topic, {})
+            self._archive = ParquetArchiveSink.from_config(topic, {**topic_cfg, "archive": archive})
+
+        # rows a previous run accepted but never published (an inherited log is still live)
+        replayed = self.queue.replay() if wal is not inherited else 0
+        if replayed:
+            log.info("↻ Replayed %d row(s) from the write-ahead log for topic '%s'", replayed, topic)
 
 
     
 
  
     def add(self, row: dict) -> None:
+        self.metrics.messages_in.inc()
+        if self._flatten is not None:
+            for flat in self._flatten(row):
+                self._add(flat)
+            return
+        self._add(row)
+
+    def _add(self, row: dict) -> None:
+        if self._dedupe is not None and self._dedupe.seen(row):
+            self.metrics.duplicates_dropped.inc()
+            return
+        if self._project is not None:
+            row = self._project(row)
         self.queue.add(row)
-        print(f"Added row to queue for topic '{self.validator.config_name}': {row}")
+        _ADDED("Added row to queue", topic=self.topic, row=row)
+
+    def take_over(self, predecessor: "BatchPipeline",
+                  on_swapped: Callable[[], None] | None = None) -> int:
+        """Replace `predecessor`: its buffered rows move to this pipeline's queue and rows
+        still added to it are forwarded here.  `on_swapped` publishes this pipeline to
+        the producers while both queues are held still.  Returns the rows handed over;
+        `predecessor.close()` then finishes its in‑flight batches."""
+        predecessor._successor = self
+        moved, held = predecessor.queue.hand_over(self.queue, on_swapped)
+        self.metrics.swap_pause.observe(held)
+        log.info("🔄 Pipeline of topic '%s' replaced: %d buffered row(s) handed over, producers held %.3f ms",
+                 self.topic, moved, held * 1000.0)
+        return moved
+
+    def close(self, drain: bool = False) -> None:
+        """Release resources held by the queue (the write-ahead log keeps its files) and the archive.
+        With `drain` the buffered rows are processed first instead of being left to the log."""
+        if drain:
+            self.queue.drain()
+        if self._executor is not None:
+            successor = self._successor
+            if successor is not None and successor._executor is self._executor:
+                # the worker moved on with the successor: wait for the batches queued before now
+                self._executor.submit(int).result()
+            else:
+                self._executor.shutdown(wait=True)   # finish batches already handed over
+        self.queue.close()
+        if self._archive is not None:
+            self._archive.close()
+
+    # ------------------------------------------------------------------ #
+    #  on-demand profiling
+    # ------------------------------------------------------------------ #
+    def start_profiling(self, batches: int, mode: str = "cprofile",
+                        interval: float = 0.005, memory: bool = False) -> ProfileSession:
+        """Profile the next `batches` batches. The queue calls `_process` directly again afterwards."""
+        current = self.profile_session
+        if current is not None and current.state == "running":
+            raise RuntimeError(f"Profiling already running for topic '{self.topic}'")
+        session = ProfileSession(self.topic, batches, mode=mode, interval=interval,
+                                 memory=memory, on_finish=self._restore_callback)
+        self.profile_session = session
+        self.queue.set_on_batch_ready(session.wrap(self._process))
+        return session
+
+    def _restore_callback(self, _session: ProfileSession) -> None:
+        self.queue.set_on_batch_ready(self._process)
 
     # internal callback
     def _process(self, df: pd.DataFrame) -> None:
         '""Process a DataFrame asynchronously. After a DataQueue batch is ready."""'
-        validation_results = self.validator(df)
-        cleaned_df, alarm_events = self.correction_engine.run(validation_results, df)
+        metrics = self.metrics
+
+        t0 = time.perf_counter()
+        overload = self._overload
+        if overload is None:
+            validation_results, degraded = self.validator(df), None
+        else:
+            validation_results, degraded = overload.validate(df, self.validator)
+        t1 = time.perf_counter()
+        # corrections stay patches over `df`; nothing downstream writes to either
+        cleaned, alarm_events, corrected_rows = self.correction_engine.overlay(validation_results, df)
+        t2 = time.perf_counter()
 
         # --- alarms first ------------------------------------------------- #
+        alarms = 0
         for alarm in alarm_events:
-            self._alarms.emit(cleaned_df, alarm)
+            alarms += self._alarms.emit(cleaned, alarm)
+        t3 = time.perf_counter()
 
         # --- publish cleaned rows ---------------------------------------- #
-        self._results.emit(cleaned_df, df)
+        self._results.emit(cleaned, df, degraded)
+        if self._archive is not None:
+            self._archive.emit(cleaned.to_frame(), df, alarm_events)
+        t4 = time.perf_counter()
+
+        metrics.validate.observe(t1 - t0)
+        metrics.correct.observe(t2 - t1)
+        metrics.alarm_emit.observe(t3 - t2)
+        metrics.result_emit.observe(t4 - t3)
+        metrics.batches_processed.inc()
+        metrics.rows_corrected.inc(len(corrected_rows))
+        metrics.alarms_emitted.inc(alarms)
+        if overload is not None:
+            # the batch itself is still counted by the queue
+            overload.observe(self.queue.backlog() - len(df.index), t4 - t0)
+        if self._sizer is not None:
+            self._sizer.processed(len(df.index), t4 - t0)
+
+
+    def warm_up(self, batches: int) -> tuple[float, float | None] | None:
+        """Run `batches` synthetic batches (see `batch.warmup`) through validation, correction
+        and serialization, publishing nowhere.  Returns the first batch's latency and the
+        median of the others, or None if warm-up is off or failed (the pipeline still runs)."""
+        if batches <= 0:
+            return None
+        topic_cfg = ConfigProvider().mqtt()['topics'].get(self.topic, {})
+        rules = self.validator.rules
+        serialize = lambda _topic, obj: json.dumps(obj)
+        latencies = []
+        try:
+            df = synthetic_batch(topic_cfg, rules, self.queue.batch_size)
+            alarms = AlarmPublisher(topic_cfg, serialize)
+            results = ResultPublisher(topic_cfg, serialize)
+            for _ in range(batches):
+                t0 = time.perf_counter()
+                # a throwaway window: synthetic rows must not count towards streaming rules
+                validation_results = StreamingSuite(rules, self.topic).merge(
+                    validate_batch(df, self.validator.config_name), df)
+                cleaned, alarm_events, _ = self.correction_engine.overlay(validation_results, df)
+                for alarm in alarm_events:
+                    alarms.emit(cleaned, alarm)
+                results.emit(cleaned, df)
+                latencies.append(time.perf_counter() - t0)
+        except Exception as e:
+            log.warning("⚠️  Warm-up of topic '%s' failed, its first batch will be slow: %s", self.topic, e)
+            return None
 
+        first = latencies[0]
+        steady = statistics.median(latencies[1:]) if len(latencies) > 1 else None
+        self.metrics.warmup_first.set(first)
+        if steady is not None:
+            self.metrics.warmup_steady.set(steady)
+            log.info("✅ Warmed up topic '%s' with %d-row batches: first %.1f ms, steady state %.1f ms (%.1fx)",
+                     self.topic, len(df.index), first * 1000.0, steady * 1000.0, first / steady if steady else 0.0)
+        else:
+            log.info("✅ Warmed up topic '%s' with a %d-row batch in %.1f ms", self.topic, len(df.index), first * 1000.0)
+        return first, steady
 
-    def process_sync(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Process a DataFrame synchronously. When a HTTP request comes in, we can use this to process the data immediately."""
-        validation_results = self.validator(df)
-        cleaned_df, alarm_events = self.correction_engine.run(validation_results, df)
-        # Note: alarms and publishing are skipped here for sync processing
-        return cleaned_df
 
+def process_sync(topic: str, config_name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Validate and correct one request's rows (`/ingest/{topic}/sync`) without a pipeline:
+    nothing is queued, scheduled, counted or published, so the live pipeline of `topic`
+    (its scheduler lane, batch size and metrics) is left alone."""
+    validation_results = BatchValidator(config_name, topic)(df)
+    cleaned_df, _alarm_events, _ = CorrectionEngine(topic, config_name, DataCorrection()).run(validation_results, df)
+    return cleaned_df
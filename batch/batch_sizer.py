@@ -0,0 +1,151 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Adaptive batch sizing
+=====================
+
+A fixed `batch_size` is either too small at peak rates (the fixed cost
+of a validation run is paid for a handful of rows and the topic falls
+behind) or too large at night (the first row of a batch waits minutes for
+the last).  With `"batch_size": "auto"` – or a dict with bounds – the
+topic's size is chosen again after every batch from two estimates:
+
+    rate  λ   rows/s, from the time between the last batches being sealed
+    cost  T(n) = a + b·n   seconds to process n rows, fitted by an
+              exponentially weighted least‑squares line through the
+              (size, processing time) of recent batches
+
+The first row of a batch waits for the other n − 1 and then for the
+batch to be processed, so the largest size that meets the target is
+
+    (n − 1)/λ + a + b·n  ≤  target_latency_s
+
+Larger batches amortise `a` better, so that size is taken – unless the
+topic could not keep up with it (n / T(n) < λ), in which case the
+smallest size that keeps up (with `headroom`) wins: falling behind costs
+more latency than a bigger batch.  Sizes stay within [min, max] and move
+by at most a factor `max_step` per batch.
+
+    "batch_size": {"min": 5, "max": 500, "target_latency_s": 1.0}
+
+The size a topic's queue collects is exported as `ds2_batch_size_rows`
+(by the pipeline, see `PipelineManager`).
+"""
+from __future__ import annotations
+
+import math
+import threading
+from typing import Any, Optional, Tuple
+
+from monitoring.log import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+
+
+class AdaptiveBatchSizer:
+    """Picks a topic's next batch size from its arrival rate and processing cost."""
+
+    def __init__(self, topic: str, initial: int = DEFAULT_BATCH_SIZE, min_size: int = 1,
+                 max_size: int = 1000, target_latency_s: float = 1.0, headroom: float = 1.25,
+                 max_step: float = 2.0, smoothing: float = 0.2) -> None:
+        if not 1 <= min_size <= max_size:
+            raise ValueError(f"Invalid batch size bounds [{min_size}, {max_size}] for topic '{topic}'")
+        self.topic = topic
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_latency_s = target_latency_s
+        self.headroom = headroom
+        self.max_step = max_step
+        self._alpha = smoothing
+        self.size = min(max(initial, min_size), max_size)
+        self.rate: Optional[float] = None          # rows/s
+        # weighted moments of (n, T) for the cost line
+        self._n = self._t = self._nn = self._nt = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    #  observations
+    # ------------------------------------------------------------------ #
+    def sealed(self, rows: int, seconds: float) -> int:
+        """A batch of `rows` was sealed `seconds` after the previous one; returns the
+        size of the next batch.
+
+        Seal to seal, not first row to seal: while a batch is processed on the
+        receiving thread, new rows wait in the client and reach the buffer in a
+        burst, so the buffer alone would see a rate far above the real one."""
+        if rows > 0 and seconds > 0:
+            sample = rows / seconds
+            with self._lock:
+                self.rate = sample if self.rate is None else self.rate + self._alpha * (sample - self.rate)
+                self._resize()
+        return self.size
+
+    def processed(self, rows: int, seconds: float) -> None:
+        """A batch of `rows` took `seconds` to validate, correct and publish."""
+        a = self._alpha
+        with self._lock:
+            if self._n is None:
+                self._n, self._t, self._nn, self._nt = rows, seconds, rows * rows, rows * seconds
+                return
+            self._n += a * (rows - self._n)
+            self._t += a * (seconds - self._t)
+            self._nn += a * (rows * rows - self._nn)
+            self._nt += a * (rows * seconds - self._nt)
+
+    def cost(self) -> Optional[Tuple[float, float]]:
+        """(a, b) of T(n) = a + b·n, or None before the first batch."""
+        if self._n is None:
+            return None
+        var = self._nn - self._n * self._n
+        if var > 1.0:
+            b = max(0.0, (self._nt - self._n * self._t) / var)
+        else:
+            # all recent batches had the same size: split the cost evenly
+            b = self._t / (2.0 * self._n)
+        a = max(0.0, self._t - b * self._n)
+        return a, b
+
+    # ------------------------------------------------------------------ #
+    #  decision (lock held)
+    # ------------------------------------------------------------------ #
+    def _resize(self) -> None:
+        model = self.cost()
+        if model is None or not self.rate:
+            return
+        a, b = model
+        wait = 1.0 / self.rate                      # seconds between rows
+        fits = math.floor((self.target_latency_s - a + wait) / (wait + b))
+        if b * self.rate < 1.0:
+            keeps_up = math.ceil(self.headroom * a * self.rate / (1.0 - b * self.rate))
+        else:
+            keeps_up = self.max_size                # per-row cost alone exceeds the rate
+        wanted = max(fits, keeps_up)
+        lower = max(self.min_size, math.floor(self.size / self.max_step))
+        upper = min(self.max_size, math.ceil(self.size * self.max_step))
+        size = min(max(wanted, lower), upper)
+        if size != self.size:
+            log.debug("Batch size of topic '%s': %d → %d (%.1f rows/s, T(n)=%.4f+%.5f·n)",
+                      self.topic, self.size, size, self.rate, a, b)
+            self.size = size
+
+
+def from_config(batch_size: Any, topic: str) -> Tuple[int, Optional[AdaptiveBatchSizer]]:
+    """(initial size, sizer or None) from a topic's `"batch_size"` setting:
+    a number, `"auto"`, or `{"min": …, "max": …, "target_latency_s": …}`."""
+    if isinstance(batch_size, dict):
+        opts = batch_size
+    elif batch_size == "auto":
+        opts = {}
+    else:
+        return int(batch_size), None
+    min_size = int(opts.get("min", 1))
+    max_size = int(opts.get("max", 1000))
+    initial = int(opts.get("initial", min(max(DEFAULT_BATCH_SIZE, min_size), max_size)))
+    sizer = AdaptiveBatchSizer(topic, initial, min_size=min_size, max_size=max_size,
+                               target_latency_s=float(opts.get("target_latency_s", 1.0)),
+                               headroom=float(opts.get("headroom", 1.25)),
+                               max_step=float(opts.get("max_step", 2.0)))
+    return sizer.size, sizer
@@ -2,13 +2,34 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # batch_validator.py
+from config import ConfigProvider
 from validation.gx_validation import validate_batch
+from validation.streaming_aggregates import StreamingSuite
 import pandas as pd
 
+
+def load_rules(config_name: str, topic: str | None):
+    """The topic's rules (`{column: [rule, …]}`) in the current validation configs, or None."""
+    if topic is None:
+        return None
+    config_id = config_name.removesuffix("_" + topic)
+    return ConfigProvider().validation().get(config_id, {}).get(topic)
+
+
 class BatchValidator:
-    def __init__(self, config_name: str):
+    def __init__(self, config_name: str, topic: str | None = None):
         self.config_name = config_name
+        self.topic = topic
+        self.rules = load_rules(config_name, topic)
+        # aggregate rules with "evaluation": "streaming" keep state across batches
+        self.streaming = StreamingSuite(self.rules, topic or "")
+
+    def outdated(self) -> bool:
+        """True if the validation configs no longer hold the rules this validator was built
+        from; the GX suites follow a reload, the streaming suite and whatever the pipeline
+        derived from `rules` do not."""
+        return load_rules(self.config_name, self.topic) != self.rules
 
     def __call__(self, df: pd.DataFrame):
         """Return Great‑Expectations validation results."""
-        return validate_batch(df, self.config_name)
+        return self.streaming.merge(validate_batch(df, self.config_name), df)
@@ -2,24 +2,222 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # data_queue.py
+import threading
+import time
 import pandas as pd
 from collections.abc import Callable
+from concurrent.futures import Executor, Future
+
+from monitoring.log import get_logger
+from .wal import WriteAheadLog
+
+log = get_logger(__name__)
 
 class DataQueue:
-    """Collect rows and fire a callback when a full batch is ready."""
+    """Collect rows and fire a callback when a full batch is ready.
+
+    With a `WriteAheadLog` every accepted row is logged before it is
+    buffered, and the batch's segment is released only after the callback
+    returned (i.e. the batch was published).
 
-    def __init__(self, batch_size: int, on_batch_ready: Callable[[pd.DataFrame], None]):
+    With an `executor` the full batch is handed to it instead of being
+    processed by the thread that added the last row (e.g. the event loop);
+    a single‑worker executor keeps batches in order.
+
+    With a `sizer` (see `batch_sizer.AdaptiveBatchSizer`) the size of the
+    next batch is asked for whenever one is sealed."""
+
+    def __init__(self, batch_size: int, on_batch_ready: Callable[[pd.DataFrame], None],
+                 wal: WriteAheadLog | None = None, executor: Executor | None = None,
+                 sizer=None):
         self._batch_size = batch_size
+        self._sizer = sizer
+        self._sealed_at: float | None = None   # monotonic time the last full batch was sealed
         self._on_batch_ready = on_batch_ready
         self._buffer: list[dict] = []
+        self._oldest_at: float | None = None   # monotonic time of the first buffered row
+        self._wal = wal
+        self._executor = executor
+        self._successor: DataQueue | None = None   # set by hand_over()
+        self._in_flight = 0                    # rows of emitted batches not yet processed
+        self._lock = threading.Lock()          # MQTT and HTTP threads add concurrently
+
+    @property
+    def wal(self) -> WriteAheadLog | None:
+        return self._wal
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
 
     def add(self, row: dict) -> None:
         """Add a new row.  When the buffer reaches batch_size,
         emit a DataFrame to the callback and clear the buffer."""
-        self._buffer.append(row)
-        if len(self._buffer) >= self._batch_size:
-            df = pd.DataFrame(self._buffer)
+        with self._lock:
+            successor = self._successor
+            if successor is None:
+                if self._wal is not None:
+                    self._wal.append(row)
+                if not self._buffer:
+                    self._oldest_at = time.monotonic()
+                self._buffer.append(row)
+                if len(self._buffer) < self._batch_size:
+                    return
+                rows, self._buffer = self._buffer, []
+                oldest_at, self._oldest_at = self._oldest_at, None
+                self._in_flight += len(rows)
+                segment = self._wal.seal() if self._wal is not None else None
+                if self._sizer is not None:
+                    now = time.monotonic()
+                    since = now - (self._sealed_at if self._sealed_at is not None else oldest_at)
+                    self._sealed_at = now
+                    self._batch_size = self._sizer.sealed(len(rows), since)
+                if self._executor is not None:
+                    # submitted under the lock, so batches reach the executor in order
+                    self._executor.submit(self._flush, rows, segment).add_done_callback(_report_failure)
+                    return
+
+        if successor is not None:
+            # a producer that looked this queue up before it was replaced
+            successor.add(row)
+            return
+        self._flush(rows, segment)
+
+    def _flush(self, rows: list[dict], segment: int | None) -> None:
+        try:
+            df = pd.DataFrame(rows)
             self._on_batch_ready(df)
-            self._buffer.clear()
+        finally:
+            with self._lock:
+                self._in_flight -= len(rows)
+        if segment is not None:
+            self._wal.release(segment)
+
+    def replay(self) -> int:
+        """Re‑add the rows a previous run left in the write‑ahead log; returns their number."""
+        if self._wal is None:
+            return 0
+        rows, segments = self._wal.recover()
+        for row in rows:
+            self.add(row)
+        self._wal.sync()
+        self._wal.discard(segments)
+        return len(rows)
+
+    def drain(self) -> int:
+        """Process the buffered rows now as one short batch; returns their number."""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self._oldest_at = None
+            if not rows:
+                return 0
+            self._in_flight += len(rows)
+            segment = self._wal.seal() if self._wal is not None else None
+            if self._executor is not None:
+                self._executor.submit(self._flush, rows, segment).add_done_callback(_report_failure)
+                return len(rows)
+        self._flush(rows, segment)
+        return len(rows)
+
+    # ------------------------------------------------------------------ #
+    #  reconfiguration
+    # ------------------------------------------------------------------ #
+    def hand_over(self, successor: "DataQueue",
+                  on_handed_over: Callable[[], None] | None = None) -> tuple[int, float]:
+        """Move the buffered rows to `successor` and forward every later `add` to it;
+        returns the number of rows moved and the seconds producers were held.
+
+        Runs under this queue's lock, so no producer adds a row meanwhile;
+        `on_handed_over` (publishing the successor to the producers) runs before
+        the lock is released.  Batches this queue already emitted are not touched.
+        A shared write‑ahead log keeps the rows where they are; otherwise the
+        successor logs them again before this queue's segment is released."""
+        with self._lock:
+            t0 = time.perf_counter()
+            rows, self._buffer = self._buffer, []
+            oldest_at, self._oldest_at = self._oldest_at, None
+            shared = self._wal is not None and self._wal is successor._wal
+            segment = self._wal.seal() if self._wal is not None and not shared else None
+            ready = successor._absorb(rows, oldest_at, logged=shared)
+            self._successor = successor
+            if on_handed_over is not None:
+                on_handed_over()
+            held = time.perf_counter() - t0
+
+        for batch, batch_segment in ready:
+            successor._flush(batch, batch_segment)
+        if segment is not None:
+            if successor._wal is not None:
+                successor._wal.sync()
+            self._wal.release(segment)
+        return len(rows), held
+
+    def _absorb(self, rows: list[dict], oldest_at: float | None,
+                logged: bool) -> list[tuple[list[dict], int | None]]:
+        """Put handed‑over rows in front of the buffer.  Full batches are submitted
+        to the executor, or returned for the caller to flush."""
+        with self._lock:
+            wal = self._wal
+            if wal is not None and not logged:
+                for row in rows:
+                    wal.append(row)
+            if rows and not self._buffer:
+                self._oldest_at = oldest_at
+            self._buffer[:0] = rows
+            if len(self._buffer) < self._batch_size:
+                return []
+
+            # a smaller batch size: the current segment holds every full batch,
+            # the remainder is logged again in a fresh one
+            size = self._batch_size
+            buffered = self._buffer
+            cut = len(buffered) - len(buffered) % size
+            self._buffer = buffered[cut:]
+            self._in_flight += cut
+            segment = wal.seal() if wal is not None else None
+            if wal is not None:
+                for row in self._buffer:
+                    wal.append(row)
+            if not self._buffer:
+                self._oldest_at = None
+            batches = [buffered[i:i + size] for i in range(0, cut, size)]
+            ready = [(batch, None) for batch in batches[:-1]] + [(batches[-1], segment)]
+            if self._executor is None:
+                return ready
+            for batch, batch_segment in ready:
+                self._executor.submit(self._flush, batch, batch_segment).add_done_callback(_report_failure)
+            return []
+
+    def close(self) -> None:
+        """Stop logging; buffered rows stay in the log for the next start.
+        A log handed over together with the buffer now belongs to the successor."""
+        successor = self._successor
+        if self._wal is not None and (successor is None or successor._wal is not self._wal):
+            self._wal.close()
+
+    def set_on_batch_ready(self, on_batch_ready: Callable[[pd.DataFrame], None]) -> None:
+        """Swap the batch callback (e.g. to wrap it with a profiler)."""
+        self._on_batch_ready = on_batch_ready
+
+    # ------------------------------------------------------------------ #
+    #  introspection (read by the metrics scrape, never on the hot path)
+    # ------------------------------------------------------------------ #
+    def depth(self) -> int:
+        """Number of rows currently buffered."""
+        return len(self._buffer)
+
+    def backlog(self) -> int:
+        """Rows accepted but not yet processed: buffered plus emitted batches still
+        waiting for (or running on) the executor or callback."""
+        return len(self._buffer) + self._in_flight
+
+    def oldest_age(self) -> float:
+        """Seconds the oldest buffered row has been waiting (0 if empty)."""
+        oldest = self._oldest_at
+        return 0.0 if oldest is None else time.monotonic() - oldest
 
 
+def _report_failure(future: Future) -> None:
+    error = future.exception()
+    if error is not None:
+        log.error("✖ Batch processing failed", exc_info=error)
@@ -0,0 +1,181 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Duplicate suppression
+=====================
+
+Per‑topic, time‑windowed "have I seen this row?" check that runs in front
+of `DataQueue.add`, so QoS 1 redeliveries and gateway retries are not
+validated, corrected and published twice.
+
+The dedupe key is either a list of fields (e.g. the timestamp attribute
+plus a device id) or – without `key` – a hash of the whole payload.
+
+    DedupeWindow  – exact: insertion‑ordered hash table with expiry,
+                    capped at `max_entries` (oldest keys are evicted first)
+    BloomWindow   – approximate, for very high rates: two rotating Bloom
+                    filters of `window / 2` each; memory is fixed by
+                    `capacity` and `error_rate`, false positives drop a
+                    unique row with probability ≈ `error_rate`
+
+Both are thread‑safe; MQTT and HTTP producers share them.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence
+
+
+def _canonical(value: Any) -> Any:
+    """Equal JSON values → equal structures: a re‑serialized retry may reorder keys
+    or write `1` as `1.0`."""
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def _digest(value: Any) -> bytes:
+    # sorted, compact JSON; repr would depend on key order (and marshal/pickle
+    # output on object identity, so equal rows could hash differently)
+    text = json.dumps(_canonical(value), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def make_key_fn(key: Optional[Sequence[str]] = None,
+                ignore: Sequence[str] = ()) -> Callable[[dict], bytes]:
+    """Return a function mapping a row to its 16‑byte dedupe key."""
+    if key:
+        fields = tuple(key)
+
+        def _key(row: dict) -> bytes:
+            values = tuple(row.get(f) for f in fields)
+            if all(v is None for v in values):      # no key fields at all → whole payload
+                return _digest(row)
+            return _digest(values)
+        return _key
+    if ignore:
+        skip = frozenset(ignore)
+        return lambda row: _digest({k: v for k, v in row.items() if k not in skip})
+    return _digest
+
+
+class DedupeWindow:
+    """Exact duplicate check over the last `window` seconds, at most `max_entries` keys."""
+
+    def __init__(self, window: float = 300.0, max_entries: int = 100_000,
+                 key: Optional[Sequence[str]] = None, ignore: Sequence[str] = (),
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.window = window
+        self.max_entries = max_entries
+        self._key = make_key_fn(key, ignore)
+        self._clock = clock
+        self._expires: "OrderedDict[bytes, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, row: dict) -> bool:
+        """True if an equal row arrived within the window; otherwise remember this one."""
+        k = self._key(row)
+        now = self._clock()
+        with self._lock:
+            expires = self._expires
+            # expiry times are monotone in insertion order → expired keys sit at the front
+            while expires:
+                oldest, at = next(iter(expires.items()))
+                if at > now:
+                    break
+                del expires[oldest]
+            if k in expires:
+                return True
+            expires[k] = now + self.window
+            if len(expires) > self.max_entries:
+                expires.popitem(last=False)
+            return False
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+class BloomWindow:
+    """Approximate duplicate check with two rotating Bloom filters (fixed memory)."""
+
+    def __init__(self, window: float = 300.0, capacity: int = 1_000_000, error_rate: float = 0.001,
+                 key: Optional[Sequence[str]] = None, ignore: Sequence[str] = (),
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be in (0, 1)")
+        # each generation holds ~capacity/2 keys (half a window)
+        n = max(1, capacity // 2)
+        self.bits = max(64, int(-n * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / n * math.log(2)))
+        self.window = window
+        self._half = window / 2.0
+        self._key = make_key_fn(key, ignore)
+        self._clock = clock
+        self._current = bytearray((self.bits + 7) // 8)
+        self._previous = bytearray((self.bits + 7) // 8)
+        self._rotated_at = clock()
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, k: bytes):
+        h1 = int.from_bytes(k[:8], "little")
+        h2 = int.from_bytes(k[8:], "little") | 1
+        m = self.bits
+        return [(h1 + i * h2) % m for i in range(self.hashes)]
+
+    def seen(self, row: dict) -> bool:
+        positions = self._positions(self._key(row))
+        now = self._clock()
+        with self._lock:
+            if now - self._rotated_at >= self._half:
+                # a key is remembered for at least half and at most a full window
+                self._previous = self._current if now - self._rotated_at < self.window else bytearray(len(self._current))
+                self._current = bytearray(len(self._previous))
+                self._rotated_at = now
+                self._count = 0
+            cur, prev = self._current, self._previous
+            if all(cur[p >> 3] & (1 << (p & 7)) for p in positions) or \
+               all(prev[p >> 3] & (1 << (p & 7)) for p in positions):
+                return True
+            for p in positions:
+                cur[p >> 3] |= 1 << (p & 7)
+            self._count += 1
+            return False
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def from_config(dedupe: Any, timestamp_attribute: Optional[str] = None):
+    """
+    Build the dedupe stage from a topic's `"dedupe"` setting::
+
+        true                                            → payload hash, 5 min window
+        {"key": ["dateFrom", "stationId"], "window_s": 600, "max_entries": 200000}
+        {"mode": "bloom", "capacity": 5000000, "error_rate": 0.0001}
+
+    A key entry "$timestamp" stands for the topic's timestamp attribute.
+    """
+    if not dedupe:
+        return None
+    opts: Dict[str, Any] = dedupe if isinstance(dedupe, dict) else {}
+    key = opts.get("key")
+    if isinstance(key, str):
+        key = [key]
+    if key:
+        key = [timestamp_attribute if k == "$timestamp" and timestamp_attribute else k for k in key]
+    common = dict(window=float(opts.get("window_s", 300.0)), key=key, ignore=opts.get("ignore", ()))
+    if opts.get("mode", "exact") == "bloom":
+        return BloomWindow(capacity=int(opts.get("capacity", 1_000_000)),
+                           error_rate=float(opts.get("error_rate", 0.001)), **common)
+    return DedupeWindow(max_entries=int(opts.get("max_entries", 100_000)), **common)
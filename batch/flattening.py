@@ -0,0 +1,194 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Payload flattening
+==================
+
+Batches are built with `pd.DataFrame(rows)`: every top‑level key becomes
+a column and a nested object stays one opaque column nobody can validate.
+Nested feeds (e.g. `demo_data/ARSO_weather_data.json`, whose measurements
+sit under `"metdata"`) therefore had to be flattened before publishing.
+A topic's `"flatten"` setting does it when a row is accepted:
+
+    true                               every nested object, keys joined with
+                                       "." – `metdata.tavg`, exactly as in
+                                       ARSO_weather_data_flattened.json
+    {"fields": {path: column, …}}      only these paths, as these columns
+
+Paths are dotted (`metdata.tavg`, a number indexes into an array) or JSON
+pointers (`/metdata/tavg`, for keys that contain the separator).  Further
+options:
+
+    rest        what happens to top‑level keys no field path starts with:
+                "drop" (default with `fields`), "keep" as they are, or
+                "flatten" like `true`
+    separator   joins nested keys into column names (default "."; paths
+                are always dotted)
+    explode     path of an array of objects: one row per element, holding
+                the other columns plus the element's fields, prefixed with
+                `explode_prefix` (default: the path and the separator);
+                a missing or empty array leaves the row as it is
+
+The setting is compiled once into a Python function with a plain
+dictionary lookup per path segment (parents shared by several paths are
+looked up once), instead of parsing paths per row or running
+`pd.json_normalize` over every batch.  Flattening runs before dedupe and
+projection, so both see the flattened column names.
+
+    "weather": { ..., "flatten": { "fields": { "metdata.tavg": "tavg", "/valid": "valid" },
+                                   "rest": "drop" } }
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+RESTS = ("drop", "keep", "flatten")
+
+_MISSING = object()
+
+
+def parse_path(path: str) -> Tuple[str, ...]:
+    """Segments of a dotted path or a JSON pointer (RFC 6901)."""
+    if path.startswith("/"):
+        return tuple(s.replace("~1", "/").replace("~0", "~") for s in path[1:].split("/"))
+    return tuple(path.split("."))
+
+
+def flatten_all(row: Mapping[str, Any], separator: str = ".", prefix: str = "",
+                out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Every nested object of `row` joined into one level; arrays stay values."""
+    if out is None:
+        out = {}
+    for key, value in row.items():
+        if type(value) is dict:
+            flatten_all(value, separator, f"{prefix}{key}{separator}", out)
+        else:
+            out[prefix + key] = value
+    return out
+
+
+# ---------------------------------------------------------------------- #
+#  code generation
+# ---------------------------------------------------------------------- #
+def _compile_fields(fields: Mapping[Tuple[str, ...], str], rest: str,
+                    separator: str) -> Callable[[Mapping[str, Any]], Dict[str, Any]]:
+    """One function that copies every path of `fields` into its column."""
+    trie: Dict[str, Any] = {}
+    for segments, column in fields.items():
+        node = trie
+        for segment in segments[:-1]:
+            node = node.setdefault(segment, {})
+        node.setdefault(None, {})[segments[-1]] = column   # leaves of this node
+
+    lines = ["def flatten(row):", "    out = {}"]
+    counter = [0]
+
+    def step(parent: str, segment: str, indent: str) -> str:
+        counter[0] += 1
+        name = f"v{counter[0]}"
+        lookup = f"{parent}.get({segment!r}, _MISSING) if type({parent}) is dict else _MISSING"
+        if segment.isdigit():
+            i = int(segment)
+            lookup = f"{parent}[{i}] if type({parent}) is list and len({parent}) > {i} else ({lookup})"
+        lines.append(f"{indent}{name} = {lookup}")
+        return name
+
+    def emit(node: Dict[str, Any], parent: str, indent: str) -> None:
+        for segment, column in node.get(None, {}).items():
+            value = step(parent, segment, indent)
+            lines.append(f"{indent}if {value} is not _MISSING:")
+            lines.append(f"{indent}    out[{column!r}] = {value}")
+        for segment, child in node.items():
+            if segment is None:
+                continue
+            value = step(parent, segment, indent)
+            lines.append(f"{indent}if {value} is not _MISSING:")
+            emit(child, value, indent + "    ")
+
+    emit(trie, "row", "    ")
+    if rest != "drop":
+        consumed = frozenset(segments[0] for segments in fields)
+        lines += ["    for key, value in row.items():",
+                  "        if key in _CONSUMED:",
+                  "            continue"]
+        if rest == "flatten":
+            lines += ["        if type(value) is dict:",
+                      "            _flatten_all(value, _SEP, key + _SEP, out)",
+                      "        else:",
+                      "            out[key] = value"]
+        else:
+            lines.append("        out[key] = value")
+    else:
+        consumed = frozenset()
+    lines.append("    return out")
+
+    namespace: Dict[str, Any] = {"_MISSING": _MISSING, "_CONSUMED": consumed,
+                                 "_SEP": separator, "_flatten_all": flatten_all}
+    exec(compile("\n".join(lines), "<flatten>", "exec"), namespace)
+    return namespace["flatten"]
+
+
+class Flattener:
+    """Callable that turns one payload into the list of flat rows it stands for."""
+
+    def __init__(self, fields: Optional[Mapping[str, str]] = None, rest: Optional[str] = None,
+                 separator: str = ".", explode: Optional[str] = None,
+                 explode_prefix: Optional[str] = None) -> None:
+        rest = rest or ("drop" if fields else "flatten")
+        if rest not in RESTS:
+            raise ValueError(f"Unknown flatten rest '{rest}', expected one of {RESTS}")
+        self.separator = separator
+        paths = {parse_path(path): column for path, column in (fields or {}).items()}
+        if fields:
+            self._flat = _compile_fields(paths, rest, separator)
+        elif rest == "flatten":
+            self._flat = lambda row: flatten_all(row, separator)
+        elif rest == "keep":
+            self._flat = dict
+        else:
+            raise ValueError("A flatten spec that drops the rest needs 'fields'")
+
+        self._explode: Optional[Callable[[Mapping[str, Any]], Any]] = None
+        self._exploded_columns: Tuple[str, ...] = ()
+        self._prefix = ""
+        if explode:
+            segments = parse_path(explode)
+            self._explode = _compile_fields({segments: "items"}, "drop", separator)
+            joined = separator.join(segments)
+            # the array itself does not become a column next to its elements
+            self._exploded_columns = (joined, paths.get(segments, joined))
+            self._prefix = joined + separator if explode_prefix is None else explode_prefix
+
+    def __call__(self, row: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        flat = self._flat(row)
+        if self._explode is None:
+            return [flat]
+        items = self._explode(row).get("items")
+        if not items or type(items) is not list:
+            return [flat]
+        for column in self._exploded_columns:
+            flat.pop(column, None)
+        rows = []
+        for item in items:
+            out = dict(flat)
+            if type(item) is dict:
+                flatten_all(item, self.separator, self._prefix, out)
+            else:
+                out[self._prefix.rstrip(self.separator) or "value"] = item
+            rows.append(out)
+        return rows
+
+
+def from_config(flatten: Any) -> Optional[Flattener]:
+    """Build from a topic's `"flatten"` setting; None when it is missing or false."""
+    if not flatten:
+        return None
+    opts: Dict[str, Any] = flatten if isinstance(flatten, dict) else {}
+    return Flattener(
+        fields=opts.get("fields"),
+        rest=opts.get("rest"),
+        separator=opts.get("separator", "."),
+        explode=opts.get("explode"),
+        explode_prefix=opts.get("explode_prefix"),
+    )
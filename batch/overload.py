@@ -0,0 +1,236 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Overload policies
+=================
+
+When rows arrive faster than a topic's batches can be validated, its
+backlog grows without bound.  An `"overload"` policy on the topic lets the
+pipeline trade validation depth for throughput until it has caught up:
+
+    normal       full validation and correction
+    sample       a random `sample_rate` share of every batch is validated
+                 and corrected; the other rows are published as they are
+    cheap        range, null and set checks only, evaluated with pandas
+                 instead of Great Expectations (no regex, JSON schema,
+                 uniqueness or aggregate rules)
+    passthrough  no validation or correction at all
+
+The controller escalates one mode (in the order of `modes`) after
+`escalate_after` consecutive batches over a threshold and steps back after
+`recover_after` consecutive batches under half of it.  A step back that is
+escalated again right away doubles the calm streak the next one needs, so
+a topic that still cannot keep up does not oscillate.
+
+    "overload": {"max_backlog": 2000, "max_batch_latency_s": 0.5,
+                 "modes": ["sample", "cheap", "passthrough"], "sample_rate": 0.1}
+
+`max_backlog` counts rows accepted but not yet published (buffered plus
+batches waiting for the pipeline's worker, see `DataQueue.backlog`); the
+latency is a moving average of one batch's validate → publish time.
+Every row published by a degraded batch carries `"degraded": "<mode>"`;
+rows a `sample` batch did validate carry none.  The current mode is
+exported as `ds2_overload_mode` (index into `["normal", *modes]`).
+"""
+from __future__ import annotations
+
+import math
+import random
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from data_correction.rule_index import iter_rules
+from monitoring.log import get_logger
+from monitoring.metrics import OVERLOAD_MODE, OVERLOAD_TRANSITIONS, ROWS_DEGRADED
+
+log = get_logger(__name__)
+
+NORMAL = "normal"
+MODES = ("sample", "cheap", "passthrough")
+_MAX_BACKOFF = 32
+
+
+# ---------------------------------------------------------------------- #
+#  cheap checks
+# ---------------------------------------------------------------------- #
+def _between(series: pd.Series, params: Mapping[str, Any]) -> pd.Series:
+    values = pd.to_numeric(series, errors="coerce")
+    bad = pd.Series(False, index=series.index)
+    low, high = params.get("min_value"), params.get("max_value")
+    if low is not None:
+        bad |= values <= low if params.get("strict_min") else values < low
+    if high is not None:
+        bad |= values >= high if params.get("strict_max") else values > high
+    return bad
+
+
+CHEAP_CHECKS: Dict[str, Callable[[pd.Series, Mapping[str, Any]], pd.Series]] = {
+    "expect_column_values_to_be_between": _between,
+    "expect_column_values_to_not_be_null": lambda s, p: s.isna(),
+    "expect_column_values_to_be_null": lambda s, p: s.notna(),
+    "expect_column_values_to_be_in_set": lambda s, p: s.notna() & ~s.isin(p.get("value_set", ())),
+    "expect_column_values_to_not_be_in_set": lambda s, p: s.isin(p.get("value_set", ())),
+}
+_NULL_RULES = frozenset({"expect_column_values_to_not_be_null", "expect_column_values_to_be_null"})
+
+
+class CheapSuite:
+    """The rules of a topic that `CHEAP_CHECKS` covers; returns GX‑shaped result dicts."""
+
+    def __init__(self, topic: str, rules: Optional[Mapping[str, Sequence[Mapping[str, Any]]]]) -> None:
+        self._checks: List[Tuple[str, str, str, Dict[str, Any], Callable]] = []
+        for rid, column, entry in iter_rules(topic, rules):
+            rule = entry.get("rule")
+            check = CHEAP_CHECKS.get(rule)
+            if check is not None and entry.get("evaluation") != "streaming":
+                params = dict(entry.get("params", {}))
+                self._checks.append((rid, rule, params.get("column", column), params, check))
+
+    def __len__(self) -> int:
+        return len(self._checks)
+
+    def validate(self, df: pd.DataFrame) -> Dict[str, Any]:
+        results = []
+        for rid, rule, column, params, check in self._checks:
+            if column not in df.columns:
+                continue
+            series = df[column]
+            bad = check(series, params)
+            unexpected = series.index[bad.to_numpy()].tolist()
+            counted = len(series) if rule in _NULL_RULES else int(series.notna().sum())
+            mostly = params.get("mostly", 1.0)
+            success = len(unexpected) <= (1.0 - mostly) * counted + 1e-9
+            results.append({
+                "success": bool(success),
+                "expectation_config": {"type": rule, "kwargs": params,
+                                       "meta": {"rule_id": rid, "degraded": "cheap"}},
+                "result": {"element_count": len(series), "unexpected_count": len(unexpected),
+                           "unexpected_index_list": unexpected},
+                "exception_info": {"raised_exception": False, "exception_message": None,
+                                   "exception_traceback": None},
+            })
+        return {"success": all(res["success"] for res in results), "results": results}
+
+
+# ---------------------------------------------------------------------- #
+#  controller
+# ---------------------------------------------------------------------- #
+class OverloadController:
+    """Picks the validation mode of a topic's next batch from its backlog and latency."""
+
+    def __init__(self, topic: str, rules: Optional[Mapping[str, Sequence[Mapping[str, Any]]]] = None,
+                 modes: Sequence[str] = MODES, max_backlog: Optional[int] = None,
+                 max_batch_latency_s: Optional[float] = None, sample_rate: float = 0.1,
+                 escalate_after: int = 2, recover_after: int = 10, smoothing: float = 0.3,
+                 seed: Optional[int] = None) -> None:
+        unknown = [m for m in modes if m not in MODES]
+        if unknown:
+            raise ValueError(f"Unknown overload mode(s) {unknown} for topic '{topic}'")
+        if max_backlog is None and max_batch_latency_s is None:
+            raise ValueError(f"Overload policy for topic '{topic}' needs max_backlog or max_batch_latency_s")
+        self.topic = topic
+        self.levels: Tuple[str, ...] = (NORMAL, *modes)
+        self.level = 0
+        self.max_backlog = max_backlog
+        self.max_batch_latency_s = max_batch_latency_s
+        self.sample_rate = sample_rate
+        self.escalate_after = escalate_after
+        self.recover_after = recover_after
+        self._smoothing = smoothing
+        self._latency: Optional[float] = None      # moving average within the current mode
+        self._hot = self._calm = 0
+        self._backoff = 1
+        self._since_recovery: Optional[int] = None
+        self._random = random.Random(seed)
+        self._cheap = CheapSuite(topic, rules) if "cheap" in modes else None
+        self._gauge = OVERLOAD_MODE.labels(topic)
+        self._gauge.set(0)
+        self._degraded = ROWS_DEGRADED.labels(topic)
+
+    @property
+    def mode(self) -> str:
+        return self.levels[self.level]
+
+    # ------------------------------------------------------------------ #
+    #  per batch
+    # ------------------------------------------------------------------ #
+    def validate(self, df: pd.DataFrame, validator: Callable[[pd.DataFrame], Any]
+                 ) -> Tuple[Any, Optional[Sequence[Optional[str]] | str]]:
+        """Validate `df` in the current mode; returns the results and the `degraded`
+        flag(s) for the published rows (None in normal mode)."""
+        mode = self.mode
+        if mode == NORMAL:
+            return validator(df), None
+        if mode == "sample":
+            n = len(df.index)
+            k = min(n, max(1, math.ceil(self.sample_rate * n)))
+            chosen = sorted(self._random.sample(range(n), k))
+            flags: List[Optional[str]] = ["sample"] * n
+            for position in chosen:
+                flags[position] = None
+            self._degraded.inc(n - k)
+            return validator(df.iloc[chosen]), flags
+        self._degraded.inc(len(df.index))
+        if mode == "cheap":
+            return self._cheap.validate(df), "cheap"
+        return {"success": True, "results": []}, "passthrough"
+
+    def observe(self, backlog: int, latency: float) -> str:
+        """Feed one batch's measurements; returns the mode of the next batch."""
+        self._latency = latency if self._latency is None else \
+            self._latency + self._smoothing * (latency - self._latency)
+        hot = ((self.max_backlog is not None and backlog > self.max_backlog)
+               or (self.max_batch_latency_s is not None and self._latency > self.max_batch_latency_s))
+        calm = not hot and (
+            (self.max_backlog is None or backlog <= self.max_backlog / 2)
+            and (self.max_batch_latency_s is None or self._latency <= self.max_batch_latency_s / 2))
+        # between half and the full threshold the mode is kept
+        self._hot = self._hot + 1 if hot else 0
+        self._calm = self._calm + 1 if calm else 0
+        if self._since_recovery is not None:
+            self._since_recovery += 1
+
+        if self._hot >= self.escalate_after and self.level < len(self.levels) - 1:
+            if self._since_recovery is not None and self._since_recovery <= self.recover_after:
+                self._backoff = min(self._backoff * 2, _MAX_BACKOFF)   # stepped back too early
+            self._switch(self.level + 1, backlog)
+        elif self._calm >= self.recover_after * self._backoff:
+            if self.level > 0:
+                self._switch(self.level - 1, backlog)
+                self._since_recovery = 0
+            else:
+                self._backoff = 1
+                self._calm = 0
+        return self.mode
+
+    def _switch(self, level: int, backlog: int) -> None:
+        previous, self.level = self.mode, level
+        self._hot = self._calm = 0
+        self._latency = None
+        self._gauge.set(level)
+        OVERLOAD_TRANSITIONS.labels(self.topic, self.mode).inc()
+        if level > self.levels.index(previous):
+            log.warning("⚠️  Topic '%s' overloaded (backlog %d rows): %s → %s",
+                        self.topic, backlog, previous, self.mode)
+        else:
+            log.info("✅ Topic '%s' recovering (backlog %d rows): %s → %s",
+                     self.topic, backlog, previous, self.mode)
+
+
+def from_config(overload, topic: str,
+                rules: Optional[Mapping[str, Sequence[Mapping[str, Any]]]] = None) -> Optional[OverloadController]:
+    """Build from a topic's `"overload"` setting."""
+    if not overload:
+        return None
+    opts = overload if isinstance(overload, dict) else {}
+    return OverloadController(
+        topic, rules,
+        modes=tuple(opts.get("modes", MODES)),
+        max_backlog=opts.get("max_backlog"),
+        max_batch_latency_s=opts.get("max_batch_latency_s"),
+        sample_rate=float(opts.get("sample_rate", 0.1)),
+        escalate_after=int(opts.get("escalate_after", 2)),
+        recover_after=int(opts.get("recover_after", 10)),
+    )
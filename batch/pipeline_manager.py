@@ -3,8 +3,13 @@ from curses import raw
 from typing import Any, Callable, Dict, Optional
 from threading import RLock
 from batch import BatchPipeline
+from batch.warmup import WARMUP_BATCHES
 from mqtt import MqttClient  # your existing MQTT adapter
 from config import ConfigProvider
+from cluster import ClusterRouter
+from monitoring.log import get_logger
+
+log = get_logger(__name__)
 
 
 
@@ -13,15 +18,36 @@ class PipelineManager:
     Loads all BatchPipelines from a JSON config file, keeps them in a dict,
     and (optionally) wires them into an MqttClient by subscribing & registering
     per-topic handlers.
+
+    With a ClusterRouter, only the topics (or devices) this worker owns are
+    processed here; see `cluster.router` for the subscription modes.
+
+    A topic whose settings change gets a new pipeline, built while the old one
+    keeps running; the old queue then hands its buffered rows over (see
+    `BatchPipeline.take_over`), so a reload neither drops nor repeats rows.
+    A removed topic processes its buffered rows as a last short batch.
+    After a validation reload the pipelines whose rules changed are rebuilt
+    the same way (`refresh_validation`).
+    Every new pipeline is warmed up with synthetic batches first (see
+    `batch.warmup`), and every running one again after a validation reload.
     """
 
-    def __init__(self, cfg_path: str, mqtt_client: Optional[MqttClient] = None):
+    def __init__(self, cfg_path: str, mqtt_client: Optional[MqttClient] = None,
+                 cluster: Optional[ClusterRouter] = None):
         self._pipelines: Dict[str, BatchPipeline] = {}
+        self._specs: Dict[str, Dict[str, Any]] = {}    # settings each pipeline was built from
         self._lock  = RLock()
         self._mqtt_client = mqtt_client
+        self._cluster = cluster
         self._listeners : Dict[str, Callable[[str, dict], None]] = {}
+        self._subscriptions: Dict[str, str] = {}
         config_provider = ConfigProvider()
 
+        if cluster and mqtt_client:
+            # rows other workers received but this one owns
+            mqtt_client.subscribe(cluster.config.forward_filter, qos=1)
+            mqtt_client.add_listener(self._on_forwarded)
+
         self._apply_mqtt_config(config_provider.mqtt())
 
 
@@ -38,32 +64,119 @@ class PipelineManager:
                 desired_topics[topic_to_subscribe] = {
                     "batch_size": config.get("batch_size",50),
                     "validation_config": config.get("validation_config"),
-                    "raw_topic": topic
+                    "raw_topic": topic,
+                    "durable": config.get("durable"),
+                    "archive": config.get("archive"),
+                    "dedupe": config.get("dedupe"),
+                    "projection": config.get("projection"),
+                    "flatten": config.get("flatten"),
+                    "overload": config.get("overload"),
+                    "schedule": config.get("schedule"),
+                    "cluster": config.get("cluster"),
                 }
+
+            if self._cluster:
+                for topic in self._cluster.topics:
+                    if topic not in desired_topics:
+                        self._cluster.forget(topic)
+                for desired_topic, desired_config in desired_topics.items():
+                    self._cluster.configure(desired_topic, desired_config["cluster"])
+                # topics owned by another worker get no pipeline here
+                desired_topics = {t: c for t, c in desired_topics.items() if self._cluster.hosts(t)}
             
             #remove pipelines that are no longer in the config
             for existing in list(self._pipelines.keys()):
                 if existing not in desired_topics:
-                    self._pipelines.pop(existing, None)
-                    if self._mqtt_client:
-                        self._mqtt_client.unsubscribe(existing)
+                    subscription = self._subscriptions.pop(existing, None)
+                    if self._mqtt_client and subscription:
+                        self._mqtt_client.unsubscribe(subscription)
+                    removed = self._pipelines.pop(existing, None)
+                    self._specs.pop(existing, None)
+                    if removed:
+                        removed.close(drain=True)
+                        removed.metrics.forget()
 
             # add or update pipelines based on the config
             for desired_topic, desired_config in desired_topics.items():
                 if desired_topic not in self._pipelines:
-                    self._pipelines[desired_topic] = BatchPipeline(
-                        topic= desired_topic,
-                        config_name=desired_config["validation_config"],
-                        batch_size=desired_config["batch_size"]
-                    )
-
-                    if self._mqtt_client:
-                        self._mqtt_client.subscribe(desired_topic)
-                        if desired_topic not in self._listeners:
-                            handler = self._make_handler(desired_topic)
-                            self._listeners[desired_topic] = handler
-                            self._mqtt_client.add_listener(handler)
-    
+                    self._pipelines[desired_topic] = self._build(desired_topic, desired_config)
+                    self._specs[desired_topic] = desired_config
+                elif self._specs.get(desired_topic) != desired_config:
+                    if not self._replace(desired_topic, desired_config):
+                        continue
+                else:
+                    continue
+
+                if self._mqtt_client:
+                    subscription = self._cluster.subscription(desired_topic) if self._cluster else desired_topic
+                    previous = self._subscriptions.get(desired_topic)
+                    if previous != subscription:
+                        self._subscriptions[desired_topic] = subscription
+                        self._mqtt_client.subscribe(subscription)
+                        if previous:
+                            self._mqtt_client.unsubscribe(previous)
+                    if desired_topic not in self._listeners:
+                        handler = self._make_handler(desired_topic)
+                        self._listeners[desired_topic] = handler
+                        self._mqtt_client.add_listener(handler)
+
+    def _build(self, topic: str, spec: Dict[str, Any],
+               predecessor: Optional[BatchPipeline] = None) -> BatchPipeline:
+        pipeline = BatchPipeline(
+            topic=topic,
+            config_name=spec["validation_config"],
+            batch_size=spec["batch_size"],
+            durable=spec["durable"],
+            archive=spec["archive"],
+            dedupe=spec["dedupe"],
+            projection=spec["projection"],
+            flatten=spec["flatten"],
+            overload=spec["overload"],
+            schedule=spec["schedule"],
+            predecessor=predecessor,
+        )
+        pipeline.metrics.track_queue(pipeline.queue.depth, pipeline.queue.oldest_age)
+        pipeline.metrics.track_batch_size(lambda: pipeline.queue.batch_size)
+        # pay the first-batch costs before rows arrive (and before the old pipeline hands over)
+        pipeline.warm_up(WARMUP_BATCHES)
+        return pipeline
+
+    def _replace(self, topic: str, spec: Dict[str, Any]) -> bool:
+        """Swap in a pipeline built from `spec`; the running one keeps serving until then."""
+        old = self._pipelines[topic]
+        try:
+            new = self._build(topic, spec, predecessor=old)
+        except Exception as e:
+            log.error("✖ Reconfiguring topic '%s' failed, keeping the running pipeline: %s", topic, e)
+            return False
+
+        new.take_over(old, lambda: self._pipelines.__setitem__(topic, new))
+        self._specs[topic] = spec
+        old.close()
+        return True
+
+    def refresh_validation(self) -> int:
+        """
+        Rebuild the pipelines whose validation rules changed; call after
+        `GXInitializer.reload_gx`.  The GX suites follow a reload on their own,
+        but a pipeline reads its rules once (streaming rules, overload cheap
+        suite), so a changed config gets a new pipeline that takes over the
+        running one.  Every other pipeline validates on the new generation of
+        suites from its next batch on, so it is warmed up again (process‑parallel
+        workers build their copies on first use).  Returns the number of
+        pipelines rebuilt.
+        """
+        rebuilt = 0
+        with self._lock:
+            for topic, pipeline in list(self._pipelines.items()):
+                if pipeline.validator.outdated() and self._replace(topic, self._specs[topic]):
+                    rebuilt += 1            # warmed up by _build
+                else:
+                    pipeline.warm_up(WARMUP_BATCHES)
+        if rebuilt:
+            log.info("🔄 Rebuilt %d pipeline(s) for the changed validation rules", rebuilt)
+        return rebuilt
+
     def reload_from_provider(self, config_provider: ConfigProvider) -> None:
         """
         Reloads the pipelines from the given ConfigProvider.
@@ -79,9 +192,37 @@ class PipelineManager:
         """
         def _handler(raw_topic: str, payload: dict) -> None:
             if raw_topic == topic:
-                self._pipelines[topic].add(payload)
+                if self._cluster and not self._cluster.route(topic, payload):
+                    return
+                pipeline = self._pipelines.get(topic)
+                if pipeline is not None:        # None while its topic is being removed
+                    pipeline.add(payload)
         return _handler
 
+    def _on_forwarded(self, raw_topic: str, payload: dict) -> None:
+        topic = self._cluster.config.forwarded_topic(raw_topic)
+        if topic is None:
+            return
+        pipeline = self._pipelines.get(topic)
+        if pipeline is None:
+            log.warning("⚠️  Forwarded row for unknown topic '%s' dropped", topic)
+            return
+        pipeline.add(payload)
+
+    @property
+    def cluster(self) -> Optional[ClusterRouter]:
+        return self._cluster
+
+    def owner_of(self, topic: str, payload: dict) -> Optional[int]:
+        """
+        Index of the worker that must process `payload`, or None if that is
+        this process (always the case outside cluster mode).
+        """
+        if self._cluster is None:
+            return None
+        target = self._cluster.owner_of(topic, payload)
+        return None if target == self._cluster.index else target
+
     def handler_for(self, topic: str) -> Callable[[str, dict], None]:
         """
         Expose the same per-topic handler for use by other transports (e.g. HTTP).
@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Column projection
+=================
+
+Per‑topic "keep only what we validate" step applied when a row is
+accepted, so fields nobody looks at are not buffered, written to the
+write‑ahead log, turned into DataFrame columns, copied by the correction
+engine and published twice (`.raw` / `.cleaned`).
+
+The kept keys are
+
+    • the topic's `variables`
+    • its `timestamp_attribute`
+    • every column its validation rules reference (rules may check
+      columns that are not listed as variables)
+    • the fields alarms are built from: `dateTo` (the alarm timestamp)
+      and `trace_fields` (default `_run`, `_seq`, `_sent_ts`), so
+      load‑test correlation keeps working
+    • anything listed in `passthrough`
+
+Keys are matched against the top level of the payload; a kept key that a
+row lacks stays absent, exactly as without projection.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+DEFAULT_TRACE_FIELDS = ("_run", "_seq", "_sent_ts")
+ALARM_TIMESTAMP = "dateTo"        # read by AlarmPublisher
+
+
+class Projection:
+    """Callable that copies the kept keys of a row into a new dict."""
+
+    __slots__ = ("keys",)
+
+    def __init__(self, keys: Iterable[str]) -> None:
+        self.keys: Tuple[str, ...] = tuple(dict.fromkeys(k for k in keys if k))
+
+    def __call__(self, row: dict) -> dict:
+        return {k: row[k] for k in self.keys if k in row}
+
+    def __repr__(self) -> str:
+        return f"Projection({list(self.keys)!r})"
+
+
+def rule_columns(rules: Optional[Mapping[str, Any]]) -> Iterable[str]:
+    """Columns referenced by a topic's validation rules (`{column: [rule, …]}`)."""
+    for column, entries in (rules or {}).items():
+        yield column
+        for entry in entries or ():
+            params = entry.get("params", {}) if isinstance(entry, dict) else {}
+            for key in ("column", "column_A", "column_B"):
+                if isinstance(params.get(key), str):
+                    yield params[key]
+            for name in params.get("column_list", ()) or ():
+                yield name
+
+
+def from_config(projection: Any, topic_cfg: Mapping[str, Any],
+                rules: Optional[Mapping[str, Any]] = None) -> Optional[Projection]:
+    """
+    Build the projection from a topic's `"projection"` setting::
+
+        true                                   → variables, timestamp, rule columns, alarm fields
+        {"passthrough": ["stationId"]}         → … plus these keys
+
+    Returns None (keep every field) when the setting is missing or false.
+    """
+    if not projection:
+        return None
+    opts: Dict[str, Any] = projection if isinstance(projection, dict) else {}
+    passthrough = opts.get("passthrough", ())
+    if isinstance(passthrough, str):
+        passthrough = [passthrough]
+    return Projection([
+        *topic_cfg.get("variables", ()),
+        topic_cfg.get("timestamp_attribute"),
+        *rule_columns(rules),
+        ALARM_TIMESTAMP,
+        *topic_cfg.get("trace_fields", DEFAULT_TRACE_FIELDS),
+        *passthrough,
+    ])
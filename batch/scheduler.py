@@ -0,0 +1,234 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Batch scheduler
+===============
+
+Without a scheduler every topic validates its batches on a thread of its
+own (or on the thread that filled the batch), so a noisy topic competes
+for the CPU with everything else on equal terms.  A `BatchScheduler` owns
+a fixed number of worker threads and decides which topic's batch runs
+next:
+
+    boost      a topic whose oldest waiting batch has used `boost_at` of
+               its `latency_slo_s` runs first (most urgent first); it is
+               charged as usual and may borrow at most `boost_credit`
+               rounds of its credit, so an SLO that cannot be met under
+               sustained overload does not starve the other topics
+    priority   otherwise the highest `priority` with a batch waiting wins
+    DRR        within a priority, deficit round‑robin by `weight`: a topic
+               is credited `weight × quantum` seconds per round and charged
+               the time its batches actually ran, so CPU time – not rows –
+               is shared by weight, whatever a topic's rows cost
+
+It is work‑conserving: a worker never idles while any topic has a batch
+waiting.  A topic never has two batches running at once, so its batches
+stay in order.  Each topic gets a `TopicLane`, an `Executor` its
+`DataQueue` submits to.
+
+    "weather":     { ..., "schedule": { "weight": 1 } }
+    "air-quality": { ..., "schedule": { "weight": 4, "priority": 1, "latency_slo_s": 2.0 } }
+
+Enabled with `DS2_SCHEDULER_WORKERS` (see `main.py`).
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Tuple
+
+from monitoring.log import get_logger
+from monitoring.metrics import SCHEDULER_BOOSTS, SCHEDULER_WAIT
+
+log = get_logger(__name__)
+
+SCHEDULER_WORKERS_ENV = "DS2_SCHEDULER_WORKERS"
+DEFAULT_QUANTUM = 0.05          # seconds of processing credited per weight unit and round
+DEFAULT_BOOST_AT = 0.5          # share of the SLO after which a waiting batch is boosted
+DEFAULT_BOOST_CREDIT = 4        # rounds of credit a boosted topic may borrow
+
+
+class TopicLane(Executor):
+    """The waiting batches of one topic; submit() never blocks."""
+
+    def __init__(self, scheduler: "BatchScheduler", topic: str) -> None:
+        self.topic = topic
+        self.weight = 1.0
+        self.priority = 0
+        self.latency_slo_s: Optional[float] = None
+        self.deficit = 0.0
+        self.running = False
+        self._scheduler = scheduler
+        self._pending: Deque[Tuple[Future, Callable, tuple, dict, float]] = deque()
+        self._closed = False
+        self._idle = threading.Condition(scheduler._lock)
+        self._wait = SCHEDULER_WAIT.labels(topic)
+        self._boosts = SCHEDULER_BOOSTS.labels(topic)
+
+    def configure(self, schedule: Optional[Mapping[str, Any]]) -> None:
+        opts = schedule if isinstance(schedule, dict) else {}
+        weight = float(opts.get("weight", 1.0))
+        if weight <= 0:
+            raise ValueError(f"Schedule weight for topic '{self.topic}' must be > 0")
+        with self._scheduler._lock:
+            self.weight = weight
+            self.priority = int(opts.get("priority", 0))
+            self.latency_slo_s = opts.get("latency_slo_s")
+            self._scheduler._reindex()
+
+    # ------------------------------------------------------------------ #
+    #  Executor
+    # ------------------------------------------------------------------ #
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        with self._scheduler._lock:
+            if self._closed:
+                raise RuntimeError(f"Lane of topic '{self.topic}' is shut down")
+            self._pending.append((future, fn, args, kwargs, time.monotonic()))
+            self._scheduler._ready.notify()
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._scheduler._lock:
+            self._closed = True
+            if cancel_futures:
+                while self._pending:
+                    self._pending.popleft()[0].cancel()
+            while wait and (self._pending or self.running):
+                self._idle.wait()
+            self._scheduler._remove(self)
+
+    # ------------------------------------------------------------------ #
+    #  scheduler side (called with the scheduler lock held)
+    # ------------------------------------------------------------------ #
+    @property
+    def ready(self) -> bool:
+        return bool(self._pending) and not self.running
+
+    def head_wait(self, now: float) -> float:
+        return now - self._pending[0][4]
+
+    def urgency(self, now: float) -> Optional[float]:
+        """Share of its SLO the oldest waiting batch has used (None without an SLO)."""
+        if not self.latency_slo_s:
+            return None
+        return self.head_wait(now) / self.latency_slo_s
+
+
+class BatchScheduler:
+    """Runs the batches of all topics on `workers` threads (see module docstring)."""
+
+    def __init__(self, workers: int = 1, quantum: float = DEFAULT_QUANTUM,
+                 boost_at: float = DEFAULT_BOOST_AT, boost_credit: float = DEFAULT_BOOST_CREDIT) -> None:
+        self.quantum = quantum
+        self.boost_at = boost_at
+        self.boost_credit = boost_credit
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._lanes: Dict[str, TopicLane] = {}
+        self._classes: List[Tuple[int, Deque[TopicLane]]] = []   # (priority, DRR ring), highest first
+        self._stopped = False
+        self._threads = [threading.Thread(target=self._work, name=f"batch-scheduler-{i}", daemon=True)
+                         for i in range(max(1, workers))]
+        for thread in self._threads:
+            thread.start()
+
+    def lane(self, topic: str, schedule: Optional[Mapping[str, Any]] = None) -> TopicLane:
+        """The lane of `topic` (created on first use), configured from its `"schedule"` setting."""
+        with self._lock:
+            lane = self._lanes.get(topic)
+            if lane is None:
+                lane = self._lanes[topic] = TopicLane(self, topic)
+                self._reindex()
+        lane.configure(schedule)
+        return lane
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._stopped = True
+            self._ready.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    # ------------------------------------------------------------------ #
+    #  internals (lock held)
+    # ------------------------------------------------------------------ #
+    def _reindex(self) -> None:
+        rings: Dict[int, Deque[TopicLane]] = {}
+        for lane in self._lanes.values():
+            rings.setdefault(lane.priority, deque()).append(lane)
+        self._classes = sorted(rings.items(), key=lambda item: -item[0])
+
+    def _remove(self, lane: TopicLane) -> None:
+        if self._lanes.get(lane.topic) is lane:
+            del self._lanes[lane.topic]
+            self._reindex()
+
+    def _pick(self, now: float) -> Optional[TopicLane]:
+        boosted, most = None, self.boost_at
+        for lane in self._lanes.values():
+            if lane.ready and lane.deficit > -self.boost_credit * lane.weight * self.quantum:
+                urgency = lane.urgency(now)
+                if urgency is not None and urgency >= most:
+                    boosted, most = lane, urgency
+        if boosted is not None:
+            boosted._boosts.inc()
+            return boosted
+
+        for _priority, ring in self._classes:
+            if not any(lane.ready for lane in ring):
+                continue
+            while True:
+                lane = ring[0]
+                if lane.ready and lane.deficit > 0:
+                    return lane                    # keeps its turn while credit is left
+                if lane.ready:
+                    lane.deficit += lane.weight * self.quantum
+                elif not lane._pending:
+                    lane.deficit = 0.0             # idle topics do not bank credit
+                ring.rotate(-1)
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                while True:
+                    if self._stopped:
+                        return
+                    now = time.monotonic()
+                    lane = self._pick(now)
+                    if lane is not None:
+                        break
+                    self._ready.wait()
+                future, fn, args, kwargs, submitted = lane._pending.popleft()
+                lane.running = True
+
+            lane._wait.observe(now - submitted)
+            t0 = time.perf_counter()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            elapsed = time.perf_counter() - t0
+
+            with self._lock:
+                lane.running = False
+                lane.deficit -= elapsed
+                if not lane._pending:
+                    lane._idle.notify_all()
+                self._ready.notify()
+
+
+def from_env() -> Optional[BatchScheduler]:
+    """A scheduler with `DS2_SCHEDULER_WORKERS` threads, or None if unset."""
+    workers = os.getenv(SCHEDULER_WORKERS_ENV)
+    if not workers:
+        return None
+    scheduler = BatchScheduler(int(workers))
+    log.info("✅ Batch scheduler with %s worker thread(s)", workers)
+    return scheduler
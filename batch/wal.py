@@ -0,0 +1,275 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+WriteAheadLog
+=============
+
+Optional durability for the rows a DataQueue is buffering.  Every accepted
+row is appended to the topic's current *segment* file before it enters
+the in‑memory buffer; one segment holds exactly one batch.
+
+    append(row)     – hot path: encode + one unbuffered write(2), no fsync
+    seal()          – batch is full: the segment is closed for appends
+    release(seg)    – batch was published: the segment file is deleted
+    recover()       – on startup: rows of every segment left on disk
+
+Record layout (little endian)::
+
+    u32 length | u32 crc32(payload) | codec byte + encoded row
+
+Rows are encoded with `marshal` (~1 µs for a typical row, several times
+faster than JSON); rows holding types marshal cannot encode fall back to
+JSON.  Segments are only ever read back by this service.
+
+A background thread fsyncs dirty segments every
+`fsync_interval` seconds (group commit), so a power loss loses at most
+that window.  Appends bypass user‑space buffering, so a process crash or
+OOM kill loses nothing that was accepted.
+Recovery reads segments sequentially through `mmap` and stops at the
+first torn record.  Replayed rows are re‑appended to a fresh segment
+before the old ones are deleted, so a crash during replay duplicates
+rows rather than losing them (at‑least‑once).
+"""
+from __future__ import annotations
+
+import json
+import marshal
+import mmap
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from struct import Struct
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from monitoring.log import get_logger
+from monitoring.metrics import WAL_FSYNC_DURATION, WAL_REPLAYED_ROWS
+
+log = get_logger(__name__)
+
+WAL_DIR_ENV = "DS2_WAL_DIR"
+DEFAULT_FSYNC_INTERVAL = 0.02
+
+_MAGIC = b"DS2WAL1\n"
+_HEADER = Struct("<II")
+_SUFFIX = ".seg"
+_MARSHAL, _JSON = b"M", b"J"
+_json_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str).encode
+
+
+def _encode(row: dict) -> bytes:
+    try:
+        return _MARSHAL + marshal.dumps(row)
+    except ValueError:
+        return _JSON + _json_encode(row).encode("utf-8")
+
+
+def _decode(data: bytes) -> dict:
+    if data[:1] == _MARSHAL:
+        return marshal.loads(data[1:])
+    return json.loads(data[1:])
+
+
+class WriteAheadLog:
+    """Per‑topic append‑only log of buffered rows, one segment file per batch."""
+
+    def __init__(self, directory: str | Path, topic: str,
+                 fsync_interval: float = DEFAULT_FSYNC_INTERVAL) -> None:
+        self.topic = topic
+        self.directory = Path(directory) / quote(topic, safe="")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._fh = None                       # current segment
+        self._segment: Optional[int] = None
+        self._sealed: Dict[int, object] = {}  # sealed, not yet synced/released
+        self._dirty = False
+        existing = self._segments()
+        self._next_segment = (existing[-1][0] + 1) if existing else 0
+        self._fsync = WAL_FSYNC_DURATION.labels(topic)
+        self._closed = threading.Event()
+        self._syncer: Optional[threading.Thread] = None
+        if fsync_interval > 0:
+            self._syncer = threading.Thread(target=self._sync_loop, name=f"wal-sync-{topic}", daemon=True)
+            self._syncer.start()
+
+    @classmethod
+    def from_config(cls, topic: str, durable,
+                    reuse: Optional["WriteAheadLog"] = None) -> Optional["WriteAheadLog"]:
+        """Build from a topic's `"durable"` setting (`true` or `{"dir": ..., "fsync_interval_ms": ...}`).
+
+        `reuse` is the log of the pipeline being replaced: if it writes to the same
+        directory it is returned as is, since two logs must never number segments
+        in one directory."""
+        if not durable:
+            return None
+        opts = durable if isinstance(durable, dict) else {}
+        directory = opts.get("dir") or os.getenv(WAL_DIR_ENV, "./wal")
+        interval = opts.get("fsync_interval_ms", DEFAULT_FSYNC_INTERVAL * 1000.0) / 1000.0
+        if reuse is not None and reuse.directory == Path(directory) / quote(topic, safe=""):
+            if reuse.fsync_interval != interval:
+                log.warning("⚠️  New fsync interval for topic '%s' takes effect after a restart", topic)
+            return reuse
+        return cls(directory, topic, fsync_interval=interval)
+
+    # ------------------------------------------------------------------ #
+    #  hot path
+    # ------------------------------------------------------------------ #
+    def append(self, row: dict) -> None:
+        data = _encode(row)
+        record = _HEADER.pack(len(data), zlib.crc32(data)) + data
+        with self._lock:
+            fh = self._fh
+            if fh is None:
+                fh = self._open_segment()
+            fh.write(record)
+            self._dirty = True
+        if self.fsync_interval <= 0:
+            self.sync()
+
+    def seal(self) -> Optional[int]:
+        """Close the current segment for appends and return its id (None if nothing was logged)."""
+        with self._lock:
+            if self._fh is None:
+                return None
+            segment, fh = self._segment, self._fh
+            self._fh, self._segment = None, None
+            if self._dirty:
+                self._sealed[segment] = fh   # the syncer still owes it an fsync
+            else:
+                fh.close()
+            self._dirty = False
+        return segment
+
+    def release(self, segment: Optional[int]) -> None:
+        """The batch of `segment` was published; drop its file."""
+        if segment is None:
+            return
+        with self._lock:
+            fh = self._sealed.pop(segment, None)
+            if fh is not None:
+                fh.close()
+        try:
+            os.unlink(self._path(segment))
+        except FileNotFoundError:
+            pass
+
+    # ------------------------------------------------------------------ #
+    #  group commit
+    # ------------------------------------------------------------------ #
+    def sync(self) -> None:
+        """Flush and fsync the current and all sealed segments."""
+        with self._lock:
+            handles = list(self._sealed.values())
+            if self._fh is not None and self._dirty:
+                handles.append(self._fh)
+            self._dirty = False
+            self._sealed = {}
+            fds = []
+            for fh in handles:
+                fds.append(os.dup(fh.fileno()))   # fsync outside the lock; appends keep going
+                if fh is not self._fh:
+                    fh.close()
+        if not fds:
+            return
+        t0 = time.perf_counter()
+        for fd in fds:
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self._fsync.observe(time.perf_counter() - t0)
+
+    def _sync_loop(self) -> None:
+        while not self._closed.wait(self.fsync_interval):
+            if self._dirty or self._sealed:
+                try:
+                    self.sync()
+                except OSError as e:
+                    log.warning("⚠️  WAL fsync failed for topic '%s': %s", self.topic, e)
+
+    def close(self) -> None:
+        """Stop the syncer and close all files (segments stay on disk for the next start)."""
+        self._closed.set()
+        if self._syncer is not None:
+            self._syncer.join()
+        self.sync()
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh, self._segment = None, None
+
+    # ------------------------------------------------------------------ #
+    #  recovery
+    # ------------------------------------------------------------------ #
+    def recover(self) -> Tuple[List[dict], List[int]]:
+        """
+        Read every segment left on disk (oldest first).  Returns the rows and
+        the segment ids; pass the ids to `discard` once the rows are safely
+        logged again.
+        """
+        rows: List[dict] = []
+        segments = []
+        for segment, path in self._segments():
+            if segment == self._segment:
+                continue
+            segments.append(segment)
+            rows.extend(read_segment(path))
+        WAL_REPLAYED_ROWS.labels(self.topic).inc(len(rows))
+        return rows, segments
+
+    def discard(self, segments: List[int]) -> None:
+        for segment in segments:
+            self.release(segment)
+
+    # ------------------------------------------------------------------ #
+    #  internal
+    # ------------------------------------------------------------------ #
+    def _path(self, segment: int) -> Path:
+        return self.directory / f"{segment:016d}{_SUFFIX}"
+
+    def _segments(self) -> List[Tuple[int, Path]]:
+        out = []
+        for path in self.directory.glob(f"*{_SUFFIX}"):
+            try:
+                out.append((int(path.stem), path))
+            except ValueError:
+                continue
+        return sorted(out)
+
+    def _open_segment(self):
+        # called with self._lock held
+        self._segment = self._next_segment
+        self._next_segment += 1
+        self._fh = open(self._path(self._segment), "wb", buffering=0)
+        self._fh.write(_MAGIC)
+        return self._fh
+
+
+def read_segment(path: str | Path) -> List[dict]:
+    """Decode one segment file; a torn tail (short or corrupt record) ends the segment."""
+    rows: List[dict] = []
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size <= len(_MAGIC):
+            return rows
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(_MAGIC)] != _MAGIC:
+                log.warning("⚠️  Skipping WAL segment with unknown format: %s", path)
+                return rows
+            pos, header = len(_MAGIC), _HEADER.size
+            while pos + header <= size:
+                length, crc = _HEADER.unpack_from(mm, pos)
+                start = pos + header
+                end = start + length
+                if end > size:
+                    break
+                data = mm[start:end]
+                if zlib.crc32(data) != crc:
+                    break
+                rows.append(_decode(data))
+                pos = end
+    return rows
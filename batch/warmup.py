@@ -0,0 +1,89 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Pipeline warm‑up
+================
+
+The first batch of a topic after a start or a reload is much slower than
+the ones after it.  It pays for the lazy GX imports, metric provider
+registration, the first run of its validation definitions, regex
+compilation and pandas' first code paths.  Alarms of that batch go out
+late after every deploy.
+
+`PipelineManager` therefore runs synthetic batches through every new
+pipeline before it is subscribed or swapped in, and before `/ready` turns
+200.  A validation reload brings a new generation of suites, so the
+running pipelines are warmed up again once it is live.  Each batch goes through validation, correction and serialization
+(`BatchPipeline.warm_up`); publishing is stubbed out and nothing is
+counted, archived or remembered by dedupe or streaming windows.
+
+`synthetic_batch` builds one row set from the topic's `variables`,
+`timestamp_attribute`, `dateTo` and the columns its rules reference.
+Values satisfy range, set and null rules, and timestamps are ISO 8601.
+The middle rows break them, so correction strategies and alarm
+formatting run too.
+
+    DS2_WARMUP_BATCHES   synthetic batches per pipeline (default 3, 0 turns
+                         warm‑up off)
+
+The first batch's latency and the median of the others are logged and
+exported as `ds2_warmup_batch_seconds{batch="first"|"steady"}`.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Mapping, Optional
+
+import pandas as pd
+
+from .projection import ALARM_TIMESTAMP, rule_columns
+
+WARMUP_BATCHES = int(os.getenv("DS2_WARMUP_BATCHES", "3"))
+MAX_ROWS = 10_000                  # a larger batch size does not warm anything more
+
+_BETWEEN = "expect_column_values_to_be_between"
+_IN_SET = "expect_column_values_to_be_in_set"
+_NOT_NULL = "expect_column_values_to_not_be_null"
+_START = pd.Timestamp("2025-01-01T00:00:00Z")
+
+
+def _constraints(rules: Optional[Mapping[str, Any]]) -> Dict[str, Dict[str, Mapping[str, Any]]]:
+    """column → rule name → params of the first such rule on that column."""
+    out: Dict[str, Dict[str, Mapping[str, Any]]] = {}
+    for column, entries in (rules or {}).items():
+        for entry in entries or ():
+            params = entry.get("params", {})
+            out.setdefault(params.get("column", column), {}).setdefault(entry.get("rule"), params)
+    return out
+
+
+def synthetic_batch(topic_cfg: Mapping[str, Any], rules: Optional[Mapping[str, Any]], rows: int) -> pd.DataFrame:
+    """`rows` rows shaped like the topic's (see module docstring)."""
+    rows = max(2, min(rows, MAX_ROWS))
+    timestamps = {topic_cfg.get("timestamp_attribute"), ALARM_TIMESTAMP}
+    columns = dict.fromkeys(c for c in (*topic_cfg.get("variables", ()), *timestamps, *rule_columns(rules)) if c)
+    constraints = _constraints(rules)
+    broken = rows // 2
+
+    data: Dict[str, list] = {}
+    for column in columns:
+        checks = constraints.get(column, {})
+        if column in timestamps:
+            values: list = [(_START + pd.Timedelta(hours=i)).isoformat() for i in range(rows)]
+            values[broken] = (_START + pd.Timedelta(hours=broken)).strftime("%Y-%m-%d %H:%M:%S")
+        elif _IN_SET in checks and checks[_IN_SET].get("value_set"):
+            value_set = list(checks[_IN_SET]["value_set"])
+            values = [value_set[i % len(value_set)] for i in range(rows)]
+        else:
+            between = checks.get(_BETWEEN, {})
+            lo, hi = between.get("min_value"), between.get("max_value")
+            lo = float(lo) if lo is not None else (float(hi) - 10.0 if hi is not None else 0.0)
+            hi = float(hi) if hi is not None else lo + 10.0
+            values = [lo + (hi - lo) * (i % 9 + 1) / 10 for i in range(rows)]
+            if between:
+                values[broken] = hi + (hi - lo) + 1.0
+        if _NOT_NULL in checks:
+            values[(broken + 1) % rows] = None
+        data[column] = values
+    return pd.DataFrame(data)
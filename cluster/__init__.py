@@ -0,0 +1,8 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# cluster/__init__.py
+
+from .config import ClusterConfig
+from .sharding import TopicSharding, owner
+from .router import ClusterRouter, FORWARDED_HEADER
@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+ClusterConfig
+=============
+
+Identity of one worker process in a cluster, read from the environment
+(`run_cluster.py` sets these for the workers it spawns):
+
+    DS2_CLUSTER_WORKERS   number of workers; cluster mode is off below 2
+    DS2_WORKER_INDEX      this worker, 0 … WORKERS-1
+    DS2_CLUSTER_GROUP     shared subscription group (default "ds2")
+    DS2_HTTP_PORT         HTTP port of worker 0; worker i listens on +i
+    DS2_CLUSTER_PEERS     optional comma separated base URLs of all workers,
+                          in index order (default http://127.0.0.1:<port+i>)
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+DEFAULT_HTTP_PORT = 8000
+FORWARD_PREFIX = "ds2/cluster"
+
+
+@dataclass(frozen=True)
+class ClusterConfig:
+    workers: int
+    index: int
+    group: str = "ds2"
+    base_port: int = DEFAULT_HTTP_PORT
+    peers: Tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError("workers must be >= 1")
+        if not 0 <= self.index < self.workers:
+            raise ValueError(f"worker index {self.index} out of range for {self.workers} workers")
+        if self.peers and len(self.peers) != self.workers:
+            raise ValueError(f"{len(self.peers)} peer URLs given for {self.workers} workers")
+
+    @classmethod
+    def from_env(cls) -> Optional["ClusterConfig"]:
+        """None unless DS2_CLUSTER_WORKERS is 2 or more."""
+        workers = int(os.getenv("DS2_CLUSTER_WORKERS", "1"))
+        if workers < 2:
+            return None
+        peers = tuple(p.strip().rstrip("/") for p in os.getenv("DS2_CLUSTER_PEERS", "").split(",") if p.strip())
+        return cls(
+            workers=workers,
+            index=int(os.getenv("DS2_WORKER_INDEX", "0")),
+            group=os.getenv("DS2_CLUSTER_GROUP", "ds2"),
+            base_port=int(os.getenv("DS2_HTTP_PORT", str(DEFAULT_HTTP_PORT))),
+            peers=peers,
+        )
+
+    @property
+    def http_port(self) -> int:
+        return self.base_port + self.index
+
+    def peer_url(self, index: int) -> str:
+        if self.peers:
+            return self.peers[index]
+        return f"http://127.0.0.1:{self.base_port + index}"
+
+    # --- MQTT topics ----------------------------------------------------------
+    def shared_filter(self, topic: str) -> str:
+        return f"$share/{self.group}/{topic}"
+
+    def forward_topic(self, index: int, topic: str) -> str:
+        """Where rows of `topic` owned by worker `index` are forwarded to."""
+        return f"{FORWARD_PREFIX}/{self.group}/{index}/{topic}"
+
+    @property
+    def forward_filter(self) -> str:
+        return f"{FORWARD_PREFIX}/{self.group}/{self.index}/#"
+
+    def forwarded_topic(self, raw_topic: str) -> Optional[str]:
+        """The pipeline topic of a message on this worker's forward topic, else None."""
+        prefix = f"{FORWARD_PREFIX}/{self.group}/{self.index}/"
+        if raw_topic.startswith(prefix):
+            return raw_topic[len(prefix):]
+        return None
@@ -0,0 +1,157 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+ClusterRouter
+=============
+
+Decides, per topic and per row, which worker processes it, so each shard
+key has exactly one DataQueue, CorrectionEngine and dedupe window in the
+whole cluster.
+
+Topic sharding (no `shard_key`)
+    Only the owning worker creates the pipeline and subscribes to the
+    plain topic.  Order within the topic is the broker's order.
+
+Device sharding, `"ingress": "shared"` (default)
+    Every worker creates the pipeline and subscribes to
+    `$share/<group>/<topic>`, so the broker spreads the messages over the
+    workers.  A worker that receives a row it does not own re‑publishes it
+    (QoS 1) to `ds2/cluster/<group>/<owner>/<topic>`, which only the owner
+    subscribes to.  Every key is still processed by one worker, but a
+    forwarded row takes an extra broker hop, so two rows of the same device
+    that arrive back to back on different workers can swap places.
+
+Device sharding, `"ingress": "broadcast"`
+    Every worker subscribes to the plain topic and silently drops the rows
+    it does not own.  Per‑device order is exactly the broker's order, at
+    the price of every worker receiving and parsing the full stream.
+
+HTTP `/ingest/{topic}` computes the owner the same way and proxies the
+request to the owner's HTTP port (`forward_http`).  Rows already
+forwarded carry the `X-DS2-Forwarded` header and are never forwarded
+again.
+
+Ownership is only stable while the number of workers is; changing it
+moves ≈ 1/N of the keys, whose buffered rows and correction history stay
+on the previous owner until its next batch.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import urllib.request
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from monitoring.metrics import CLUSTER_ROWS_ROUTED
+from .config import ClusterConfig
+from .sharding import TopicSharding, owner
+
+FORWARDED_HEADER = "X-DS2-Forwarded"
+ROUTES = ("local", "forwarded_mqtt", "forwarded_http", "skipped")
+
+
+class ClusterRouter:
+    """Ownership, subscriptions and forwarding for one worker."""
+
+    def __init__(self, config: ClusterConfig, mqtt_client=None, http_timeout: float = 5.0) -> None:
+        self.config = config
+        self.http_timeout = http_timeout
+        self._mqtt = mqtt_client
+        self._topics: Dict[str, TopicSharding] = {}
+        self._routed: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> int:
+        return self.config.index
+
+    @property
+    def workers(self) -> int:
+        return self.config.workers
+
+    # ------------------------------------------------------------------ #
+    #  topics
+    # ------------------------------------------------------------------ #
+    def configure(self, topic: str, cluster=None) -> TopicSharding:
+        """Register (or update) how `topic` is sharded; `cluster` is its `"cluster"` setting."""
+        sharding = TopicSharding.from_config(topic, cluster)
+        with self._lock:
+            self._topics[topic] = sharding
+            if topic not in self._routed:
+                self._routed[topic] = {route: CLUSTER_ROWS_ROUTED.labels(topic, route) for route in ROUTES}
+        return sharding
+
+    @property
+    def topics(self):
+        """Topics with a registered sharding, whether hosted here or not."""
+        return list(self._topics)
+
+    def forget(self, topic: str) -> None:
+        with self._lock:
+            self._topics.pop(topic, None)
+            if self._routed.pop(topic, None) is not None:
+                for route in ROUTES:
+                    CLUSTER_ROWS_ROUTED.remove(topic, route)
+
+    def hosts(self, topic: str) -> bool:
+        """Does this worker run a pipeline for `topic`?"""
+        sharding = self._topics.get(topic)
+        if sharding is None or sharding.per_device:
+            return True
+        return owner(sharding.key({}), self.workers) == self.index
+
+    def subscription(self, topic: str) -> Optional[str]:
+        """The MQTT filter this worker subscribes to for `topic` (None: not at all)."""
+        sharding = self._topics.get(topic)
+        if sharding is None or not sharding.per_device:
+            return topic if self.hosts(topic) else None
+        if sharding.ingress == "shared":
+            return self.config.shared_filter(topic)
+        return topic
+
+    # ------------------------------------------------------------------ #
+    #  rows
+    # ------------------------------------------------------------------ #
+    def owner_of(self, topic: str, row: dict) -> int:
+        sharding = self._topics.get(topic)
+        if sharding is None:
+            return self.index
+        return owner(sharding.key(row), self.workers)
+
+    def route(self, topic: str, row: dict) -> bool:
+        """
+        Called for every row received over MQTT.  True if this worker owns the
+        row and should add it to its pipeline; otherwise the row has been
+        forwarded to its owner (shared ingress) or skipped (broadcast ingress).
+        """
+        target = self.owner_of(topic, row)
+        routed = self._routed.get(topic)
+        if target == self.index:
+            if routed:
+                routed["local"].inc()
+            return True
+        sharding = self._topics[topic]
+        if sharding.ingress == "broadcast":
+            routed["skipped"].inc()
+            return False
+        self._mqtt.publish(self.config.forward_topic(target, topic), row, qos=1)
+        routed["forwarded_mqtt"].inc()
+        return False
+
+    def forward_http(self, target: int, topic: str, payload: dict) -> dict:
+        """POST `payload` to `/ingest/{topic}` of worker `target` and return its JSON answer."""
+        url = f"{self.config.peer_url(target)}/ingest/{quote(topic, safe='')}"
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json", FORWARDED_HEADER: str(self.index)},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.http_timeout) as response:
+            answer = json.loads(response.read())
+        routed = self._routed.get(topic)
+        if routed:
+            routed["forwarded_http"].inc()
+        return answer
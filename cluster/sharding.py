@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Consistent sharding
+===================
+
+Maps a shard key (a topic, or a device within a topic) to the worker that
+owns it, using rendezvous (highest‑random‑weight) hashing: every worker
+scores `hash(worker, key)` and the highest score wins.
+
+    - every process computes the same owner without coordination
+    - adding or removing a worker only moves the keys it gains or loses
+      (≈ 1/N of them), so the correction context of the others survives
+    - per key cost is N hashes; results are cached per key
+
+A topic's shard key comes from its `"cluster"` setting::
+
+    (absent)                                → the whole topic is one key
+    {"shard_key": ["stationId"]}            → one key per station
+    {"shard_key": "stationId", "ingress": "broadcast"}
+"""
+from __future__ import annotations
+
+import hashlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+INGRESS_MODES = ("shared", "broadcast")
+
+
+def _score(worker: int, key: str) -> int:
+    digest = hashlib.blake2b(f"{worker}\x1f{key}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+@lru_cache(maxsize=65536)
+def owner(key: str, workers: int) -> int:
+    """Index of the worker in `range(workers)` that owns `key`."""
+    if workers <= 1:
+        return 0
+    return max(range(workers), key=lambda w: _score(w, key))
+
+
+class TopicSharding:
+    """How the rows of one topic are spread over the workers."""
+
+    def __init__(self, topic: str, shard_key: Optional[Sequence[str]] = None,
+                 ingress: str = "shared") -> None:
+        if ingress not in INGRESS_MODES:
+            raise ValueError(f"ingress must be one of {INGRESS_MODES}, got {ingress!r}")
+        self.topic = topic
+        self.fields: Tuple[str, ...] = tuple(shard_key or ())
+        self.ingress = ingress
+        self._key: Callable[[dict], str] = self._make_key()
+
+    @classmethod
+    def from_config(cls, topic: str, cluster: Any) -> "TopicSharding":
+        """Build from a topic's `"cluster"` setting (see module docstring)."""
+        opts: Dict[str, Any] = cluster if isinstance(cluster, dict) else {}
+        shard_key = opts.get("shard_key")
+        if isinstance(shard_key, str):
+            shard_key = [shard_key]
+        return cls(topic, shard_key, ingress=opts.get("ingress", "shared"))
+
+    @property
+    def per_device(self) -> bool:
+        """True if rows are sharded by device, False if the whole topic lives on one worker."""
+        return bool(self.fields)
+
+    def key(self, row: dict) -> str:
+        return self._key(row)
+
+    def _make_key(self) -> Callable[[dict], str]:
+        topic, fields = self.topic, self.fields
+        if not fields:
+            return lambda row: topic
+        if len(fields) == 1:
+            field = fields[0]
+            return lambda row: f"{topic}\x1e{row.get(field)!r}"
+        return lambda row: f"{topic}\x1e{tuple(row.get(f) for f in fields)!r}"
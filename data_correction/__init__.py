@@ -5,3 +5,5 @@
 from .data_correction import DataCorrection
 from .correction_strategies import CorrectionStrategyEnum, is_valid_strategy, CorrectionStrategy,MissingValueImputation,SmoothingOutliers, get_strategy
 from .correction_engine import CorrectionEngine
+from .overlay import CorrectionOverlay
+from .rule_index import RuleIndex, CompiledRule, rule_id
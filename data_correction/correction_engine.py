@@ -7,22 +7,26 @@ CorrectionEngine
 
 Transforms a `(validation_results, original_df)` pair into
 
-    • cleaned_df      – a copy of the original with in‑place corrections
+    • cleaned         – a `CorrectionOverlay`: the corrected cells over the
+                        untouched original (`overlay`), or a cleaned frame
+                        sharing the uncorrected columns with it (`run`)
     • alarm_events    – list[tuple[column_name, result_dict]]
+    • corrected_rows  – set of row indices where at least one cell was corrected
 
 The engine is *pure* domain logic: it knows nothing about MQTT,
 publishers, or sleeps.
 """
 from __future__ import annotations
 
-from ast import Raise
-from typing import List, Tuple
+from typing import List, Set, Tuple
 
 import pandas as pd
 
 from data_correction import DataCorrection
 from config import ConfigProvider
-from data_correction import is_valid_strategy
+from . import rule_index
+from .rule_index import RuleIndex
+from .overlay import CorrectionOverlay
 
 
 class CorrectionEngine:
@@ -36,7 +40,10 @@ class CorrectionEngine:
     ) -> None:
         cfg_provider = ConfigProvider()
         config_id = config_name.removesuffix("_"+topic)
+        self._config_name = config_name
         self._rules = cfg_provider.validation()[config_id][topic]
+        # used until GXInitializer publishes the index compiled with the suites
+        self._own_index = RuleIndex(topic, self._rules)
         self._corrector = corrector
 
     # ------------------------------------------------------------------ #
@@ -46,45 +53,50 @@ class CorrectionEngine:
         self,
         validation_results: dict,
         df: pd.DataFrame
-    ) -> Tuple[pd.DataFrame, List[dict]]:
+    ) -> Tuple[pd.DataFrame, List[dict], Set[int]]:
         """
         Returns
         -------
         cleaned_df : pd.DataFrame
+            uncorrected columns are shared with `df`, corrected ones replaced
         alarm_events : list[(column_name, expectation_result_dict)]
+        corrected_rows : set[int]
         """
-        cleaned_df   = df.copy()
-        alarm_events = []
+        overlay, alarm_events, corrected_rows = self.overlay(validation_results, df)
+        return overlay.to_frame(), alarm_events, corrected_rows
 
-        prev_column, exp_idx = None, 0
+    def overlay(
+        self,
+        validation_results: dict,
+        df: pd.DataFrame
+    ) -> Tuple[CorrectionOverlay, List[dict], Set[int]]:
+        """Like `run`, but the corrections stay sparse patches over `df`."""
+        cleaned      = CorrectionOverlay(df)
+        alarm_events = []
+        corrected_rows: Set[int] = set()
+        index = rule_index.lookup(self._config_name) or self._own_index
 
         for res in validation_results["results"]:
-            col = res["expectation_config"]["kwargs"]["column"]
-
-            # Track “position” when multiple expectations target same column
-            if col == prev_column:
-                exp_idx += 1
-            else:
-                exp_idx, prev_column = 0, col
-
             if res["success"]:
                 continue  # nothing to do
 
-            strategy = self._rules[col][exp_idx].get("handler")
-            unexpected_idx = res["result"]["unexpected_index_list"]
-            expectation = res["expectation_config"]["type"]
-            min = res["expectation_config"]["kwargs"].get("min_value")
-            max = res["expectation_config"]["kwargs"].get("max_value")
+            rule = index.resolve(res)
+            if rule is None:
+                continue
+            unexpected_idx = res["result"].get("unexpected_index_list", [])   # aggregate rules have none
 
-            if strategy and is_valid_strategy(strategy):
-                cleaned_df[col] = self._corrector.correct_column(
-                    cleaned_df[col],
+            if rule.strategy is not None:
+                col = rule.column
+                # neighbours include the corrections of earlier rules on this column
+                cleaned.patch(col, self._corrector.corrections(
+                    cleaned.column(col),
                     rows_to_correct=unexpected_idx,
-                    strategy_name=strategy,
-                    min=min,
-                    max=max
-                )
-            elif strategy == "RaiseAlarm":
+                    strategy=rule.strategy,
+                    min=rule.min_value,
+                    max=rule.max_value
+                ))
+                corrected_rows.update(unexpected_idx)
+            elif rule.alarm:
                 alarm_events.append(res)  # is it necessary to put the whole result to an alarm?
 
-        return cleaned_df, alarm_events
+        return cleaned, alarm_events, corrected_rows
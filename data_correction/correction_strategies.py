@@ -10,6 +10,10 @@ from dateutil.parser import parse
 from datetime import datetime, timezone
 import ast
 
+from monitoring.log import get_logger
+
+log = get_logger(__name__)
+
 
 class CorrectionStrategy:
     """Base class for correction strategies."""
@@ -101,7 +105,7 @@ class TimestampCorrection(CorrectionStrategy):
 
         except (ValueError, TypeError, SyntaxError) as e:
             # Handle cases where parsing fails
-            print(f"Could not parse timestamp '{value}': {e}")
+            log.warning("Could not parse timestamp '%s': %s", value, e)
             return None # Or return the original value, or a default
 
 
@@ -3,6 +3,8 @@
 
 # data_correction.py
 
+from typing import Any, Dict
+
 from numpy import indices
 import pandas as pd
 from .correction_strategies import MissingValueImputation, SmoothingOutliers, CorrectionStrategy, get_strategy
@@ -18,9 +20,10 @@ class DataCorrection:
         self, 
         column: pd.Series, 
         rows_to_correct: dict, 
-        strategy_name: str, 
+        strategy_name: str | None = None, 
         min=None, 
-        max=None
+        max=None,
+        strategy: CorrectionStrategy | None = None
     ) -> pd.Series:
         """
         Correct a single column based on the given expectation result and the strategy to use for correction.
@@ -38,11 +41,32 @@ class DataCorrection:
             Lower bound for numeric corrections.
         max : float | int | None
             Upper bound for numeric corrections.
+        strategy : CorrectionStrategy | None
+            A ready strategy instance (e.g. from a RuleIndex); takes precedence over `strategy_name`.
         """
-        strategy_cls: type[CorrectionStrategy] = get_strategy(strategy_name)
-        strategy = strategy_cls()
         corrected_column = column.copy()
+        for index, value in self.corrections(column, rows_to_correct, strategy_name, min, max, strategy).items():
+            corrected_column[index] = value
+        return corrected_column
+
+    def corrections(
+        self,
+        column: pd.Series,
+        rows_to_correct,
+        strategy_name: str | None = None,
+        min=None,
+        max=None,
+        strategy: CorrectionStrategy | None = None
+    ) -> Dict[Any, Any]:
+        """
+        The corrected values of `rows_to_correct` (index → value), without copying
+        `column`; parameters as for `correct_column`.
+        """
+        if strategy is None:
+            strategy_cls: type[CorrectionStrategy] = get_strategy(strategy_name)
+            strategy = strategy_cls()
 
+        values: Dict[Any, Any] = {}
         for index in rows_to_correct:
             value = strategy.apply(index=index, neighbours=column)
 
@@ -53,6 +77,6 @@ class DataCorrection:
                 if max is not None and value > max:
                     value = max
 
-            corrected_column[index] = value
+            values[index] = value
 
-        return corrected_column
+        return values
@@ -0,0 +1,100 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Correction overlay
+==================
+
+Corrections touch a few cells of a batch, but the cleaned batch used to be
+a deep copy of all of it.  Every corrected column was then copied once
+more, and the publisher serialized the raw and the cleaned frame in full.
+`CorrectionEngine.overlay` records the corrections instead as sparse
+per‑column patches over the raw batch, which is never written to:
+
+    overlay.patches             {column: {index: value}}, the corrected cells
+    overlay.at[index, column]   one cleaned value
+    overlay.column(name)        a cleaned column: the raw one if nothing in it
+                                was corrected, else a patched copy (made once)
+    overlay.patched_frame()     only the patched columns
+    overlay.to_frame()          the whole cleaned batch; unpatched columns are
+                                shared with the raw batch
+
+A patched column is materialized with the same assignments
+`DataCorrection.correct_column` makes.  Its dtype therefore changes
+exactly as before, e.g. an int column holding a smoothed float becomes
+float64.  `ResultPublisher` serializes the raw batch once and the patched
+columns on top of it.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Tuple
+
+import pandas as pd
+
+
+class _At:
+    __slots__ = ("_overlay",)
+
+    def __init__(self, overlay: "CorrectionOverlay") -> None:
+        self._overlay = overlay
+
+    def __getitem__(self, key: Tuple[Any, str]) -> Any:
+        index, column = key
+        if column in self._overlay.patches:
+            return self._overlay.column(column).at[index]
+        return self._overlay.raw.at[index, column]
+
+
+class CorrectionOverlay:
+    """The cleaned view of a raw batch: the raw frame plus sparse per‑column patches."""
+
+    __slots__ = ("raw", "patches", "_columns")
+
+    def __init__(self, raw: pd.DataFrame) -> None:
+        self.raw = raw
+        self.patches: Dict[str, Dict[Any, Any]] = {}
+        self._columns: Dict[str, pd.Series] = {}      # materialized patched columns
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.raw.columns
+
+    @property
+    def index(self) -> pd.Index:
+        return self.raw.index
+
+    @property
+    def at(self) -> _At:
+        return _At(self)
+
+    def __len__(self) -> int:
+        return len(self.raw.index)
+
+    def patch(self, column: str, values: Mapping[Any, Any]) -> None:
+        """Record corrected cells of `column` (index → value); later patches win."""
+        if not values:
+            return
+        if column not in self.raw.columns:
+            raise KeyError(column)
+        self.patches.setdefault(column, {}).update(values)
+        self._columns.pop(column, None)
+
+    def column(self, name: str) -> pd.Series:
+        if name not in self.patches:
+            return self.raw[name]
+        column = self._columns.get(name)
+        if column is None:
+            column = self.raw[name].copy()
+            for index, value in self.patches[name].items():
+                column[index] = value
+            self._columns[name] = column
+        return column
+
+    def patched_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({name: self.column(name) for name in self.patches}, index=self.raw.index)
+
+    def to_frame(self) -> pd.DataFrame:
+        frame = self.raw.copy(deep=False)
+        for name in self.patches:
+            frame[name] = self.column(name)      # replaces the column; the raw batch keeps its own
+        return frame
@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Rule index
+==========
+
+Every rule of `config/validations/*.json` gets a stable id – its own
+`"id"` or `<topic>/<column>/<position>` – which GXInitializer stores in the
+expectation's `meta` (and streaming rules in their result).  A `RuleIndex`
+maps those ids to everything the correction loop needs, compiled once per
+config version:
+
+    CompiledRule(rule_id, column, rule, handler,
+                 strategy   – a ready CorrectionStrategy instance (or None),
+                 min_value, max_value,
+                 alarm      – True for "RaiseAlarm")
+
+GXInitializer publishes the indexes it compiled together with the suites,
+so the ids in the results and the index always come from the same config
+load; `CorrectionEngine` looks its topic up on every batch.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterator, Mapping, Optional, Sequence, Tuple
+
+from .correction_strategies import CorrectionStrategy, get_strategy, is_valid_strategy
+
+ALARM_HANDLER = "RaiseAlarm"
+
+
+def rule_id(topic: str, column: str, position: int, entry: Optional[Mapping[str, Any]] = None) -> str:
+    """Stable id of the `position`‑th rule listed under `column`."""
+    explicit = entry.get("id") if entry else None
+    return str(explicit) if explicit else f"{topic}/{column}/{position}"
+
+
+def iter_rules(topic: str, rules: Optional[Mapping[str, Sequence[Mapping[str, Any]]]]
+               ) -> Iterator[Tuple[str, str, Mapping[str, Any]]]:
+    """(rule_id, column, entry) for every rule of a topic, in config order."""
+    for column, entries in (rules or {}).items():
+        for position, entry in enumerate(entries or ()):
+            yield rule_id(topic, column, position, entry), column, entry
+
+
+class CompiledRule:
+    """One rule, ready for the correction loop."""
+
+    __slots__ = ("rule_id", "column", "rule", "handler", "strategy", "min_value", "max_value", "alarm")
+
+    def __init__(self, rule_id: str, column: str, entry: Mapping[str, Any]) -> None:
+        params = entry.get("params", {})
+        handler = entry.get("handler")
+        self.rule_id = rule_id
+        self.column: str = params.get("column", column)
+        self.rule: str = entry.get("rule")
+        self.handler: Optional[str] = handler
+        self.strategy: Optional[CorrectionStrategy] = (
+            get_strategy(handler)() if handler and is_valid_strategy(handler) else None)
+        self.min_value = params.get("min_value")
+        self.max_value = params.get("max_value")
+        self.alarm = handler == ALARM_HANDLER
+
+    def __repr__(self) -> str:
+        return f"CompiledRule({self.rule_id!r}, {self.rule!r}, handler={self.handler!r})"
+
+
+class RuleIndex:
+    """rule_id → CompiledRule for one topic of one validation config."""
+
+    def __init__(self, topic: str, rules: Optional[Mapping[str, Sequence[Mapping[str, Any]]]]) -> None:
+        self.topic = topic
+        self._by_id: Dict[str, CompiledRule] = {}
+        self._by_type: Dict[Tuple[str, str], CompiledRule] = {}
+        for rid, column, entry in iter_rules(topic, rules):
+            compiled = CompiledRule(rid, column, entry)
+            self._by_id[rid] = compiled
+            self._by_type.setdefault((compiled.column, compiled.rule), compiled)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, rid: Optional[str]) -> Optional[CompiledRule]:
+        return self._by_id.get(rid)
+
+    def resolve(self, result: Mapping[str, Any]) -> Optional[CompiledRule]:
+        """The rule a validation result belongs to: by its `rule_id`, else the first rule of
+        that type on that column (results of suites built without ids)."""
+        config = result["expectation_config"]
+        meta = config.get("meta") if hasattr(config, "get") else getattr(config, "meta", None)
+        rid = (meta or {}).get("rule_id")
+        if rid is not None:
+            found = self._by_id.get(rid)
+            if found is not None:
+                return found
+        return self._by_type.get((config["kwargs"].get("column"), config["type"]))
+
+
+# ---------------------------------------------------------------------- #
+#  indexes of the current config version
+# ---------------------------------------------------------------------- #
+_current: Dict[str, RuleIndex] = {}
+_lock = threading.Lock()
+
+
+def publish(indexes: Mapping[str, RuleIndex]) -> None:
+    """Replace the indexes of all topics (keyed by `<config_id>_<topic>`)."""
+    global _current
+    with _lock:
+        _current = dict(indexes)
+
+
+def lookup(config_name: str) -> Optional[RuleIndex]:
+    return _current.get(config_name)
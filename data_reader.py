@@ -6,6 +6,13 @@
 
 Subscribe to an MQTT topic and print each incoming message.
 
+With `--measure` it instead matches the pipeline's output (validated and
+alarm topics) with what `data_sender.py` sent, via the injected
+`_run`/`_seq`/`_sent_ts` fields, and reports end‑to‑end latency
+percentiles, throughput over time and missing / duplicated rows.  The
+`--max-*` options turn that report into a pass/fail performance gate
+(exit code 1 on failure).
+
 Configuration order of precedence (highest → lowest):
 1. Command‑line options `--broker` / `--port`
 2. Variables `MQTT_BROKER` and `MQTT_PORT` in a `.env` file that lies in
@@ -16,13 +23,17 @@ Configuration order of precedence (highest → lowest):
 from __future__ import annotations
 
 import argparse
+import json
 import os
 import sys
+import time
 from pathlib import Path
 from paho.mqtt.enums import CallbackAPIVersion
 
 import paho.mqtt.client as mqtt
 
+from loadtest.measurement import GateThresholds, LatencyRecorder, topic_map_from_config
+
 try:
     from dotenv import load_dotenv  # type: ignore
 except ImportError:  # pragma: no cover – optional dep
@@ -49,7 +60,8 @@ def parse_args() -> argparse.Namespace:  # noqa: D401
     parser.add_argument(
         "topic",
         metavar="TOPIC",
-        help="MQTT topic to subscribe to",
+        nargs="*",
+        help="MQTT topic(s) to subscribe to",
     )
     parser.add_argument(
         "--broker",
@@ -65,7 +77,29 @@ def parse_args() -> argparse.Namespace:  # noqa: D401
         metavar="N",
     )
 
-    return parser.parse_args()
+    measure = parser.add_argument_group("measurement mode")
+    measure.add_argument("--measure", action="store_true",
+                         help="Measure end-to-end latency/throughput instead of printing messages")
+    measure.add_argument("--config", default="config/generated_mqtt_config.json", metavar="PATH",
+                         help="MQTT config used to map output topics back to their input topic")
+    measure.add_argument("--all-outputs", action="store_true",
+                         help="Subscribe to every validated/alarm topic of --config")
+    measure.add_argument("--expect", metavar="REPORT",
+                         help="Load generator report (data_sender.py --report), read at the end for the sent counts")
+    measure.add_argument("--run-id", help="Only count messages of this load generator run (data_sender.py --run-id)")
+    measure.add_argument("--duration", type=float, metavar="SECONDS", help="Stop after this many seconds")
+    measure.add_argument("--idle-timeout", type=float, default=10.0, metavar="SECONDS",
+                         help="Stop when nothing arrived for this long (after the first message)")
+    measure.add_argument("--report", metavar="PATH", help="Write the measurement report as JSON")
+    measure.add_argument("--max-p99-ms", type=float, help="Gate: fail if validated p99 latency exceeds this")
+    measure.add_argument("--max-missing", type=int, help="Gate: fail if more rows are missing")
+    measure.add_argument("--max-duplicates", type=int, help="Gate: fail if more rows are duplicated")
+    measure.add_argument("--min-throughput", type=float, help="Gate: fail below this many rows/s")
+
+    args = parser.parse_args()
+    if not args.topic and not (args.measure and args.all_outputs):
+        parser.error("TOPIC is required (or --measure --all-outputs)")
+    return args
 
 
 # ---------------------------------------------------------------------------
@@ -85,7 +119,58 @@ def on_message(_: mqtt.Client, __, msg: mqtt.MQTTMessage) -> None:  # noqa: D401
 # Main ----------------------------------------------------------------------
 # ---------------------------------------------------------------------------
 
-def main() -> None:  # noqa: D401 – imperative
+def _measure(client: mqtt.Client, args: argparse.Namespace) -> int:
+    """Run the measurement loop and return the process exit code."""
+    topic_map = topic_map_from_config(args.config) if Path(args.config).is_file() else {}
+    recorder = LatencyRecorder(topic_map, run_id=args.run_id)
+
+    def on_measure(_: mqtt.Client, __, msg: mqtt.MQTTMessage) -> None:
+        recv_ts = time.time()
+        try:
+            payload = json.loads(msg.payload)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return
+        if isinstance(payload, dict):
+            recorder.observe(msg.topic, payload, recv_ts)
+
+    client.on_message = on_measure
+    topics = list(args.topic) + (list(topic_map) if args.all_outputs else [])
+    for topic in topics:
+        client.subscribe(topic)
+    print(f"Measuring on {', '.join(topics)}. Press Ctrl+C to stop.")
+
+    started = time.time()
+    client.loop_start()
+    try:
+        while True:
+            time.sleep(0.2)
+            now = time.time()
+            if args.duration is not None and now - started >= args.duration:
+                break
+            if recorder.last_recv is not None and now - recorder.last_recv >= args.idle_timeout:
+                break
+    except KeyboardInterrupt:
+        pass
+    client.loop_stop()
+    client.disconnect()
+
+    if args.expect:
+        recorder.load_manifest(args.expect)
+    report = recorder.report()
+    print(LatencyRecorder.format(report))
+    gate = GateThresholds(args.max_p99_ms, args.max_missing, args.max_duplicates, args.min_throughput)
+    failures = LatencyRecorder.check(report, gate)
+    report["gate"] = {"passed": not failures, "failures": failures}
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    for failure in failures:
+        print(f"✗ {failure}", file=sys.stderr)
+    if any(v is not None for v in vars(gate).values()) and not failures:
+        print("✓ Performance gate passed")
+    return 1 if failures else 0
+
+
+def main() -> None:  # noqa: D401 – imperative
     args = parse_args()
 
     client = mqtt.Client(CallbackAPIVersion.VERSION2)
@@ -98,8 +183,12 @@ def main() -> None:  # noqa: D401 – imperative
         print(f"✗ Could not connect: {exc}", file=sys.stderr)
         sys.exit(1)
 
-    client.subscribe(args.topic)
-    print(f"Listening on topic {args.topic}. Press Ctrl+C to quit.")
+    if args.measure:
+        sys.exit(_measure(client, args))
+
+    for topic in args.topic:
+        client.subscribe(topic)
+    print(f"Listening on topic {', '.join(args.topic)}. Press Ctrl+C to quit.")
 
     try:
         client.loop_forever()
@@ -4,7 +4,21 @@
 #!/usr/bin/env python3
 """data_sender.py
 
-Publish each element of a JSON array to an MQTT topic.
+Publish each element of a JSON array (or NDJSON file) to an MQTT topic.
+
+Besides the original one‑message‑per‑`--delay` mode it doubles as a load
+generator (see `loadtest/`):
+
+    --rate N              target rate in msgs/s with absolute‑deadline pacing
+    --connections N       spread publishing over N client connections
+    --source TOPIC=PATH   stream several files to several topics at once
+    --replay-speed X      replay on the records' own time line (`--time-field`)
+                          X times faster than real time
+
+Files are streamed, never loaded as a whole.  Every payload carries the
+trace fields `_run`, `_seq` and `_sent_ts` (disable with `--no-inject`) so
+`data_reader.py --measure` can compute end‑to‑end latency.  A report of
+achieved vs target rate is printed at the end (`--report` writes it as JSON).
 
 Now supports reading the broker host and port from a `.env` file that
 lives in the *same directory* as this script.  Expected variables::
@@ -23,10 +37,9 @@ import argparse
 import json
 import os
 import sys
-import time
 from pathlib import Path
 
-import paho.mqtt.client as mqtt
+from loadtest import LoadGenerator, TopicSource
 
 try:
     # Optional dependency; fall back gracefully if not installed
@@ -66,6 +79,7 @@ def parse_args() -> argparse.Namespace:  # noqa: D401 – *returns* Namespace
 
     parser.add_argument(
         "topic",
+        nargs="?",
         help="MQTT topic that each JSON object will be published to",
     )
     parser.add_argument(
@@ -93,49 +107,119 @@ def parse_args() -> argparse.Namespace:  # noqa: D401 – *returns* Namespace
         type=float,
         default=DEFAULT_DELAY,
         metavar="SECONDS",
-        help="Delay between messages",
+        help="Delay between messages (ignored with --rate / --replay-speed)",
     )
 
-    return parser.parse_args()
+    load = parser.add_argument_group("load generation")
+    load.add_argument(
+        "--source",
+        action="append",
+        default=[],
+        metavar="TOPIC=PATH",
+        help="Additional topic/file pair; may be given several times",
+    )
+    pacing = load.add_mutually_exclusive_group()
+    pacing.add_argument(
+        "--rate",
+        type=float,
+        metavar="MSGS_PER_S",
+        help="Target publish rate across all topics",
+    )
+    pacing.add_argument(
+        "--replay-speed",
+        type=float,
+        metavar="FACTOR",
+        help="Replay in record time (see --time-field), FACTOR times faster",
+    )
+    load.add_argument(
+        "--time-field",
+        default="dateTo",
+        metavar="FIELD",
+        help="Record timestamp used by --replay-speed (e.g. dateTo, dateFrom)",
+    )
+    load.add_argument(
+        "--connections",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Number of concurrent client connections",
+    )
+    load.add_argument("--qos", type=int, choices=(0, 1, 2), default=0, help="Publish QoS")
+    load.add_argument("--count", type=int, metavar="N", help="Stop after N messages")
+    load.add_argument("--duration", type=float, metavar="SECONDS", help="Stop after this many seconds")
+    load.add_argument("--loop", action="store_true", help="Restart the file(s) when exhausted")
+    load.add_argument("--no-inject", action="store_true", help="Do not add the _run/_seq/_sent_ts trace fields")
+    load.add_argument("--run-id", help="Value of the injected _run field (default: random)")
+    load.add_argument("--report", metavar="PATH", help="Write the final report as JSON")
+    load.add_argument("-v", "--verbose", action="store_true", help="Print every published message")
+
+    args = parser.parse_args()
+    if not args.topic and not args.source:
+        parser.error("either TOPIC or at least one --source TOPIC=PATH is required")
+    return args
+
+
+def _sources(args: argparse.Namespace) -> list[TopicSource]:
+    sources = [TopicSource(args.topic, args.file)] if args.topic else []
+    for spec in args.source:
+        topic, sep, path = spec.partition("=")
+        if not sep or not topic or not path:
+            raise ValueError(f"--source expects TOPIC=PATH, got {spec!r}")
+        sources.append(TopicSource(topic, path))
+    for src in sources:
+        if not Path(src.path).expanduser().is_file():
+            raise FileNotFoundError(f"JSON file not found: {src.path}")
+    return sources
 
 
 # ---------------------------------------------------------------------------
 # Main logic
 # ---------------------------------------------------------------------------
 
-def main() -> None:  # noqa: D401 – imperative mood
-    print(DEFAULT_BROKER_ADDRESS, DEFAULT_BROKER_PORT)
+def main() -> None:  # noqa: D401 – imperative mood
     args = parse_args()
 
-    # 1. Connect to broker ---------------------------------------------------
-    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
     try:
-        client.connect(args.broker, args.port, keepalive=60)
-        print(f"✓ Connected to MQTT broker at {args.broker}:{args.port}")
-    except Exception as exc:  # pragma: no cover – connection failure
-        print(f"✗ Could not connect to broker({args.broker}): {exc}", file=sys.stderr)
-        sys.exit(1)
+        sources = _sources(args)
+    except (ValueError, FileNotFoundError) as exc:
+        print(f"✗ {exc}", file=sys.stderr)
+        sys.exit(2)
+
+    # Without --rate / --replay-speed we keep the original behaviour:
+    # one message every --delay seconds, each one printed.
+    legacy = args.rate is None and args.replay_speed is None
+    rate = args.rate if args.rate is not None else (None if args.replay_speed else 1.0 / max(args.delay, 1e-6))
+
+    generator = LoadGenerator(
+        broker=args.broker,
+        port=args.port,
+        sources=sources,
+        rate=rate,
+        speedup=args.replay_speed,
+        time_field=args.time_field,
+        connections=args.connections,
+        qos=args.qos,
+        count=args.count,
+        duration=args.duration,
+        loop=args.loop,
+        inject=not args.no_inject,
+        verbose=args.verbose or legacy,
+        run_id=args.run_id,
+    )
 
-    # 2. Load JSON data ------------------------------------------------------
     try:
-        with Path(args.file).expanduser().open("r", encoding="utf-8") as f:
-            payload = json.load(f)
-    except Exception as exc:  # pragma: no cover – I/O or JSON error
-        print(f"✗ Failed to read JSON file {args.file!r}: {exc}", file=sys.stderr)
+        report = generator.run()
+    except (ConnectionError, OSError) as exc:  # pragma: no cover – connection failure
+        print(f"✗ Could not connect to broker({args.broker}): {exc}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as exc:  # pragma: no cover – malformed input file
+        print(f"✗ Failed to read JSON file: {exc}", file=sys.stderr)
         sys.exit(1)
 
-    if not isinstance(payload, list):
-        print("✗ JSON root must be a *list* of objects", file=sys.stderr)
-        sys.exit(2)
-
-    # 3. Publish -------------------------------------------------------------
-    for item in payload:
-        client.publish(args.topic, json.dumps(item))
-        print(f"→ Published to {args.topic}: {item}")
-        time.sleep(args.delay)
-
-    client.disconnect()
-    print("✓ Finished – connection closed")
+    print(report.format())
+    if args.report:
+        Path(args.report).write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+    print("✓ Finished – connection closed")
 
 
 if __name__ == "__main__":
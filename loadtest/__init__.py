@@ -0,0 +1,16 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# loadtest/__init__.py
+
+# Trace fields injected by the load generator into every payload.  The
+# pipeline passes unknown fields through, so they come back on the
+# validated topic as "<field>.raw" / "<field>.cleaned".
+RUN_FIELD = "_run"
+SEQ_FIELD = "_seq"
+SENT_TS_FIELD = "_sent_ts"
+TRACE_FIELDS = (RUN_FIELD, SEQ_FIELD, SENT_TS_FIELD)
+
+from .sources import iter_records, parse_timestamp
+from .pacing import RatePacer
+from .generator import LoadGenerator, TopicSource, LoadReport
@@ -0,0 +1,148 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Correction copy benchmark
+=========================
+
+Peak memory (tracemalloc) and time of correct → alarm → publish for one
+batch, two ways:
+
+    copy        what `BatchPipeline._process` did before the overlay: a deep
+                copy of the batch, one more copy per corrected column, and
+                the raw and the cleaned frame serialized in full
+    overlay     `CorrectionEngine.overlay`: corrected cells as patches over
+                the raw batch; `ResultPublisher` serializes the raw batch
+                once and the patched columns on top, `SLICE_ROWS` rows at
+                a time
+
+The batch has `--columns` float columns of `--rows` rows; `--corrected`
+of them get `--share` of their cells smoothed.  Messages are serialized
+with `json.dumps` like the MQTT client does, then dropped.  Both ways
+must publish the same messages.
+
+Run::
+
+    python3 -m loadtest.copy_bench --rows 1000 --columns 20 --corrected 2
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+import warnings
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_correction import CorrectionEngine, DataCorrection
+from data_correction.rule_index import RuleIndex
+from mqtt import AlarmPublisher, ResultPublisher
+
+TOPIC = {"publish": {"validated": "bench/out", "alarm": "bench/alarm"}, "timestamp_attribute": "dateTo"}
+
+
+def _batch(rows: int, columns: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    data = {f"v{i}": rng.uniform(0.0, 1.0, rows) for i in range(columns)}
+    data["dateTo"] = [f"2025-06-01T{h % 24:02d}:00:00+00:00" for h in range(rows)]
+    return pd.DataFrame(data)
+
+
+def _setup(df: pd.DataFrame, corrected: int, share: float) -> Tuple[Dict, Dict, CorrectionEngine]:
+    rules, results = {}, []
+    step = max(1, int(round(1 / share)))
+    for i in range(corrected):
+        column = f"v{i}"
+        rows = list(range(i, len(df.index), step))
+        df.loc[rows, column] = 5.0
+        rules[column] = [{"rule": "expect_column_values_to_be_between", "handler": "SmoothingOutliers",
+                          "params": {"column": column, "min_value": 0.0, "max_value": 1.0}}]
+        results.append({"success": False, "result": {"unexpected_index_list": rows},
+                        "expectation_config": {"type": "expect_column_values_to_be_between",
+                                               "kwargs": {"column": column},
+                                               "meta": {"rule_id": f"bench/{column}/0"}}})
+    results.append({"success": False, "result": {"unexpected_index_list": [0]},
+                    "expectation_config": {"type": "expect_column_values_to_not_be_null",
+                                           "kwargs": {"column": "dateTo"}, "meta": {"rule_id": "bench/dateTo/0"}}})
+    rules["dateTo"] = [{"rule": "expect_column_values_to_not_be_null", "handler": "RaiseAlarm",
+                        "params": {"column": "dateTo"}}]
+    engine = CorrectionEngine.__new__(CorrectionEngine)     # rules of the synthetic batch
+    engine._config_name = "bench_bench"
+    engine._own_index = RuleIndex("bench", rules)
+    engine._corrector = DataCorrection()
+    return rules, {"results": results}, engine
+
+
+def _copy_way(engine: CorrectionEngine, results: Dict, df: pd.DataFrame, publish: Callable) -> None:
+    cleaned_df = df.copy()
+    for res in results["results"]:
+        rule = engine._own_index.resolve(res)
+        if rule.strategy is not None:
+            cleaned_df[rule.column] = engine._corrector.correct_column(
+                cleaned_df[rule.column], res["result"]["unexpected_index_list"],
+                strategy=rule.strategy, min=rule.min_value, max=rule.max_value)
+    alarms = [res for res in results["results"] if engine._own_index.resolve(res).alarm]
+    for alarm in alarms:
+        AlarmPublisher(TOPIC, publish).emit(cleaned_df, alarm)
+    # both frames serialized in full, as ResultPublisher did
+    results_out = ResultPublisher(TOPIC, publish)
+    raw_rows = json.loads(df.to_json(orient="records", date_format="iso"))
+    cleaned_rows = json.loads(cleaned_df.to_json(orient="records", date_format="iso"))
+    for idx, (raw_row, cleaned_row) in enumerate(zip(raw_rows, cleaned_rows)):
+        results_out._emit_row(raw_row, cleaned_row, None, idx)
+
+
+def _overlay_way(engine: CorrectionEngine, results: Dict, df: pd.DataFrame, publish: Callable) -> None:
+    cleaned, alarms, _ = engine.overlay(results, df)
+    for alarm in alarms:
+        AlarmPublisher(TOPIC, publish).emit(cleaned, alarm)
+    ResultPublisher(TOPIC, publish).emit(cleaned, df)
+
+
+def _measure(way, engine, results, df, repeat: int) -> Tuple[float, float, List[str]]:
+    sent: List[str] = []
+    way(engine, results, df, lambda _topic, obj: sent.append(json.dumps(obj)))
+    drop = lambda _topic, obj: json.dumps(obj)
+    gc.collect()
+    tracemalloc.start()
+    way(engine, results, df, drop)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        way(engine, results, df, drop)
+        best = min(best, time.perf_counter() - t0)
+    return peak, best, sent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--corrected", type=int, default=2, help="columns with corrected cells")
+    parser.add_argument("--share", type=float, default=0.01, help="share of corrected cells in those columns")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = _batch(args.rows, args.columns)
+    _rules, results, engine = _setup(df, args.corrected, args.share)
+    batch_bytes = df.memory_usage(deep=True).sum()
+    warnings.simplefilter("ignore", FutureWarning)
+
+    measured = {name: _measure(way, engine, results, df, args.repeat)
+                for name, way in (("copy", _copy_way), ("overlay", _overlay_way))}
+    assert measured["copy"][2] == measured["overlay"][2], "overlay publishes different messages"
+
+    print(f"{args.rows} rows × {args.columns + 1} columns ({batch_bytes / 1e6:.2f} MB), "
+          f"{args.corrected} column(s) with {args.share:.0%} corrected cells")
+    for name, (peak, seconds, _sent) in measured.items():
+        print(f"  {name:<8} peak {peak / 1e6:8.2f} MB ({peak / batch_bytes:5.1f}× the batch)  {seconds * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Flattening benchmark
+====================
+
+Builds the batches of a nested feed three ways and compares the time per
+row against building them from the pre‑flattened copy of the same feed:
+
+    flat        `pd.DataFrame(rows)` of ARSO_weather_data_flattened.json
+                (the baseline: what the pipeline did before)
+    normalize   `pd.json_normalize` over every batch of nested rows
+    compiled    the topic's `Flattener` per row, then `pd.DataFrame`
+                (`flatten: true` and a `fields` spec)
+
+It also checks that `flatten: true` gives exactly the rows of the
+flattened file.
+
+Run::
+
+    python3 -m loadtest.flatten_bench --batch-size 50 --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from batch.flattening import from_config
+
+NESTED = "demo_data/ARSO_weather_data.json"
+FLATTENED = "demo_data/ARSO_weather_data_flattened.json"
+
+
+def _per_row(build: Callable[[List[dict]], pd.DataFrame], rows: List[dict],
+             batch_size: int, repeat: int) -> float:
+    batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for batch in batches:
+            build(batch)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(NESTED) as f:
+        nested = json.load(f)
+    with open(FLATTENED) as f:
+        flattened = json.load(f)
+
+    everything = from_config(True)
+    assert [row for n in nested for row in everything(n)] == flattened, "flatten: true differs from the flattened file"
+    fields = from_config({"fields": {"valid": "valid", "domainTitle": "station", "metdata.tavg": "tavg",
+                                     "metdata.rhavg": "rhavg", "/metdata/pavg": "pavg"}})
+
+    def compiled(flattener):
+        return lambda batch: pd.DataFrame([row for payload in batch for row in flattener(payload)])
+
+    results: Dict[str, float] = {
+        "flat (baseline)": _per_row(pd.DataFrame, flattened, args.batch_size, args.repeat),
+        "json_normalize": _per_row(pd.json_normalize, nested, args.batch_size, args.repeat),
+        "compiled, flatten: true": _per_row(compiled(everything), nested, args.batch_size, args.repeat),
+        "compiled, 5 fields": _per_row(compiled(fields), nested, args.batch_size, args.repeat),
+    }
+    flatten_only = _per_row(lambda batch: [everything(p) for p in batch], nested, args.batch_size, args.repeat)
+
+    print(f"{len(nested)} rows, batches of {args.batch_size}")
+    for name, seconds in results.items():
+        print(f"  {name:<26} {seconds * 1e6:8.2f} µs/row")
+    print(f"  {'flattening alone':<26} {flatten_only * 1e6:8.2f} µs/row")
+
+
+if __name__ == "__main__":
+    main()
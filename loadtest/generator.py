@@ -0,0 +1,317 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+LoadGenerator
+=============
+
+Publishes records from one or more files to MQTT at a controlled pace:
+
+    • rate mode    – a fixed target rate in msgs/s across all topics
+    • replay mode  – records are sent on their own time line (`dateTo`,
+                     `dateFrom`, …) compressed by a speed‑up factor
+
+Work is spread over several client connections (one paho client and one
+sender thread each).  Senders pull the next message from a shared,
+pre‑scheduled stream and sleep until its absolute deadline, so the
+schedule does not drift with per‑message overhead.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+
+from . import RUN_FIELD, SEQ_FIELD, SENT_TS_FIELD
+from .pacing import RatePacer, TimestampScaler, sleep_until
+from .sources import iter_records, parse_timestamp
+
+_RESERVOIR = 100_000
+
+
+@dataclass
+class TopicSource:
+    """A file streamed to one MQTT topic."""
+    topic: str
+    path: str
+    fmt: Optional[str] = None
+
+    def timed_records(self, time_field: Optional[str], loop: bool) -> Iterator[Tuple[dict, Optional[float]]]:
+        """Yield `(record, timestamp)`; on repeated passes timestamps are shifted forward."""
+        offset, first, last, gap = 0.0, None, None, 0.0
+        for cycle in itertools.count():
+            emitted = False
+            for record in iter_records(self.path, self.fmt):
+                emitted = True
+                ts = parse_timestamp(record.get(time_field)) if time_field and isinstance(record, dict) else None
+                if ts is not None and cycle == 0:
+                    if first is None:
+                        first = ts
+                    if last is not None and ts > last:
+                        gap = ts - last
+                    last = ts if last is None else max(last, ts)
+                yield record, (None if ts is None else ts + offset)
+            if not loop or not emitted:
+                return
+            if first is not None and last is not None:
+                offset += (last - first) + (gap or 1.0)
+
+
+@dataclass
+class LoadReport:
+    run_id: str
+    mode: str
+    target_rate: Optional[float]
+    connections: int
+    sent: int = 0
+    completed: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    first_send: Optional[float] = None
+    last_send: Optional[float] = None
+    per_topic: Dict[str, int] = field(default_factory=dict)
+    lateness: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def achieved_rate(self) -> float:
+        """Messages per second between the first and the last send."""
+        if self.sent < 2 or self.first_send is None or self.last_send is None:
+            return 0.0
+        span = self.last_send - self.first_send
+        return (self.sent - 1) / span if span > 0 else 0.0
+
+    def _lateness_ms(self, q: float) -> float:
+        if not self.lateness:
+            return 0.0
+        data = sorted(self.lateness)
+        return data[min(len(data) - 1, int(q * len(data)))] * 1000.0
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "mode": self.mode,
+            "connections": self.connections,
+            "target_rate": self.target_rate,
+            "achieved_rate": round(self.achieved_rate, 2),
+            "sent": self.sent,
+            "completed": self.completed,
+            "errors": self.errors,
+            "elapsed_s": round(self.elapsed, 3),
+            "per_topic": self.per_topic,
+            "send_lateness_ms": {
+                "p50": round(self._lateness_ms(0.50), 3),
+                "p99": round(self._lateness_ms(0.99), 3),
+                "max": round(max(self.lateness, default=0.0) * 1000.0, 3),
+            },
+        }
+
+    def format(self) -> str:
+        d = self.to_dict()
+        lines = [
+            f"Run {d['run_id']} ({d['mode']}, {d['connections']} connection(s))",
+            f"  sent       {d['sent']} in {d['elapsed_s']} s, {d['completed']} written to broker, {d['errors']} errors",
+        ]
+        if self.target_rate:
+            pct = 100.0 * self.achieved_rate / self.target_rate
+            lines.append(f"  rate       {d['achieved_rate']} msgs/s achieved vs {self.target_rate:g} target ({pct:.1f}%)")
+        else:
+            lines.append(f"  rate       {d['achieved_rate']} msgs/s achieved")
+        lat = d["send_lateness_ms"]
+        lines.append(f"  lateness   p50 {lat['p50']} ms, p99 {lat['p99']} ms, max {lat['max']} ms")
+        for topic, n in sorted(self.per_topic.items()):
+            lines.append(f"  {topic:<10} {n}")
+        return "\n".join(lines)
+
+
+class _Sender:
+    """One client connection plus its sender thread's local statistics."""
+
+    def __init__(self, client: mqtt.Client) -> None:
+        self.client = client
+        self.sent = 0
+        self.errors = 0
+        self.completed = 0
+        self.first_send: Optional[float] = None
+        self.last_send: Optional[float] = None
+        self.lateness: List[float] = []
+        self.per_topic: Dict[str, int] = {}
+        client.on_publish = self._on_publish
+
+    def _on_publish(self, *args) -> None:
+        self.completed += 1
+
+    def record_lateness(self, value: float) -> None:
+        if len(self.lateness) < _RESERVOIR:
+            self.lateness.append(value)
+        else:
+            j = random.randrange(self.sent)
+            if j < _RESERVOIR:
+                self.lateness[j] = value
+
+
+class LoadGenerator:
+    """Paced multi‑connection, multi‑topic MQTT publisher."""
+
+    def __init__(
+        self,
+        broker: str,
+        port: int,
+        sources: List[TopicSource],
+        rate: Optional[float] = None,
+        speedup: Optional[float] = None,
+        time_field: str = "dateTo",
+        connections: int = 1,
+        qos: int = 0,
+        count: Optional[int] = None,
+        duration: Optional[float] = None,
+        loop: bool = False,
+        inject: bool = True,
+        verbose: bool = False,
+        client_factory: Callable[[], mqtt.Client] | None = None,
+        run_id: Optional[str] = None,
+    ) -> None:
+        if not sources:
+            raise ValueError("at least one topic source is required")
+        if (rate is None) == (speedup is None):
+            raise ValueError("exactly one of rate or speedup must be given")
+        self.broker, self.port = broker, port
+        self.sources = sources
+        self.rate = rate
+        self.speedup = speedup
+        self.time_field = time_field
+        self.connections = max(1, connections)
+        self.qos = qos
+        self.count = count
+        self.duration = duration
+        self.loop = loop
+        self.inject = inject
+        self.verbose = verbose
+        self.run_id = run_id or uuid.uuid4().hex[:8]
+        self._client_factory = client_factory or (lambda: mqtt.Client(mqtt.CallbackAPIVersion.VERSION2))
+        self._lock = threading.Lock()
+        self._stream: Iterator[Tuple[int, str, dict, float]] | None = None
+
+    # ------------------------------------------------------------------ #
+    #  schedule
+    # ------------------------------------------------------------------ #
+    def _tagged(self, source: TopicSource, time_field: Optional[str]):
+        for record, ts in source.timed_records(time_field, self.loop):
+            yield source.topic, record, ts
+
+    def _schedule(self, start: float) -> Iterator[Tuple[int, str, dict, float]]:
+        """Yield `(seq, topic, record, deadline)` in send order."""
+        if self.rate is not None:
+            pacer = RatePacer(self.rate, start)
+            merged = self._round_robin([self._tagged(s, None) for s in self.sources])
+        else:
+            scaler = TimestampScaler(self.speedup, start)
+            merged = heapq.merge(
+                *[self._tagged(s, self.time_field) for s in self.sources],
+                key=lambda item: float("-inf") if item[2] is None else item[2],
+            )
+
+        seqs: Dict[str, itertools.count] = {}
+        for i, (topic, record, ts) in enumerate(merged):
+            if self.count is not None and i >= self.count:
+                return
+            due = pacer.deadline(i) if self.rate is not None else scaler.deadline(ts)
+            if self.duration is not None and due - start > self.duration:
+                return
+            seq = next(seqs.setdefault(topic, itertools.count()))
+            yield seq, topic, record, due
+
+    @staticmethod
+    def _round_robin(streams):
+        active = list(streams)
+        while active:
+            for stream in list(active):
+                try:
+                    yield next(stream)
+                except StopIteration:
+                    active.remove(stream)
+
+    def _next(self):
+        with self._lock:
+            return next(self._stream, None)
+
+    # ------------------------------------------------------------------ #
+    #  run
+    # ------------------------------------------------------------------ #
+    def _payload(self, seq: int, record: dict) -> str:
+        if self.inject and isinstance(record, dict):
+            record = dict(record)
+            record[RUN_FIELD] = self.run_id
+            record[SEQ_FIELD] = seq
+            record[SENT_TS_FIELD] = time.time()
+        return json.dumps(record)
+
+    def _send_loop(self, sender: _Sender) -> None:
+        client = sender.client
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            seq, topic, record, due = item
+            sender.record_lateness(sleep_until(due))
+            info = client.publish(topic, self._payload(seq, record), qos=self.qos)
+            sender.last_send = time.perf_counter()
+            if sender.first_send is None:
+                sender.first_send = sender.last_send
+            sender.sent += 1
+            if info.rc != mqtt.MQTT_ERR_SUCCESS:
+                sender.errors += 1
+            sender.per_topic[topic] = sender.per_topic.get(topic, 0) + 1
+            if self.verbose:
+                print(f"→ Published to {topic}: {record}")
+
+    def run(self, drain_timeout: float = 10.0) -> LoadReport:
+        senders: List[_Sender] = []
+        for _ in range(self.connections):
+            client = self._client_factory()
+            client.connect(self.broker, self.port, keepalive=60)
+            client.loop_start()
+            senders.append(_Sender(client))
+
+        start = time.perf_counter() + 0.05   # let the sender threads get ready
+        self._stream = self._schedule(start)
+        threads = [threading.Thread(target=self._send_loop, args=(s,), daemon=True) for s in senders]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        # wait until everything handed to paho was written to the broker
+        deadline = time.monotonic() + drain_timeout
+        while time.monotonic() < deadline and any(s.completed < s.sent - s.errors for s in senders):
+            time.sleep(0.01)
+        for s in senders:
+            s.client.loop_stop()
+            s.client.disconnect()
+
+        report = LoadReport(
+            run_id=self.run_id,
+            mode="rate" if self.rate is not None else f"replay x{self.speedup:g}",
+            target_rate=self.rate,
+            connections=self.connections,
+            elapsed=elapsed,
+        )
+        for s in senders:
+            report.sent += s.sent
+            report.completed += s.completed
+            report.errors += s.errors
+            report.lateness.extend(s.lateness)
+            if s.first_send is not None:
+                report.first_send = min(report.first_send or s.first_send, s.first_send)
+                report.last_send = max(report.last_send or s.last_send, s.last_send)
+            for topic, n in s.per_topic.items():
+                report.per_topic[topic] = report.per_topic.get(topic, 0) + n
+        return report
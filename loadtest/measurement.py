@@ -0,0 +1,209 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+End‑to‑end measurement
+======================
+
+Matches messages coming out of the pipeline with what the load generator
+sent, using the injected trace fields:
+
+    • validated rows carry   `_run.raw`, `_seq.raw`, `_sent_ts.raw`
+    • alarms carry           `_run`, `_seq`, `_sent_ts`
+
+and reports end‑to‑end latency percentiles, throughput over time and
+missing / duplicated rows.  With `check()` the report becomes a pass/fail
+performance gate.
+"""
+from __future__ import annotations
+
+import json
+import time
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import RUN_FIELD, SEQ_FIELD, SENT_TS_FIELD
+
+VALIDATED = "validated"
+ALARM = "alarm"
+PERCENTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def topic_map_from_config(path: str | Path) -> Dict[str, Tuple[str, str]]:
+    """Map each publish topic of an MQTT config to `(source_topic, kind)`."""
+    cfg = json.loads(Path(path).read_text(encoding="utf-8"))
+    out: Dict[str, Tuple[str, str]] = {}
+    for name, topic_cfg in cfg.get("topics", {}).items():
+        source = topic_cfg.get("subscribe", name)
+        publish = topic_cfg.get("publish", {})
+        if publish.get("validated"):
+            out[publish["validated"]] = (source, VALIDATED)
+        if publish.get("alarm"):
+            out[publish["alarm"]] = (source, ALARM)
+    return out
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+@dataclass
+class GateThresholds:
+    max_p99_ms: Optional[float] = None
+    max_missing: Optional[int] = None
+    max_duplicates: Optional[int] = None
+    min_throughput: Optional[float] = None
+
+
+class LatencyRecorder:
+    """Collects per‑message observations; cheap enough to run in the MQTT callback."""
+
+    def __init__(
+        self,
+        topic_map: Optional[Dict[str, Tuple[str, str]]] = None,
+        run_id: Optional[str] = None,
+        expected: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self._topic_map = topic_map or {}
+        self.run_id = run_id
+        self.expected = expected or {}
+        self.latencies: Dict[str, array] = {VALIDATED: array("d"), ALARM: array("d")}
+        self.seen: Dict[str, Counter] = defaultdict(Counter)         # source topic → seq counts (validated)
+        self.alarm_seen: Dict[str, Counter] = defaultdict(Counter)   # source topic → (seq, type) counts
+        self.per_second: Counter = Counter()
+        self.untraced = 0
+        self.other_runs = 0
+        self.first_recv: Optional[float] = None
+        self.last_recv: Optional[float] = None
+
+    def load_manifest(self, path: str | Path) -> None:
+        """
+        Take the sent counts from a load generator report (`data_sender.py
+        --report`).  The report is usually written after the reader started,
+        so it is read at the end; filter on the run with `run_id` up front.
+        """
+        report = json.loads(Path(path).read_text(encoding="utf-8"))
+        self.expected = report.get("per_topic", {})
+        if self.run_id is None:
+            self.run_id = report.get("run_id")
+
+    # ------------------------------------------------------------------ #
+    #  ingest
+    # ------------------------------------------------------------------ #
+    def observe(self, topic: str, payload: dict, recv_ts: Optional[float] = None) -> None:
+        recv_ts = time.time() if recv_ts is None else recv_ts
+        source, kind = self._topic_map.get(topic, (topic, None))
+
+        if f"{SEQ_FIELD}.raw" in payload:
+            kind = kind or VALIDATED
+            run, seq, sent = (payload.get(f"{RUN_FIELD}.raw"), payload.get(f"{SEQ_FIELD}.raw"),
+                              payload.get(f"{SENT_TS_FIELD}.raw"))
+        elif SEQ_FIELD in payload:
+            kind = kind or ALARM
+            run, seq, sent = payload.get(RUN_FIELD), payload.get(SEQ_FIELD), payload.get(SENT_TS_FIELD)
+        else:
+            self.untraced += 1
+            return
+        if self.run_id is not None and run != self.run_id:
+            self.other_runs += 1
+            return
+        if seq is None or sent is None:
+            self.untraced += 1
+            return
+
+        if self.first_recv is None:
+            self.first_recv = recv_ts
+        self.last_recv = recv_ts
+        self.latencies[kind].append(recv_ts - float(sent))
+        if kind == VALIDATED:
+            self.seen[source][int(seq)] += 1
+            self.per_second[int(recv_ts - self.first_recv)] += 1
+        else:
+            self.alarm_seen[source][(int(seq), payload.get("type"))] += 1
+
+    # ------------------------------------------------------------------ #
+    #  report
+    # ------------------------------------------------------------------ #
+    def report(self) -> dict:
+        latency = {}
+        for kind, values in self.latencies.items():
+            data = sorted(values)
+            latency[kind] = {
+                "count": len(data),
+                **{f"p{q * 100:g}_ms": round(_percentile(data, q) * 1000.0, 3) for q in PERCENTILES},
+                "max_ms": round((data[-1] if data else 0.0) * 1000.0, 3),
+            }
+
+        topics = {}
+        for source in sorted(set(self.seen) | set(self.expected)):
+            counts = self.seen.get(source, Counter())
+            expected = self.expected.get(source)
+            upper = expected if expected is not None else (max(counts) + 1 if counts else 0)
+            missing = [s for s in range(upper) if s not in counts]
+            duplicates = sum(c - 1 for c in counts.values() if c > 1)
+            alarm_dups = sum(c - 1 for c in self.alarm_seen.get(source, Counter()).values() if c > 1)
+            topics[source] = {
+                "expected": expected,
+                "received": len(counts),
+                "missing": len(missing),
+                "missing_sample": missing[:20],
+                "duplicates": duplicates,
+                "alarms": sum(self.alarm_seen.get(source, Counter()).values()),
+                "alarm_duplicates": alarm_dups,
+            }
+
+        span = (self.last_recv - self.first_recv) if self.first_recv is not None else 0.0
+        received = sum(len(c) for c in self.seen.values())
+        return {
+            "run_id": self.run_id,
+            "latency": latency,
+            "throughput": {
+                "rows_per_s": round(received / span, 2) if span > 0 else 0.0,
+                "timeline": [self.per_second.get(s, 0) for s in range(int(span) + 1)] if self.first_recv else [],
+            },
+            "topics": topics,
+            "untraced": self.untraced,
+            "other_runs": self.other_runs,
+        }
+
+    @staticmethod
+    def format(report: dict) -> str:
+        lines = [f"Run {report['run_id'] or '(any)'}"]
+        for kind, lat in report["latency"].items():
+            if lat["count"]:
+                pct = ", ".join(f"{k.removesuffix('_ms')} {v} ms" for k, v in lat.items() if k.endswith("_ms"))
+                lines.append(f"  {kind:<9} latency over {lat['count']}: {pct}")
+        tp = report["throughput"]
+        lines.append(f"  throughput {tp['rows_per_s']} rows/s; per second: {tp['timeline']}")
+        for source, t in report["topics"].items():
+            lines.append(
+                f"  {source:<12} received {t['received']}/{t['expected'] if t['expected'] is not None else '?'}"
+                f", missing {t['missing']}, duplicates {t['duplicates']}"
+                f", alarms {t['alarms']} ({t['alarm_duplicates']} duplicated)"
+            )
+            if t["missing_sample"]:
+                lines.append(f"               first missing seq: {t['missing_sample']}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def check(report: dict, gate: GateThresholds) -> List[str]:
+        """Return the list of violated thresholds (empty = gate passed)."""
+        failures = []
+        p99 = report["latency"][VALIDATED]["p99_ms"]
+        missing = sum(t["missing"] for t in report["topics"].values())
+        duplicates = sum(t["duplicates"] for t in report["topics"].values())
+        if gate.max_p99_ms is not None and p99 > gate.max_p99_ms:
+            failures.append(f"p99 latency {p99} ms > {gate.max_p99_ms} ms")
+        if gate.max_missing is not None and missing > gate.max_missing:
+            failures.append(f"{missing} missing rows > {gate.max_missing}")
+        if gate.max_duplicates is not None and duplicates > gate.max_duplicates:
+            failures.append(f"{duplicates} duplicated rows > {gate.max_duplicates}")
+        rate = report["throughput"]["rows_per_s"]
+        if gate.min_throughput is not None and rate < gate.min_throughput:
+            failures.append(f"throughput {rate} rows/s < {gate.min_throughput} rows/s")
+        return failures
@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Pacing helpers.
+
+Send times are computed on an *absolute* schedule (start + offset) rather
+than by sleeping a fixed delay after each message, so per‑message overhead
+never accumulates as drift.  The last stretch before a deadline is spun
+instead of slept, because `time.sleep` overshoots by up to a scheduler
+tick on most platforms.
+"""
+from __future__ import annotations
+
+import time
+
+# Below this remaining time we spin instead of sleeping.
+SPIN_THRESHOLD = 0.0005
+
+
+def sleep_until(deadline: float) -> float:
+    """Block until `time.perf_counter() >= deadline`; return the lateness in seconds."""
+    while True:
+        now = time.perf_counter()
+        remaining = deadline - now
+        if remaining <= 0:
+            return -remaining
+        if remaining > SPIN_THRESHOLD:
+            time.sleep(remaining - SPIN_THRESHOLD)
+
+
+class RatePacer:
+    """Hands out evenly spaced send deadlines for a target rate in msgs/s."""
+
+    def __init__(self, rate: float, start: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.interval = 1.0 / rate
+        self.start = time.perf_counter() if start is None else start
+
+    def deadline(self, index: int) -> float:
+        """Deadline of the `index`‑th message (0‑based)."""
+        return self.start + index * self.interval
+
+
+class TimestampScaler:
+    """
+    Maps record timestamps to send deadlines: a record that is `Δ` seconds
+    after the first one is sent `Δ / speedup` seconds after the start.
+    """
+
+    def __init__(self, speedup: float, start: float | None = None) -> None:
+        if speedup <= 0:
+            raise ValueError("speedup must be > 0")
+        self.speedup = speedup
+        self.start = time.perf_counter() if start is None else start
+        self._origin: float | None = None
+        self._last = self.start
+
+    def deadline(self, record_ts: float | None) -> float:
+        """Deadline for a record; records without a usable timestamp follow the previous one."""
+        if record_ts is None:
+            return self._last
+        if self._origin is None:
+            self._origin = record_ts
+        self._last = max(self._last, self.start + (record_ts - self._origin) / self.speedup)
+        return self._last
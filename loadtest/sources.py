@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Streaming record sources for the load generator.
+
+Both formats are read incrementally, so arbitrarily large files never have
+to fit into memory:
+
+    • JSON array  – `[ {...}, {...}, ... ]` (the format of `demo_data/`)
+    • NDJSON      – one JSON object per line (`.ndjson` / `.jsonl`)
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+_CHUNK = 1 << 16
+_WS = " \t\r\n"
+
+
+def _iter_ndjson(fh) -> Iterator[Any]:
+    for line in fh:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _iter_json_array(fh) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    buf = fh.read(_CHUNK).lstrip(_WS)
+    if not buf.startswith("["):
+        raise ValueError("JSON root must be a *list* of objects")
+    pos, eof = 1, False
+
+    while True:
+        # skip whitespace and separators, refilling the buffer as needed
+        while True:
+            while pos < len(buf) and buf[pos] in _WS + ",":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            chunk = fh.read(_CHUNK)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+
+        if pos >= len(buf):
+            raise ValueError("Unexpected end of JSON array")
+        if buf[pos] == "]":
+            return
+
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = fh.read(_CHUNK)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        # a value that ends exactly at the buffer edge may be a truncated number
+        if end == len(buf) and not eof:
+            chunk = fh.read(_CHUNK)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield obj
+        pos = end
+        if pos > _CHUNK:
+            buf, pos = buf[pos:], 0
+
+
+def iter_records(path: str | Path, fmt: Optional[str] = None) -> Iterator[dict]:
+    """
+    Stream the records of a JSON‑array or NDJSON file.
+
+    `fmt` is "json" or "ndjson"; if omitted it is derived from the file
+    extension, falling back to sniffing the first non‑blank character.
+    """
+    p = Path(path).expanduser()
+    if fmt is None and p.suffix.lower() in (".ndjson", ".jsonl"):
+        fmt = "ndjson"
+    with p.open("r", encoding="utf-8") as fh:
+        if fmt is None:
+            head = fh.read(_CHUNK).lstrip(_WS)
+            fh.seek(0)
+            fmt = "json" if head.startswith("[") else "ndjson"
+        yield from (_iter_json_array(fh) if fmt == "json" else _iter_ndjson(fh))
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Best‑effort conversion of a record timestamp to POSIX seconds (naive = UTC)."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) / 1000.0 if value > 1e11 else float(value)  # epoch ms vs s
+    if isinstance(value, (list, tuple)):
+        try:
+            dt = datetime(*value)
+        except (TypeError, ValueError):
+            return None
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
@@ -0,0 +1,289 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+MQTT transport benchmark
+========================
+
+Compares the paho‑thread transport (`MqttClient`) with the asyncio
+transport (`AsyncMqttClient`) against a running broker:
+
+    receive   – a publisher in another process floods `--messages` payloads;
+                time from the first to the last message delivered to a
+                listener, and this process's CPU time per message (the rate
+                is often capped by the broker, the CPU time is not)
+    publish   – the transport publishes `--messages` payloads; time until
+                all of them were written to the broker connection
+
+Run::
+
+    python3 -m loadtest.transport_bench --broker localhost --port 1883 --messages 20000
+    python3 -m loadtest.transport_bench --synthetic --messages 50000
+
+`--synthetic` replaces the broker by a minimal stand‑in in a separate
+process that answers CONNECT / SUBSCRIBE and writes pre‑encoded PUBLISH
+packets as fast as the socket takes them, so the numbers reflect the
+transports rather than the broker (use it on small machines, where a real
+broker competes for the same cores).
+
+The per‑message log events of both clients are sampled DEBUG records
+(`monitoring/log.py`), so at the default level they cost a level check.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import paho.mqtt.client as mqtt
+from paho.mqtt.enums import CallbackAPIVersion
+
+from monitoring.metrics import MQTT_PUBLISH_COMPLETED
+from mqtt import AsyncMqttClient, MqttClient
+
+_PAYLOAD = {"stationId": "E403", "dateFrom": "2025-06-01T00:00:00", "co": 0.2, "no2": 17, "o3": 78}
+
+
+class _Counter:
+    """Listener that records when the first and the n‑th message arrived."""
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.count = 0
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+        self.done = threading.Event()
+
+    def __call__(self, topic: str, payload: dict) -> None:
+        now = time.perf_counter()
+        if self.first is None:
+            self.first = now
+        self.count += 1
+        if self.count == self.n:
+            self.last = now
+            self.done.set()
+
+    def rate(self) -> float:
+        if self.first is None or self.last is None or self.last <= self.first:
+            return float("nan")
+        return (self.count - 1) / (self.last - self.first)
+
+
+def _flood(broker: str, port: int, topic: str, n: int) -> None:
+    """Publish `n` messages from an independent client (QoS 1, so the broker does not drop them)."""
+    client = mqtt.Client(CallbackAPIVersion.VERSION2)
+    client.max_inflight_messages_set(1000)
+    client.connect(broker, port)
+    client.loop_start()
+    data = json.dumps(_PAYLOAD)
+    infos = [client.publish(topic, data, qos=1) for _ in range(n)]
+    for info in infos:
+        info.wait_for_publish(timeout=60)
+    client.loop_stop()
+    client.disconnect()
+
+
+def _flood_in_subprocess(broker: str, port: int, topic: str, n: int) -> None:
+    proc = multiprocessing.get_context("spawn").Process(target=_flood, args=(broker, port, topic, n))
+    proc.start()
+    proc.join()
+
+
+# ---------------------------------------------------------------------------
+#  synthetic broker
+# ---------------------------------------------------------------------------
+_FLOOD_COMMAND = b"F"     # first byte of a control connection (never a valid MQTT packet type)
+
+
+def _remaining_length(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        n, byte = divmod(n, 128)
+        out.append(byte | 0x80 if n else byte)
+        if not n:
+            return bytes(out)
+
+
+def _publish_packet(topic: str, payload: bytes) -> bytes:
+    t = topic.encode("utf-8")
+    body = struct.pack("!H", len(t)) + t + payload
+    return b"\x30" + _remaining_length(len(body)) + body
+
+
+def _read_packet(conn: socket.socket, first: bytes):
+    length, shift = 0, 0
+    while True:
+        byte = conn.recv(1)[0]
+        length |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            break
+    data = bytearray()
+    while len(data) < length:
+        chunk = conn.recv(length - len(data))
+        if not chunk:
+            raise ConnectionError
+        data += chunk
+    return first[0] >> 4, bytes(data)
+
+
+def _fake_broker(port: int, n: int, ready) -> None:
+    """CONNACK / SUBACK every client; a control connection makes it write `n` PUBLISHes to all subscribers."""
+    server = socket.create_server(("127.0.0.1", port), reuse_port=False)
+    ready.set()
+    subscribers: List[tuple] = []
+    payload = json.dumps(_PAYLOAD).encode("utf-8")
+
+    def serve(conn: socket.socket) -> None:
+        try:
+            first = conn.recv(1)
+            if first == _FLOOD_COMMAND:
+                for sub, topic in list(subscribers):
+                    sub.sendall(_publish_packet(topic, payload) * n)
+                conn.close()
+                return
+            while first:
+                kind, data = _read_packet(conn, first)
+                if kind == 1:                                    # CONNECT
+                    conn.sendall(b"\x20\x02\x00\x00")
+                elif kind == 8:                                  # SUBSCRIBE
+                    topic_len = struct.unpack_from("!H", data, 2)[0]
+                    subscribers.append((conn, data[4:4 + topic_len].decode("utf-8")))
+                    conn.sendall(b"\x90\x03" + data[:2] + b"\x00")
+                elif kind == 12:                                 # PINGREQ
+                    conn.sendall(b"\xd0\x00")
+                elif kind == 14:                                 # DISCONNECT
+                    break
+                first = conn.recv(1)                             # PUBLISH etc. are discarded
+        except (ConnectionError, OSError, IndexError):
+            pass
+        finally:
+            subscribers[:] = [s for s in subscribers if s[0] is not conn]
+            conn.close()
+
+    while True:
+        conn, _ = server.accept()
+        threading.Thread(target=serve, args=(conn,), daemon=True).start()
+
+
+def _trigger_flood(broker: str, port: int, topic: str, n: int) -> None:
+    with socket.create_connection((broker, port)) as conn:
+        conn.sendall(_FLOOD_COMMAND)
+
+
+def _wait_published(before: float, n: int, timeout: float) -> float:
+    completed = MQTT_PUBLISH_COMPLETED.labels()
+    deadline = time.perf_counter() + timeout
+    while completed.value() - before < n and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    return time.perf_counter()
+
+
+# ---------------------------------------------------------------------------
+#  paho thread transport
+# ---------------------------------------------------------------------------
+def bench_thread(broker: str, port: int, n: int, timeout: float, flood=_flood_in_subprocess) -> Dict[str, float]:
+    topic = f"ds2/bench/{uuid.uuid4().hex[:8]}"
+    client = MqttClient(broker, port)
+    counter = _Counter(n)
+    client.add_listener(counter)
+    client.subscribe(topic)
+    time.sleep(0.5)
+    cpu0 = time.process_time()
+    flood(broker, port, topic, n)
+    counter.done.wait(timeout)
+    rx_cpu = time.process_time() - cpu0
+
+    before = MQTT_PUBLISH_COMPLETED.labels().value()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        client.publish(topic + "/out", _PAYLOAD)
+    t1 = _wait_published(before, n, timeout)
+    client.stop()
+    return {"receive_msgs_per_s": counter.rate(), "received": counter.count,
+            "receive_cpu_us": rx_cpu / max(counter.count, 1) * 1e6,
+            "publish_msgs_per_s": n / (t1 - t0)}
+
+
+# ---------------------------------------------------------------------------
+#  asyncio transport
+# ---------------------------------------------------------------------------
+async def _bench_async(broker: str, port: int, n: int, timeout: float, flood) -> Dict[str, float]:
+    loop = asyncio.get_running_loop()
+    topic = f"ds2/bench/{uuid.uuid4().hex[:8]}"
+    client = AsyncMqttClient(broker, port, loop=loop)
+    counter = _Counter(n)
+    client.add_listener(counter)
+    client.start()
+    await client.wait_connected(timeout=10)
+    await client.subscribe_async(topic)
+    cpu0 = time.process_time()
+    await loop.run_in_executor(None, flood, broker, port, topic, n)
+    await loop.run_in_executor(None, counter.done.wait, timeout)
+    rx_cpu = time.process_time() - cpu0
+
+    before = MQTT_PUBLISH_COMPLETED.labels().value()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        client.publish(topic + "/out", _PAYLOAD)
+    t1 = await loop.run_in_executor(None, _wait_published, before, n, timeout)
+    await client.aclose()
+    return {"receive_msgs_per_s": counter.rate(), "received": counter.count,
+            "receive_cpu_us": rx_cpu / max(counter.count, 1) * 1e6,
+            "publish_msgs_per_s": n / (t1 - t0)}
+
+
+def bench_asyncio(broker: str, port: int, n: int, timeout: float, flood=_flood_in_subprocess) -> Dict[str, float]:
+    return asyncio.run(_bench_async(broker, port, n, timeout, flood))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Compare MQTT transports (paho thread vs asyncio).")
+    p.add_argument("--broker", default=os.getenv("BROKER", "localhost"))
+    p.add_argument("--port", type=int, default=int(os.getenv("PORT", 1883)))
+    p.add_argument("--messages", "-n", type=int, default=20_000)
+    p.add_argument("--rounds", type=int, default=3, help="Runs per transport; the best is reported")
+    p.add_argument("--timeout", type=float, default=120.0)
+    p.add_argument("--synthetic", action="store_true", help="Use a minimal in-house broker stand-in instead of --broker")
+    p.add_argument("--synthetic-port", type=int, default=18883)
+    args = p.parse_args(argv)
+
+    flood, broker_proc = _flood_in_subprocess, None
+    if args.synthetic:
+        ctx = multiprocessing.get_context("spawn")
+        ready = ctx.Event()
+        broker_proc = ctx.Process(target=_fake_broker, args=(args.synthetic_port, args.messages, ready), daemon=True)
+        broker_proc.start()
+        ready.wait(30)
+        args.broker, args.port, flood = "127.0.0.1", args.synthetic_port, _trigger_flood
+
+    results: Dict[str, List[Dict[str, float]]] = {"thread": [], "asyncio": []}
+    try:
+        for _ in range(args.rounds):
+            for name, bench in (("thread", bench_thread), ("asyncio", bench_asyncio)):
+                results[name].append(bench(args.broker, args.port, args.messages, args.timeout, flood))
+    finally:
+        if broker_proc is not None:
+            broker_proc.terminate()
+
+    print(f"{'transport':<10} {'receive msg/s':>14} {'receive CPU µs/msg':>19} {'publish msg/s':>14}  received")
+    for name, runs in results.items():
+        best_rx = max(r["receive_msgs_per_s"] for r in runs)
+        best_cpu = min(r["receive_cpu_us"] for r in runs)
+        best_tx = max(r["publish_msgs_per_s"] for r in runs)
+        received = min(r["received"] for r in runs)
+        print(f"{name:<10} {best_rx:>14.0f} {best_cpu:>19.1f} {best_tx:>14.0f}  {received}/{args.messages}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
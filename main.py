@@ -3,60 +3,115 @@
 
 """
 Module for handling MQTT messages and processing them into queues.
+
+Startup is staged so the HTTP server is up (`/ready`, `/metrics`) before
+the expensive part has finished:
+
+    1. import only the light modules and start uvicorn
+    2. in a background thread started from the app's lifespan: import
+       GX / pandas, build the expectation suites, connect MQTT and create
+       the pipelines
+    3. `GET /ready` turns 200 once step 2 is done
+
+Set `DS2_STARTUP_TRACE=1` to print the phase and import breakdown.
+Logging is configured from `DS2_LOG_*` (see `monitoring/log.py`).
+
+`DS2_MQTT_TRANSPORT=asyncio` runs MQTT on uvicorn's event loop instead of
+paho's network thread; full batches are then processed on one worker
+thread per pipeline.  With `DS2_SCHEDULER_WORKERS=N` full batches of all
+topics go to a shared scheduler with N worker threads instead, which
+orders them by each topic's `"schedule"` (see `batch/scheduler.py`).
+
+With `DS2_CLUSTER_WORKERS` ≥ 2 the process is one worker of a cluster
+(see `run_cluster.py` and `cluster/`): it listens on
+`DS2_HTTP_PORT + DS2_WORKER_INDEX` and only processes what it owns.
 """
 import os
-import time
-from batch.batch_pipeline import BatchPipeline
-from mqtt import MqttClient, MqttPublisher 
-from dotenv import load_dotenv
-from validation import GXInitializer
-import paho.mqtt.client as mqtt
-import uvicorn
-from batch import PipelineManager
-from api.api_server import app
+
+from monitoring.startup_trace import STARTUP
+from monitoring.log import configure_logging, get_logger
+
+STARTUP.install_import_hook()
+
+with STARTUP.phase("import api"):
+    from dotenv import load_dotenv
+    import uvicorn
+    from api.api_server import app
+    from cluster import ClusterConfig
 
 load_dotenv(override=True)
+configure_logging()
+log = get_logger("main")
 
 # Configuration via environment variables
 BROKER = os.getenv("BROKER", "localhost")  # Address of the MQTT broker
 PORT = int(os.getenv("PORT", 1883))        # Port to connect to the MQTT broker
- 
-def main():
-   # any one-time initialization
-    gx_initializer = GXInitializer()
+CLUSTER = ClusterConfig.from_env()         # None outside cluster mode
+TRANSPORT = os.getenv("DS2_MQTT_TRANSPORT", "thread")   # "thread" (paho loop_start) or "asyncio"
 
-    # --- MQTT setup ---
-    client: MqttClient | None = None
-    client = MqttClient(broker=BROKER, port=PORT)
 
-    
+def bootstrap(app) -> None:
+    """Everything that is not needed to answer HTTP requests; runs after uvicorn started."""
+    try:
+        with STARTUP.phase("import pipeline modules"):
+            from batch import BatchPipeline, PipelineManager
+            from batch.scheduler import from_env as scheduler_from_env
+            from mqtt import AsyncMqttClient, MqttClient, MqttPublisher
+            from validation import GXInitializer
+            from cluster import ClusterRouter
+
+        # any one-time initialization
+        with STARTUP.phase("build GX suites"):
+            # workers on one host must not rebuild the same file-based GX project
+            app.state.gx = GXInitializer(f"./validation/workers/{CLUSTER.index}") if CLUSTER else GXInitializer()
+
+        # --- MQTT setup ---
+        with STARTUP.phase("connect MQTT"):
+            if TRANSPORT == "asyncio":
+                client = AsyncMqttClient(broker=BROKER, port=PORT, loop=app.state.loop)
+                client.start()
+                # listeners run on the event loop; keep validation off it
+                BatchPipeline.set_offload(True)
+            else:
+                client = MqttClient(broker=BROKER, port=PORT)
+
+        # weighted fair scheduling of batch work across topics (opt-in)
+        scheduler = scheduler_from_env()
+        if scheduler is not None:
+            BatchPipeline.set_scheduler(scheduler)
 
-    if  client:
         # hook up your ResultHandler to publish back over MQTT
         publisher = MqttPublisher(client)
         BatchPipeline.set_default_publisher(publisher.publish)
 
         # --- PipelineManager (wires pipelines into the MQTT client) ---
-        manager = PipelineManager(
-            cfg_path="./config",
-            mqtt_client=client
-        )
+        with STARTUP.phase("create pipelines"):
+            manager = PipelineManager(
+                cfg_path="./config",
+                mqtt_client=client,
+                cluster=ClusterRouter(CLUSTER, client) if CLUSTER else None,
+            )
 
-    else:
-        manager = None
+        app.state.mqtt_client = client
+        app.state.manager = manager
+        STARTUP.mark_ready()
+    except Exception as e:
+        STARTUP.mark_failed(e)
+        log.error("✖ Startup failed: %s", e, exc_info=True)
+        raise
 
-    # --- API server setup ---#
-    app.state.manager = manager
-    app.state.gx = gx_initializer
 
-    
+def main():
+    # --- API server setup ---#
+    # manager/gx are filled in by `bootstrap` once the server is up
+    app.state.bootstrap = bootstrap
+    app.state.cluster = CLUSTER
 
     # launch the HTTP server
-    uvicorn.run(app, host="0.0.0.0", port=8000)
-
-
-    # start listening into MQTT (non-blocking)
-    client and client.start()
+    port = CLUSTER.http_port if CLUSTER else int(os.getenv("DS2_HTTP_PORT", 8000))
+    if CLUSTER:
+        log.info("✓ Cluster worker %d/%d (group '%s') on port %d", CLUSTER.index + 1, CLUSTER.workers, CLUSTER.group, port)
+    uvicorn.run(app, host="0.0.0.0", port=port)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,8 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# monitoring/__init__.py
+
+from .metrics import REGISTRY, CONTENT_TYPE, MetricsRegistry, Counter, Gauge, Histogram, PipelineMetrics
+from .profiler import ProfileSession, PROFILE_MODES
+from .log import get_logger, hot_path, configure_logging, HotPathEvent, StructuredFormatter
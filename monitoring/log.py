@@ -0,0 +1,210 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Structured logging
+==================
+
+All service loggers live under `ds2.` and go through one bounded queue:
+the thread that logs only checks the level and enqueues the record;
+formatting (message, field reprs, truncation, JSON) and the write happen
+on a listener thread.  When the queue is full, records are dropped and
+counted in `ds2_log_records_dropped_total` instead of blocking.
+
+Per‑message events on hot paths are `HotPathEvent`s: DEBUG records with a
+per‑event sampling rate, so e.g. 1 in 1000 received messages is logged::
+
+    _RECEIVED = hot_path("mqtt.receive", __name__)
+    _RECEIVED("📬 message received", topic=msg.topic, payload=msg.payload)
+
+Environment (read by `configure_logging`):
+
+    DS2_LOG_LEVEL        INFO (default), DEBUG, WARNING, …
+    DS2_LOG_FORMAT       text (default) or json
+    DS2_LOG_SAMPLE       event rates, e.g. "mqtt.receive=0.001,pipeline.add=0"
+                         (1 = every record, 0 = never; default 1)
+    DS2_LOG_FIELD_MAX    characters kept per field value (default 200)
+"""
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from .metrics import LOG_RECORDS_DROPPED
+
+ROOT = "ds2"
+DEFAULT_FIELD_MAX = 200
+
+_EVENTS: Dict[str, "HotPathEvent"] = {}
+_RATES: Dict[str, float] = {}
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger below `ds2.` (pass `__name__`)."""
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+# ---------------------------------------------------------------------- #
+#  sampled hot-path events
+# ---------------------------------------------------------------------- #
+class HotPathEvent:
+    """A sampled DEBUG record; calling it is a level check and a counter when disabled."""
+
+    __slots__ = ("name", "_logger", "_every", "_counter")
+
+    def __init__(self, name: str, logger: logging.Logger, rate: float = 1.0) -> None:
+        self.name = name
+        self._logger = logger
+        self.set_rate(rate)
+
+    def set_rate(self, rate: float) -> None:
+        self._every = 0 if rate <= 0 else max(1, round(1.0 / min(rate, 1.0)))
+        self._counter = itertools.count()
+
+    def __call__(self, msg: str, **fields: Any) -> None:
+        every = self._every
+        if not every or not self._logger.isEnabledFor(logging.DEBUG):
+            return
+        if every > 1 and next(self._counter) % every:
+            return
+        self._logger.debug(msg, extra={"event": self.name, "fields": fields})
+
+
+def hot_path(event: str, logger_name: str) -> HotPathEvent:
+    """Module‑level handle for a sampled event; its rate comes from DS2_LOG_SAMPLE."""
+    handle = _EVENTS.get(event)
+    if handle is None:
+        handle = _EVENTS[event] = HotPathEvent(event, get_logger(logger_name), _RATES.get(event, 1.0))
+    return handle
+
+
+# ---------------------------------------------------------------------- #
+#  formatting (listener thread)
+# ---------------------------------------------------------------------- #
+def _short(value: Any, limit: int) -> str:
+    """`value` as text, cut to `limit` characters (the suffix counts what was cut)."""
+    try:
+        if isinstance(value, (bytes, bytearray)):
+            # decode only the head; a large payload is never copied as a whole
+            text = bytes(value[:limit * 4]).decode("utf-8", "replace")[:limit]
+            cut = len(value) - len(text.encode("utf-8", "replace"))
+            return f"{text}…(+{cut} B)" if cut > 0 else text
+        text = value if isinstance(value, str) else repr(value)
+    except Exception as e:                       # the value changed under us, odd __repr__, …
+        text = f"<unrepresentable {type(value).__name__}: {e}>"
+    if len(text) > limit:
+        return f"{text[:limit]}…(+{len(text) - limit})"
+    return text
+
+
+class StructuredFormatter(logging.Formatter):
+    """`ts level logger message k=v …` or one JSON object per line."""
+
+    def __init__(self, json_lines: bool = False, field_max: int = DEFAULT_FIELD_MAX) -> None:
+        super().__init__()
+        self.json_lines = json_lines
+        self.field_max = field_max
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", None) or {}
+        limit = self.field_max
+        if self.json_lines:
+            doc = {
+                "ts": round(record.created, 6),
+                "level": record.levelname,
+                "logger": record.name,
+                "msg": record.getMessage(),
+            }
+            event = getattr(record, "event", None)
+            if event:
+                doc["event"] = event
+            for key, value in fields.items():
+                doc[key] = value if isinstance(value, (int, float, bool)) or value is None else _short(value, limit)
+            if record.exc_info:
+                doc["exc"] = self.formatException(record.exc_info)
+            return json.dumps(doc, ensure_ascii=False)
+        ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+        line = f"{ts}.{int(record.msecs):03d} {record.levelname:<7} {record.name} {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{key}={_short(value, limit)}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+# ---------------------------------------------------------------------- #
+#  queue handler
+# ---------------------------------------------------------------------- #
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue the record untouched (no formatting here); drop it if the queue is full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.labels().inc()
+
+
+def _parse_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for part in spec.split(","):
+        if "=" in part:
+            name, _, value = part.partition("=")
+            rates[name.strip()] = float(value)
+    return rates
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None,
+                      sample: Optional[Dict[str, float]] = None, stream=None,
+                      queue_size: int = 10_000) -> logging.handlers.QueueListener:
+    """(Re)configure the `ds2` loggers from arguments or the DS2_LOG_* environment."""
+    global _listener
+    level = (level or os.getenv("DS2_LOG_LEVEL", "INFO")).upper()
+    fmt = fmt or os.getenv("DS2_LOG_FORMAT", "text")
+    rates = sample if sample is not None else _parse_rates(os.getenv("DS2_LOG_SAMPLE", ""))
+    field_max = int(os.getenv("DS2_LOG_FIELD_MAX", DEFAULT_FIELD_MAX))
+
+    if _listener is not None:
+        _listener.stop()
+    root = logging.getLogger(ROOT)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(StructuredFormatter(json_lines=(fmt == "json"), field_max=field_max))
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+    root.addHandler(_DroppingQueueHandler(records))
+    root.setLevel(level)
+    root.propagate = False
+
+    _RATES.clear()
+    _RATES.update(rates)
+    for name, event in _EVENTS.items():
+        event.set_rate(_RATES.get(name, 1.0))
+
+    _listener = logging.handlers.QueueListener(records, output)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
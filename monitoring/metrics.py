@@ -0,0 +1,499 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Metrics
+=======
+
+Minimal, dependency‑free metrics registry rendered in the Prometheus text
+exposition format (version 0.0.4).
+
+Hot‑path updates are *lock‑light*: every thread writes into its own cell
+(a plain list held in a `threading.local`), so `inc()` / `observe()` never
+take a lock and never contend.  A lock is only taken the first time a
+thread touches a metric child and while a scrape sums up all cells.
+
+    REGISTRY          – process‑wide registry behind `GET /metrics`
+    PipelineMetrics   – per‑topic bundle used by BatchPipeline
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _fmt_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+# ---------------------------------------------------------------------- #
+#  per‑thread cells
+# ---------------------------------------------------------------------- #
+class _ThreadCells:
+    """Per‑thread accumulator slots that are summed on scrape."""
+
+    __slots__ = ("_width", "_local", "_cells", "_lock")
+
+    def __init__(self, width: int) -> None:
+        self._width = width
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self._width
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+
+    def totals(self) -> List[float]:
+        out = [0.0] * self._width
+        with self._lock:
+            cells = list(self._cells)
+        for cell in cells:
+            for i, v in enumerate(cell):
+                out[i] += v
+        return out
+
+
+# ---------------------------------------------------------------------- #
+#  metric children (one per label combination)
+# ---------------------------------------------------------------------- #
+class _CounterChild:
+    __slots__ = ("_cells",)
+
+    def __init__(self) -> None:
+        self._cells = _ThreadCells(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self._cells.cell()[0] += amount
+
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class _GaugeChild:
+    __slots__ = ("_value", "_fn")
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._fn: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Compute the value lazily at scrape time instead of on the hot path."""
+        self._fn = fn
+
+    def value(self) -> float:
+        if self._fn is not None:
+            try:
+                return float(self._fn())
+            except Exception:
+                return float("nan")
+        return self._value
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_cells")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self._bounds = bounds
+        # layout: [bucket_0 … bucket_n, +Inf bucket, sum, count]
+        self._cells = _ThreadCells(len(bounds) + 3)
+
+    def observe(self, value: float) -> None:
+        cell = self._cells.cell()
+        cell[bisect_left(self._bounds, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        totals = self._cells.totals()
+        return totals[:-2], totals[-2], totals[-1]
+
+
+class _Timer:
+    """Context manager that observes the elapsed wall time in seconds."""
+
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild) -> None:
+        self._child = child
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._child.observe(time.perf_counter() - self._start)
+
+
+# ---------------------------------------------------------------------- #
+#  metric families
+# ---------------------------------------------------------------------- #
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return (and create on first use) the child for the given label values."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def remove(self, *values: str) -> None:
+        with self._lock:
+            self._children.pop(tuple(str(v) for v in values), None)
+
+    def _items(self):
+        with self._lock:
+            return list(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in self._items():
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> List[str]:
+        return [f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(child.value())}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def remove_function(self, fn: Callable[[], float], *values: str) -> None:
+        """Remove the child only while it is still computed by `fn`; a successor that
+        took the series over with its own `set_function` keeps it."""
+        key = tuple(str(v) for v in values)
+        with self._lock:
+            child = self._children.get(key)
+            if child is not None and child._fn == fn:
+                del self._children[key]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != float("inf")))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def _render_child(self, key, child) -> List[str]:
+        counts, total, count = child.snapshot()
+        lines, cumulative = [], 0.0
+        for bound, c in zip(self.buckets + (float("inf"),), counts):
+            cumulative += c
+            labels = _fmt_labels(self.labelnames + ("le",), key + (_fmt_value(bound),))
+            lines.append(f"{self.name}_bucket{labels} {_fmt_value(cumulative)}")
+        base = _fmt_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{base} {_fmt_value(total)}")
+        lines.append(f"{self.name}_count{base} {_fmt_value(count)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them for a scrape."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric '{metric.name}' already registered as {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ---------------------------------------------------------------------- #
+#  pipeline instrumentation
+# ---------------------------------------------------------------------- #
+STAGE_DURATION = REGISTRY.histogram(
+    "ds2_stage_duration_seconds",
+    "Duration of one pipeline stage for a single batch.",
+    ("topic", "stage"),
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "ds2_queue_depth_rows",
+    "Rows currently buffered in the topic's DataQueue.",
+    ("topic",),
+)
+QUEUE_OLDEST_AGE = REGISTRY.gauge(
+    "ds2_queue_oldest_row_age_seconds",
+    "Age of the oldest row buffered in the topic's DataQueue.",
+    ("topic",),
+)
+MESSAGES_IN = REGISTRY.counter(
+    "ds2_messages_in_total",
+    "Messages accepted into a pipeline.",
+    ("topic",),
+)
+BATCHES_PROCESSED = REGISTRY.counter(
+    "ds2_batches_processed_total",
+    "Batches that went through validation, correction and publishing.",
+    ("topic",),
+)
+ROWS_CORRECTED = REGISTRY.counter(
+    "ds2_rows_corrected_total",
+    "Rows with at least one corrected cell.",
+    ("topic",),
+)
+ALARMS_EMITTED = REGISTRY.counter(
+    "ds2_alarms_emitted_total",
+    "Alarm messages published.",
+    ("topic",),
+)
+DUPLICATES_DROPPED = REGISTRY.counter(
+    "ds2_duplicates_dropped_total",
+    "Messages dropped by the dedupe window (rate = this / ds2_messages_in_total).",
+    ("topic",),
+)
+DEDUPE_ENTRIES = REGISTRY.gauge(
+    "ds2_dedupe_window_entries",
+    "Keys currently remembered by the topic's dedupe window.",
+    ("topic",),
+)
+WAL_FSYNC_DURATION = REGISTRY.histogram(
+    "ds2_wal_fsync_duration_seconds",
+    "Duration of one group-commit fsync of the topic's write-ahead log.",
+    ("topic",),
+)
+WAL_REPLAYED_ROWS = REGISTRY.counter(
+    "ds2_wal_replayed_rows_total",
+    "Rows recovered from the write-ahead log on startup.",
+    ("topic",),
+)
+ARCHIVE_ROWS_WRITTEN = REGISTRY.counter(
+    "ds2_archive_rows_written_total",
+    "Rows written to the topic's Parquet archive.",
+    ("topic",),
+)
+ARCHIVE_PENDING_BATCHES = REGISTRY.gauge(
+    "ds2_archive_pending_batches",
+    "Processed batches queued for the archive writer thread.",
+    ("topic",),
+)
+OVERLOAD_MODE = REGISTRY.gauge(
+    "ds2_overload_mode",
+    "Current overload mode of the topic (0 = normal, n = n-th mode of its policy).",
+    ("topic",),
+)
+OVERLOAD_TRANSITIONS = REGISTRY.counter(
+    "ds2_overload_transitions_total",
+    "Switches of the topic's overload mode, by the mode switched to.",
+    ("topic", "mode"),
+)
+ROWS_DEGRADED = REGISTRY.counter(
+    "ds2_rows_degraded_total",
+    "Rows published without full validation because the topic was overloaded.",
+    ("topic",),
+)
+BATCH_SIZE = REGISTRY.gauge(
+    "ds2_batch_size_rows",
+    "Rows per batch the topic currently collects (chosen by the sizer in auto mode).",
+    ("topic",),
+)
+SCHEDULER_WAIT = REGISTRY.histogram(
+    "ds2_scheduler_wait_seconds",
+    "Time a full batch waited for a scheduler worker.",
+    ("topic",),
+)
+SCHEDULER_BOOSTS = REGISTRY.counter(
+    "ds2_scheduler_boosts_total",
+    "Batches run ahead of their priority because the topic's latency SLO was at risk.",
+    ("topic",),
+)
+PIPELINE_SWAP_PAUSE = REGISTRY.histogram(
+    "ds2_pipeline_swap_pause_seconds",
+    "Time producers of a topic were held while a reconfigured pipeline took over.",
+    ("topic",),
+    buckets=(0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1),
+)
+WARMUP_BATCH = REGISTRY.gauge(
+    "ds2_warmup_batch_seconds",
+    "Latency of the synthetic warm-up batches of the topic's pipeline: the first one and the median of the rest.",
+    ("topic", "batch"),
+)
+
+
+class PipelineMetrics:
+    """Pre‑bound metric children for one topic, so the hot path does no lookups."""
+
+    STAGES = ("validate", "correct", "alarm_emit", "result_emit")
+
+    def __init__(self, topic: str) -> None:
+        self.topic = topic
+        self.validate = STAGE_DURATION.labels(topic, "validate")
+        self.correct = STAGE_DURATION.labels(topic, "correct")
+        self.alarm_emit = STAGE_DURATION.labels(topic, "alarm_emit")
+        self.result_emit = STAGE_DURATION.labels(topic, "result_emit")
+        self.messages_in = MESSAGES_IN.labels(topic)
+        self.batches_processed = BATCHES_PROCESSED.labels(topic)
+        self.rows_corrected = ROWS_CORRECTED.labels(topic)
+        self.alarms_emitted = ALARMS_EMITTED.labels(topic)
+        self.duplicates_dropped = DUPLICATES_DROPPED.labels(topic)
+        self.swap_pause = PIPELINE_SWAP_PAUSE.labels(topic)
+        self.warmup_first = WARMUP_BATCH.labels(topic, "first")
+        self.warmup_steady = WARMUP_BATCH.labels(topic, "steady")
+
+    def track_queue(self, depth: Callable[[], float], oldest_age: Callable[[], float]) -> None:
+        """Expose queue depth / lag; both are evaluated only when scraped."""
+        QUEUE_DEPTH.labels(self.topic).set_function(depth)
+        QUEUE_OLDEST_AGE.labels(self.topic).set_function(oldest_age)
+
+    def track_batch_size(self, size: Callable[[], float]) -> None:
+        BATCH_SIZE.labels(self.topic).set_function(size)
+
+    def track_dedupe(self, entries: Callable[[], float]) -> None:
+        DEDUPE_ENTRIES.labels(self.topic).set_function(entries)
+
+    def forget(self) -> None:
+        """Drop all series of this topic (called when its pipeline is removed)."""
+        for stage in self.STAGES:
+            STAGE_DURATION.remove(self.topic, stage)
+        for mode in ("normal", "sample", "cheap", "passthrough"):
+            OVERLOAD_TRANSITIONS.remove(self.topic, mode)
+        for batch in ("first", "steady"):
+            WARMUP_BATCH.remove(self.topic, batch)
+        for metric in (QUEUE_DEPTH, QUEUE_OLDEST_AGE, MESSAGES_IN, BATCHES_PROCESSED,
+                       ROWS_CORRECTED, ALARMS_EMITTED, WAL_FSYNC_DURATION, WAL_REPLAYED_ROWS,
+                       ARCHIVE_ROWS_WRITTEN, DUPLICATES_DROPPED, DEDUPE_ENTRIES, PIPELINE_SWAP_PAUSE,
+                       OVERLOAD_MODE, ROWS_DEGRADED, SCHEDULER_WAIT, SCHEDULER_BOOSTS, BATCH_SIZE):
+            metric.remove(self.topic)
+
+
+# ---------------------------------------------------------------------- #
+#  cluster mode
+# ---------------------------------------------------------------------- #
+CLUSTER_ROWS_ROUTED = REGISTRY.counter(
+    "ds2_cluster_rows_routed_total",
+    "Rows received by this worker, by route: local, forwarded_mqtt, forwarded_http or skipped (owned elsewhere).",
+    ("topic", "route"),
+)
+
+
+# ---------------------------------------------------------------------- #
+#  MQTT transport
+# ---------------------------------------------------------------------- #
+MQTT_PUBLISH_ENQUEUED = REGISTRY.counter(
+    "ds2_mqtt_publish_enqueued_total",
+    "Messages handed to the MQTT client for publishing.",
+)
+MQTT_PUBLISH_COMPLETED = REGISTRY.counter(
+    "ds2_mqtt_publish_completed_total",
+    "Messages the MQTT client has written to the broker connection.",
+)
+MQTT_PUBLISH_BACKLOG = REGISTRY.gauge(
+    "ds2_mqtt_publish_backlog",
+    "Messages enqueued for publishing but not yet written to the broker.",
+)
+MQTT_PUBLISH_BACKLOG.labels().set_function(
+    lambda: MQTT_PUBLISH_ENQUEUED.labels().value() - MQTT_PUBLISH_COMPLETED.labels().value()
+)
+
+
+# ---------------------------------------------------------------------- #
+#  logging
+# ---------------------------------------------------------------------- #
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "ds2_log_records_dropped_total",
+    "Log records dropped because the log queue was full.",
+)
@@ -0,0 +1,244 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Profiler
+========
+
+On‑demand profiling of a pipeline's batch callback for the next N batches.
+
+    • mode="cprofile"  – deterministic cProfile, downloadable as a pstats dump
+    • mode="sampling"  – statistical stack sampler, downloadable as collapsed
+                         stacks (`frame;frame;frame count`, flamegraph.pl /
+                         speedscope compatible)
+    • memory=True      – tracemalloc snapshots before the first and after the
+                         last profiled batch, reported as the top allocation
+                         growth by source line
+
+A session *wraps* the callback only while it is active; the owner swaps the
+original callback back in afterwards, so there is no overhead while
+profiling is off.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, Optional
+
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+
+class _StackSampler:
+    """Samples the stack of one thread at a fixed interval while armed."""
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._stacks: Counter[str] = Counter()
+        self._target: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ds2-stack-sampler", daemon=True)
+        self._thread.start()
+
+    def arm(self, thread_id: int) -> None:
+        self._target = thread_id
+
+    def disarm(self) -> None:
+        self._target = None
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            target = self._target
+            if target is None:
+                continue
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                continue
+            parts = []
+            while frame is not None:
+                code = frame.f_code
+                parts.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            self._stacks[";".join(reversed(parts))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+
+class ProfileSession:
+    """Profiles the next `batches` invocations of a wrapped callable."""
+
+    def __init__(
+        self,
+        topic: str,
+        batches: int,
+        mode: str = "cprofile",
+        interval: float = 0.005,
+        memory: bool = False,
+        on_finish: Callable[["ProfileSession"], None] | None = None,
+    ) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {PROFILE_MODES}")
+        if batches < 1:
+            raise ValueError("batches must be >= 1")
+        self.topic = topic
+        self.mode = mode
+        self.batches = batches
+        self.memory = memory
+        self.batches_done = 0
+        self.state = "running"
+        self.error: str | None = None
+        self.started_at = time.time()
+        self.finished_at: float | None = None
+        self._busy_seconds = 0.0
+        self._lock = threading.Lock()
+        self._on_finish = on_finish
+
+        self._profile = cProfile.Profile() if mode == "cprofile" else None
+        self._sampler = _StackSampler(interval) if mode == "sampling" else None
+
+        self._started_tracemalloc = False
+        self._mem_before: tracemalloc.Snapshot | None = None
+        self._mem_report: str | None = None
+        if memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(25)
+                self._started_tracemalloc = True
+            self._mem_before = tracemalloc.take_snapshot()
+
+    # ------------------------------------------------------------------ #
+    #  wrapping
+    # ------------------------------------------------------------------ #
+    def wrap(self, fn: Callable) -> Callable:
+        """Return `fn` instrumented for this session."""
+        def _profiled(*args, **kwargs):
+            if self.state != "running":
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                if self._profile is not None:
+                    try:
+                        self._profile.enable()
+                    except ValueError as e:  # another profiler is already active
+                        self._fail(str(e))
+                        return fn(*args, **kwargs)
+                    try:
+                        return fn(*args, **kwargs)
+                    finally:
+                        self._profile.disable()
+                self._sampler.arm(threading.get_ident())
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self._sampler.disarm()
+            finally:
+                self._busy_seconds += time.perf_counter() - t0
+                self.batches_done += 1
+                if self.batches_done >= self.batches:
+                    self._finish("completed")
+        return _profiled
+
+    def cancel(self) -> None:
+        self._finish("cancelled")
+
+    def _fail(self, message: str) -> None:
+        self.error = message
+        self._finish("failed")
+
+    def _finish(self, state: str) -> None:
+        with self._lock:
+            if self.state != "running":
+                return
+            self.state = state
+            self.finished_at = time.time()
+            if self._sampler is not None:
+                self._sampler.stop()
+            if self.memory and self._mem_before is not None:
+                # hide the profiler's own bookkeeping (sampled stacks, snapshots)
+                own = [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+                before = self._mem_before.filter_traces(own)
+                after = tracemalloc.take_snapshot().filter_traces(own)
+                self._mem_report = self._format_memory(after.compare_to(before, "lineno"))
+                if self._started_tracemalloc:
+                    tracemalloc.stop()
+        if self._on_finish:
+            self._on_finish(self)
+
+    # ------------------------------------------------------------------ #
+    #  results
+    # ------------------------------------------------------------------ #
+    def status(self) -> Dict:
+        return {
+            "topic": self.topic,
+            "mode": self.mode,
+            "state": self.state,
+            "batches_requested": self.batches,
+            "batches_profiled": self.batches_done,
+            "profiled_seconds": round(self._busy_seconds, 6),
+            "memory": self.memory,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "formats": self.formats(),
+        }
+
+    def formats(self) -> list[str]:
+        out = []
+        if self._profile is not None:
+            out.append("pstats")
+        if self._sampler is not None:
+            out.append("collapsed")
+        if self.memory:
+            out.append("memory")
+        return out
+
+    def pstats_bytes(self) -> bytes:
+        """Marshalled stats, loadable with `pstats.Stats(path)` / snakeviz."""
+        if self._profile is None:
+            raise ValueError("pstats output requires mode='cprofile'")
+        self._require_finished()
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)
+
+    def pstats_text(self, limit: int = 40) -> str:
+        if self._profile is None:
+            raise ValueError("pstats output requires mode='cprofile'")
+        self._require_finished()
+        buf = io.StringIO()
+        pstats.Stats(self._profile, stream=buf).sort_stats("cumulative").print_stats(limit)
+        return buf.getvalue()
+
+    def collapsed_stacks(self) -> str:
+        if self._sampler is None:
+            raise ValueError("collapsed stacks require mode='sampling'")
+        self._require_finished()
+        return self._sampler.collapsed()
+
+    def memory_report(self) -> str:
+        if not self.memory:
+            raise ValueError("memory report requires memory=True")
+        self._require_finished()
+        return self._mem_report or ""
+
+    def _require_finished(self) -> None:
+        if self.state == "running":
+            raise RuntimeError("profiling session is still running")
+
+    @staticmethod
+    def _format_memory(diff, limit: int = 30) -> str:
+        total = sum(stat.size_diff for stat in diff)
+        lines = [f"Total allocated size change: {total / 1024:.1f} KiB", ""]
+        for stat in diff[:limit]:
+            lines.append(str(stat))
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,187 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Startup trace
+=============
+
+Records how long each startup phase took (imports, GX suite building,
+MQTT connect, pipeline creation) so cold‑start regressions are visible
+without attaching a profiler.
+
+    STARTUP.phase(name)   – context manager timing one phase
+    STARTUP.mark_ready()  – startup finished; `GET /ready` turns 200
+    STARTUP.report()      – phases, import breakdown and readiness as a dict
+
+With `DS2_STARTUP_TRACE=1` an import hook is installed as well and every
+top‑level import is timed (cumulative, outermost import only, comparable
+to `python -X importtime`); the breakdown is printed once ready.
+"""
+from __future__ import annotations
+
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+TRACE_ENV = "DS2_STARTUP_TRACE"
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Delegating loader that times `exec_module` of the outermost import."""
+
+    def __init__(self, loader, hook: "_ImportHook", name: str) -> None:
+        self._loader = loader
+        self._hook = hook
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        local = self._hook.local
+        depth = getattr(local, "depth", 0)
+        local.depth = depth + 1
+        t0 = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            local.depth = depth
+            if depth == 0:
+                self._hook.record(self._name, time.perf_counter() - t0)
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+
+class _ImportHook(importlib.abc.MetaPathFinder):
+    """Meta‑path finder that wraps the real loader of every module."""
+
+    def __init__(self, trace: "StartupTrace") -> None:
+        self._trace = trace
+        self.local = threading.local()
+        self._finding = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._finding, "active", False):
+            return None
+        self._finding.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.active = False
+        if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+        spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    def record(self, name: str, seconds: float) -> None:
+        self._trace.record_import(name, seconds)
+
+
+class StartupTrace:
+    """Phase timings plus readiness state of the service."""
+
+    def __init__(self) -> None:
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.phases: List[dict] = []
+        self.imports: Dict[str, float] = {}
+        self.current: Optional[str] = None
+        self.ready_after: Optional[float] = None
+        self.error: Optional[str] = None
+        self._hook: Optional[_ImportHook] = None
+
+    # ------------------------------------------------------------------ #
+    #  recording
+    # ------------------------------------------------------------------ #
+    @property
+    def enabled(self) -> bool:
+        return os.getenv(TRACE_ENV, "").lower() in ("1", "true", "yes")
+
+    def install_import_hook(self) -> None:
+        """Time every import from now on (only with `DS2_STARTUP_TRACE=1`)."""
+        if self._hook is None and self.enabled:
+            self._hook = _ImportHook(self)
+            sys.meta_path.insert(0, self._hook)
+
+    def remove_import_hook(self) -> None:
+        if self._hook is not None:
+            try:
+                sys.meta_path.remove(self._hook)
+            except ValueError:
+                pass
+            self._hook = None
+
+    def record_import(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.imports[name] = self.imports.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        self.current = name
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append({
+                    "phase": name,
+                    "start_s": round(start - self._t0, 4),
+                    "duration_s": round(time.perf_counter() - start, 4),
+                })
+
+    def mark_ready(self) -> None:
+        self.current = None
+        self.ready_after = time.perf_counter() - self._t0
+        self.remove_import_hook()
+        if self.enabled:
+            print(self.format())
+
+    def mark_failed(self, exc: BaseException) -> None:
+        self.error = f"{type(exc).__name__}: {exc}"
+        self.remove_import_hook()
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_after is not None
+
+    # ------------------------------------------------------------------ #
+    #  reporting
+    # ------------------------------------------------------------------ #
+    def report(self) -> dict:
+        with self._lock:
+            phases = list(self.phases)
+            imports = sorted(self.imports.items(), key=lambda kv: kv[1], reverse=True)
+        return {
+            "ready": self.ready,
+            "ready_after_s": None if self.ready_after is None else round(self.ready_after, 4),
+            "current_phase": self.current,
+            "error": self.error,
+            "phases": phases,
+            "imports": [{"module": m, "duration_s": round(s, 4)} for m, s in imports],
+        }
+
+    def format(self, top: int = 15) -> str:
+        r = self.report()
+        lines = [f"Startup: ready after {r['ready_after_s']} s" if r["ready"] else "Startup: not ready"]
+        for p in r["phases"]:
+            lines.append(f"  {p['start_s']:>8.3f} s  {p['duration_s']:>8.3f} s  {p['phase']}")
+        if r["imports"]:
+            lines.append("  slowest imports:")
+            for imp in r["imports"][:top]:
+                lines.append(f"             {imp['duration_s']:>8.3f} s  {imp['module']}")
+        return "\n".join(lines)
+
+
+STARTUP = StartupTrace()
@@ -4,6 +4,7 @@
 # mqtt/__init__.py
 
 from .mqtt_client import MqttClient
+from .async_mqtt_client import AsyncMqttClient
 from .mqtt_publisher import MqttPublisher
 from .alarm_publisher import AlarmPublisher
 from .result_publisher import ResultPublisher
@@ -18,8 +18,13 @@ from __future__ import annotations
 from typing import Callable, Dict, List
 import datetime as _dt
 import math
+import numpy as np
 import pandas as pd
 
+from monitoring.log import get_logger
+
+log = get_logger(__name__)
+
 
 def _json_safe(value):
         """Convert pandas/NumPy nulls to a real JSON null (=Python None)."""
@@ -28,6 +33,8 @@ def _json_safe(value):
         # True for numpy.nan, pandas.NA, pd.NaT …  
         if pd.isna(value) or (isinstance(value, float) and math.isnan(value)):
             return None
+        if isinstance(value, np.generic):   # numpy scalar → plain Python value
+            return value.item()
         return value
 
 
@@ -40,6 +47,9 @@ class AlarmPublisher:
         publish: Callable[[str, dict], None],  # injected network layer
     ) -> None:
         self._alarm_topic: str = topic_cfg["publish"]["alarm"]
+        # row fields copied into every alarm so consumers can correlate it
+        # with the input message (e.g. the load generator's sequence number)
+        self._trace_fields: List[str] = topic_cfg.get("trace_fields", ["_run", "_seq", "_sent_ts"])
         self._publish = publish
 
     # ------------------------------------------------------------------ #
@@ -49,9 +59,10 @@ class AlarmPublisher:
         self,
         cleaned_df: pd.DataFrame,
         expectation_result: Dict
-    ) -> None:
+    ) -> int:
         """
         Emit one alarm per unexpected index using the `dateTo` timestamp.
+        Returns the number of alarms actually published.
 
         Parameters
         ----------
@@ -60,14 +71,17 @@ class AlarmPublisher:
         expectation_result
             One result entry from validation_results["results"].
         cleaned_df
-            Cleaned DataFrame (to extract `dateTo` timestamps).
+            Cleaned DataFrame or CorrectionOverlay (to extract `dateTo` timestamps).
         """
         idx_list: List[int] = expectation_result["result"]["unexpected_index_list"]
         exp_type: str = expectation_result["expectation_config"]["type"]
 
+        trace_fields = [f for f in self._trace_fields if f in cleaned_df.columns]
+
+        emitted = 0
         for row_idx in idx_list:
             try:
-                ts = cleaned_df.loc[row_idx, "dateTo"]
+                ts = cleaned_df.at[row_idx, "dateTo"]
                 # if pd.isna(ts):
                 #     continue  # Skip NaT/null timestamps
                 # # Format to ISO8601 with timezone (if not already present)
@@ -79,9 +93,13 @@ class AlarmPublisher:
                     "type": exp_type,
                     "severity": "CRITICAL"
                 }
+                for field in trace_fields:
+                    alarm_payload[field] = _json_safe(cleaned_df.at[row_idx, field])
                 self._publish(self._alarm_topic, alarm_payload)
+                emitted += 1
             except Exception as e:
-                print(f"⚠️  Failed to emit alarm for index {row_idx}: {e}")
+                log.warning("⚠️  Failed to emit alarm for index %s: %s", row_idx, e)
+        return emitted
 
     
     
\ No newline at end of file
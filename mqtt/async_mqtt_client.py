@@ -0,0 +1,279 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+AsyncMqttClient
+===============
+
+paho‑mqtt driven by an asyncio event loop (uvicorn's) instead of its own
+`loop_start` thread.  The broker socket is registered with
+`loop.add_reader` / `add_writer`, keep‑alive and reconnects run in the
+`run()` coroutine (the blocking connect itself on the default executor), and message callbacks run on the loop – there is no
+second network thread to hand messages over to.
+
+Same public API as `MqttClient`, so PipelineManager, MqttPublisher and
+ClusterRouter work with either transport:
+
+    subscribe / unsubscribe / publish    – callable from any thread; calls
+                                           from other threads are handed to
+                                           the loop with call_soon_threadsafe
+    subscribe_async / publish_async      – coroutines, await SUBACK / PUBACK
+    listeners                            – run on the loop and must be quick;
+                                           pipelines hand full batches to an
+                                           executor (`BatchPipeline.set_offload`)
+
+Subscriptions are renewed after a reconnect; publishes issued while the
+connection is down are held (up to `max_pending`) and sent once it is back.
+Select it with `DS2_MQTT_TRANSPORT=asyncio`.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import logging
+import select
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+from paho.mqtt.enums import CallbackAPIVersion
+
+from monitoring.metrics import MQTT_PUBLISH_ENQUEUED, MQTT_PUBLISH_COMPLETED
+from monitoring.log import get_logger, hot_path
+
+log = get_logger(__name__)
+_RECEIVED = hot_path("mqtt.receive", __name__)
+_PUBLISHING = hot_path("mqtt.publish", __name__)
+
+
+class AsyncMqttClient:
+    """paho‑mqtt on an asyncio loop; emits (topic:str, payload:dict) events to listeners."""
+
+    def __init__(self, broker: str, port: int, loop: asyncio.AbstractEventLoop,
+                 keepalive: int = 60, reconnect_delay: Tuple[float, float] = (1.0, 30.0),
+                 max_pending: int = 100_000, read_batch: int = 256):
+        self.broker = broker
+        self.port = port
+        self.keepalive = keepalive
+        self.read_batch = read_batch
+        self._loop = loop
+        self._loop_thread: Optional[int] = None
+        self._min_delay, self._max_delay = reconnect_delay
+        self._client = mqtt.Client(CallbackAPIVersion.VERSION2)
+        self._client.on_connect = self._on_connect
+        self._client.on_disconnect = self._on_disconnect
+        self._client.on_message = self._raw_on_message
+        self._client.on_publish = self._on_publish
+        self._client.on_subscribe = self._on_subscribe
+        self._client.on_socket_open = self._on_socket_open
+        self._client.on_socket_close = self._on_socket_close
+        self._client.on_socket_register_write = self._on_socket_register_write
+        self._client.on_socket_unregister_write = self._on_socket_unregister_write
+        self._enqueued = MQTT_PUBLISH_ENQUEUED.labels()
+        self._completed = MQTT_PUBLISH_COMPLETED.labels()
+        self._listeners: List[Callable[[str, dict], None]] = []
+        self._subscriptions: Dict[str, int] = {}
+        self._pending: Deque[Tuple[str, str, int]] = deque(maxlen=max_pending)
+        self._waiters: Dict[int, asyncio.Future] = {}     # mid → SUBACK / PUBACK
+        self._connected = False
+        self._connected_event: Optional[asyncio.Event] = None
+        self._lost: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._runner = None
+
+    # --- lifecycle -----------------------------------------------------------
+    def start(self) -> None:
+        """Schedule `run()` on the loop; callable from any thread."""
+        if self._runner is None:
+            self._runner = asyncio.run_coroutine_threadsafe(self.run(), self._loop)
+
+    async def run(self) -> None:
+        """Connect, keep the connection alive and reconnect until `aclose()`."""
+        self._loop_thread = threading.get_ident()
+        self._connected_event = asyncio.Event()
+        self._lost = asyncio.Event()
+        delay = self._min_delay
+        while not self._stopping:
+            self._lost.clear()
+            try:
+                # DNS lookup and TCP connect block: run them off the loop, the socket
+                # callbacks hand the registration back to it (see `_on_socket_open`)
+                await self._loop.run_in_executor(None, functools.partial(
+                    self._client.connect, self.broker, self.port, keepalive=self.keepalive))
+            except OSError as e:
+                log.warning("⚠️  MQTT connection to %s:%s failed (%s); retrying in %gs", self.broker, self.port, e, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._max_delay)
+                continue
+            delay = self._min_delay
+            if self._stopping:                # aclose() ran while connecting
+                self._client.disconnect()
+                self._client.loop_write()
+                break
+            while not self._stopping:
+                try:
+                    await asyncio.wait_for(self._lost.wait(), timeout=1.0)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                if self._client.loop_misc() != mqtt.MQTT_ERR_SUCCESS:
+                    break
+            if not self._stopping:
+                await asyncio.sleep(self._min_delay)
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> None:
+        while self._connected_event is None:
+            await asyncio.sleep(0.01)
+        await asyncio.wait_for(self._connected_event.wait(), timeout)
+
+    async def aclose(self) -> None:
+        self._stopping = True
+        if self._lost is not None:
+            self._lost.set()
+        if self._connected:
+            self._client.disconnect()
+            self._client.loop_write()         # flush DISCONNECT before the loop goes away
+        if self._runner is not None:
+            await asyncio.wrap_future(self._runner)
+
+    def stop(self) -> None:
+        if self._on_loop():
+            self._loop.create_task(self.aclose())
+        else:
+            asyncio.run_coroutine_threadsafe(self.aclose(), self._loop).result(timeout=10)
+
+    # --- public transport API ------------------------------------------------
+    def subscribe(self, topic: str, qos: int = 0) -> None:
+        self._call(self._subscribe_now, topic, qos)
+
+    def unsubscribe(self, topic: str) -> None:
+        self._call(self._unsubscribe_now, topic)
+
+    def publish(self, topic: str, obj, qos: int = 0) -> None:
+        _PUBLISHING("📬 Publishing", topic=topic, payload=obj)
+        self._enqueued.inc()
+        self._call(self._publish_now, topic, json.dumps(obj), qos)
+
+    async def subscribe_async(self, topic: str, qos: int = 0) -> None:
+        """Subscribe and wait for the broker's SUBACK."""
+        await self.wait_connected()
+        mid = self._subscribe_now(topic, qos)
+        if mid is not None:
+            await self._wait_for(mid)
+
+    async def publish_async(self, topic: str, obj, qos: int = 0) -> None:
+        """Publish and wait until it is written (QoS 0) or acknowledged (QoS 1/2)."""
+        self._enqueued.inc()
+        await self.wait_connected()
+        info = self._client.publish(topic, json.dumps(obj), qos=qos)
+        if info.rc == mqtt.MQTT_ERR_SUCCESS and not info.is_published():
+            await self._wait_for(info.mid)
+
+    def add_listener(self, fn: Callable[[str, dict], None]) -> None: self._listeners.append(fn)
+
+    # --- internal: loop side -------------------------------------------------
+    def _on_loop(self) -> bool:
+        return threading.get_ident() == self._loop_thread
+
+    def _call(self, fn, *args) -> None:
+        if self._on_loop():
+            fn(*args)
+        else:
+            self._loop.call_soon_threadsafe(fn, *args)
+
+    def _subscribe_now(self, topic: str, qos: int) -> Optional[int]:
+        self._subscriptions[topic] = qos
+        log.info("📬 Subscribed to MQTT topic: %s", topic)
+        if not self._connected:
+            return None                       # sent by _on_connect
+        _rc, mid = self._client.subscribe(topic, qos=qos)
+        return mid
+
+    def _unsubscribe_now(self, topic: str) -> None:
+        self._subscriptions.pop(topic, None)
+        if self._connected:
+            self._client.unsubscribe(topic)
+        log.info("📬 Unsubscribed from MQTT topic: %s", topic)
+
+    def _publish_now(self, topic: str, payload: str, qos: int) -> None:
+        if not self._connected:
+            if len(self._pending) == self._pending.maxlen:
+                log.warning("⚠️  MQTT publish backlog full, dropping the oldest message")
+            self._pending.append((topic, payload, qos))
+            return
+        self._client.publish(topic, payload, qos=qos)
+
+    def _wait_for(self, mid: int) -> asyncio.Future:
+        future = self._loop.create_future()
+        self._waiters[mid] = future
+        return future
+
+    def _resolve(self, mid: int) -> None:
+        future = self._waiters.pop(mid, None)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    # --- paho callbacks (on the loop; the socket ones also from connect) -----
+    def _on_socket_open(self, client, userdata, sock):
+        # called from the executor thread running connect(); `_call` hands it over
+        self._call(self._loop.add_reader, sock, self._on_readable, client, sock)
+
+    def _on_readable(self, client, sock) -> None:
+        # loop_read handles one packet; drain what is already buffered instead
+        # of paying a full event‑loop iteration per message
+        for _ in range(self.read_batch):
+            if client.loop_read() != mqtt.MQTT_ERR_SUCCESS:
+                return
+            pending = getattr(sock, "pending", None)          # TLS: decrypted bytes held by ssl
+            if not (pending and pending()) and not select.select((sock,), (), (), 0)[0]:
+                return
+
+    def _on_socket_close(self, client, userdata, sock):
+        self._call(self._loop.remove_reader, sock)
+        self._call(self._loop.remove_writer, sock)
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        self._call(self._loop.add_writer, sock, client.loop_write)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        self._call(self._loop.remove_writer, sock)
+
+    def _on_connect(self, client, userdata, flags, rc, *args):
+        if rc != 0:
+            log.error("✖ Failed to connect, rc=%s", rc)
+            return
+        self._connected = True
+        self._connected_event.set()
+        log.info("✔ MQTT Client connected to %s:%s (asyncio transport)", self.broker, self.port)
+        for topic, qos in self._subscriptions.items():
+            client.subscribe(topic, qos=qos)
+        while self._pending:
+            topic, payload, qos = self._pending.popleft()
+            client.publish(topic, payload, qos=qos)
+
+    def _on_disconnect(self, client, userdata, flags, rc, *args):
+        self._connected = False
+        self._connected_event.clear()
+        self._lost.set()
+        log.log(logging.WARNING if getattr(rc, "is_failure", rc != 0) else logging.INFO,
+                "MQTT Client disconnected (%s)", rc)
+
+    def _on_publish(self, client, userdata, mid, *args):
+        self._completed.inc()
+        if self._waiters:
+            self._resolve(mid)
+
+    def _on_subscribe(self, client, userdata, mid, *args):
+        if self._waiters:
+            self._resolve(mid)
+
+    def _raw_on_message(self, client, userdata, msg):
+        _RECEIVED("📬 Received", topic=msg.topic, payload=msg.payload)
+        try:
+            payload = json.loads(msg.payload)
+        except json.JSONDecodeError:
+            log.warning("⚠️  non‑JSON message dropped", extra={"fields": {"topic": msg.topic, "payload": msg.payload}})
+            return
+        for fn in self._listeners: fn(msg.topic, payload)
@@ -2,10 +2,16 @@
 # SPDX-License-Identifier: Apache-2.0
 
 # mqtt_client.py
-import json, paho.mqtt.client as mqtt
+import json, logging, paho.mqtt.client as mqtt
 from paho.mqtt.enums import CallbackAPIVersion
 from typing import Callable, List
 import time
+from monitoring.metrics import MQTT_PUBLISH_ENQUEUED, MQTT_PUBLISH_COMPLETED
+from monitoring.log import get_logger, hot_path
+
+log = get_logger(__name__)
+_RECEIVED = hot_path("mqtt.receive", __name__)
+_PUBLISHING = hot_path("mqtt.publish", __name__)
 
 class MqttClient:
     """Tiny wrapper around paho‑mqtt that emits
@@ -18,53 +24,65 @@ class MqttClient:
         self._client = mqtt.Client(CallbackAPIVersion.VERSION2)
         self._client.on_message = self._raw_on_message
         self._client.on_connect = self._on_connect
-        self._client.on_disconnect = lambda *args: print("MQTT Client disconnected")
+        self._client.on_publish = self._on_publish
+        self._enqueued = MQTT_PUBLISH_ENQUEUED.labels()
+        self._completed = MQTT_PUBLISH_COMPLETED.labels()
+        self._client.on_disconnect = self._on_disconnect
         self._connected = False
         try:
               self._client.connect(broker, port)
               self._client.loop_start()
         except Exception as e:
-                print(f"⚠️  MQTT connection to {broker}:{port} failed. \t Start the broker if you want to use MQTT.")
+                log.warning("⚠️  MQTT connection to %s:%s failed. Start the broker if you want to use MQTT.", broker, port)
                 self._connected = False        
         self._listeners: List[Callable[[str, dict], None]] = []
 
     def _on_connect(self, client, userdata, flags, rc, *args):
         if rc == 0:
             self._connected = True
-            print(f"✔ MQTT Client connected to {self.broker}:{self.port}")
+            log.info("✔ MQTT Client connected to %s:%s", self.broker, self.port)
         else:
-            print(f"✖ Failed to connect, rc={rc}")
+            log.error("✖ Failed to connect, rc=%s", rc)
             
             
             
             
+    def _on_disconnect(self, client, userdata, flags, rc, *args):
+        # paho passes a ReasonCode; 0 / "Normal disconnection" is our own stop()
+        log.log(logging.WARNING if getattr(rc, "is_failure", rc != 0) else logging.INFO,
+                "MQTT Client disconnected (%s)", rc)
+
     # --- public transport API ------------------------------------------------
-    def subscribe(self, topic: str) -> None:
-        self._client.subscribe(topic)
-        print(f"📬 Subscribed to MQTT topic: \t {topic}")
+    def subscribe(self, topic: str, qos: int = 0) -> None:
+        self._client.subscribe(topic, qos=qos)
+        log.info("📬 Subscribed to MQTT topic: %s", topic)
     def unsubscribe(self, topic: str) -> None:
         try:
             self._client.unsubscribe(topic)
-            print(f"📬 Unsubscribed from MQTT topic: \t {topic}")
+            log.info("📬 Unsubscribed from MQTT topic: %s", topic)
         except Exception as e:
-            print(f"⚠️  Failed to unsubscribe from {topic}: {e}")
+            log.warning("⚠️  Failed to unsubscribe from %s: %s", topic, e)
 
-    def publish(self, topic: str, obj) -> None:
-        print(f"📬 Publishing: {topic}: {obj!r}")
+    def publish(self, topic: str, obj, qos: int = 0) -> None:
+        _PUBLISHING("📬 Publishing", topic=topic, payload=obj)
+        self._enqueued.inc()
         while not self._connected:
             time.sleep(0.1)
-        msg_info = self._client.publish(topic, json.dumps(obj))
+        msg_info = self._client.publish(topic, json.dumps(obj), qos=qos)
     def add_listener(self, fn: Callable[[str, dict], None]) -> None: self._listeners.append(fn)
     def start(self): self._client.loop_start()
         
     def stop(self):  self._client.loop_stop(); self._client.disconnect()
 
     # --- internal ------------------------------------------------------------
+    def _on_publish(self, client, userdata, mid, *args):
+        self._completed.inc()
+
     def _raw_on_message(self, client, userdata, msg):
-        print(f"📬 {msg.topic}: {msg.payload!r}")
+        _RECEIVED("📬 Received", topic=msg.topic, payload=msg.payload)
         try:
             payload = json.loads(msg.payload)
         except json.JSONDecodeError:
-            print(f"⚠️  non‑JSON on {msg.topic}: {msg.payload!r}")
+            log.warning("⚠️  non‑JSON message dropped", extra={"fields": {"topic": msg.topic, "payload": msg.payload}})
             return
         for fn in self._listeners: fn(msg.topic, payload)
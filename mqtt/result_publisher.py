@@ -12,17 +12,30 @@ consumer sees both the original **and** the cleaned value:
     "temperature.cleaned": 18.1,
     …
 
+The cleaned side may be a `CorrectionOverlay`: the raw batch is then
+serialized once and only its patched columns are serialized on top.
+
+Rows of a batch an overloaded topic did not fully validate (see
+`batch.overload`) also carry `"degraded": "<mode>"`.
+
 A small `delay` parameter is optional for rate‑limiting bursty output.
 """
 from __future__ import annotations
 
 from curses import raw
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Optional, Sequence, Union
 import time
 import json
 
 import pandas as pd
 
+SLICE_ROWS = 256     # rows serialized at a time
+
+
+def _records(df: pd.DataFrame) -> List[Dict]:
+    # via JSON so NaN and timestamps come out as they are published
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
 
 class ResultPublisher:
     """Publish a cleaned DataFrame row‑by‑row via the injected `publish`."""
@@ -43,25 +56,47 @@ class ResultPublisher:
     def emit(
         self,
         cleaned_df: pd.DataFrame,
-        raw_df: pd.DataFrame
+        raw_df: pd.DataFrame,
+        degraded: Union[str, Sequence[Optional[str]], None] = None,
     ) -> None:
         """
         Publish each row of `cleaned_df` together with its raw counterpart.
 
-        Both dataframes must have identical indices and columns.
+        Both dataframes must have identical indices and columns (`cleaned_df`
+        may be a CorrectionOverlay of `raw_df`).  `degraded` is the overload
+        mode of the whole batch or one entry per row.
         """
-        raw_json_rows: List[Dict] = json.loads(raw_df.to_json(orient="records", date_format="iso"))
-        cleaned_json_rows: List[Dict] = json.loads(cleaned_df.to_json(orient="records", date_format="iso")) # convert df to dict to avoid missinterpretation of NaN values
-        for idx, (raw_row, cleaned_row) in enumerate(zip(raw_json_rows, cleaned_json_rows)):
-            out: Dict = {}
+        overlay = hasattr(cleaned_df, "patched_frame")
+        patched_df = cleaned_df.patched_frame() if overlay and cleaned_df.patches else None
+        # a slice at a time: only its rows are held as JSON dicts
+        for first in range(0, len(raw_df.index), SLICE_ROWS):
+            rows = slice(first, first + SLICE_ROWS)
+            raw_json_rows = _records(raw_df.iloc[rows])
+            if not overlay:
+                cleaned_json_rows = _records(cleaned_df.iloc[rows])
+            elif patched_df is not None:
+                cleaned_json_rows = [{**raw_row, **patched}
+                                     for raw_row, patched in zip(raw_json_rows, _records(patched_df.iloc[rows]))]
+            else:
+                cleaned_json_rows = raw_json_rows       # nothing corrected; rows are only read below
+            for idx, (raw_row, cleaned_row) in enumerate(zip(raw_json_rows, cleaned_json_rows), first):
+                self._emit_row(raw_row, cleaned_row, degraded, idx)
+
+    def _emit_row(self, raw_row: Dict, cleaned_row: Dict,
+                  degraded: Union[str, Sequence[Optional[str]], None], idx: int) -> None:
+        out: Dict = {}
 
 
-            for col, val in raw_row.items():
-               out[f"{col}.raw"] = val
-            for col, val in cleaned_row.items():
-                out[f"{col}.cleaned"] = val
-            
-            if cleaned_row.get(self._timestamp_attribute):
-                out["ts"] = cleaned_row[self._timestamp_attribute]
+        for col, val in raw_row.items():
+           out[f"{col}.raw"] = val
+        for col, val in cleaned_row.items():
+            out[f"{col}.cleaned"] = val
+        
+        if cleaned_row.get(self._timestamp_attribute):
+            out["ts"] = cleaned_row[self._timestamp_attribute]
+        if degraded is not None:
+            flag = degraded if isinstance(degraded, str) else degraded[idx]
+            if flag is not None:
+                out["degraded"] = flag
 
-            self._publish(self._result_topic, out)
\ No newline at end of file
+        self._publish(self._result_topic, out)
\ No newline at end of file
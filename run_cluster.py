@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+#!/usr/bin/env python3
+"""run_cluster.py
+
+Start N worker processes of the service on one host (each one is
+`main.py` with `DS2_CLUSTER_WORKERS` / `DS2_WORKER_INDEX` set) and keep
+them running: a worker that exits is restarted after `--restart-delay`
+seconds, Ctrl‑C / SIGTERM stops all of them.
+
+Worker i serves HTTP on `--base-port + i` and, for durable topics, writes
+its write‑ahead log to `<--wal-dir>/worker-<i>` (a worker only ever
+replays its own log, since it owns the same keys after a restart).
+
+Example (local mosquitto, 4 workers on ports 8000‑8003)::
+
+    python3 run_cluster.py --workers 4
+    curl http://localhost:8002/ready
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+HERE = Path(__file__).resolve().parent
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Run several local worker processes as one cluster.")
+    p.add_argument("--workers", "-n", type=int, default=os.cpu_count() or 2,
+                   help="Number of worker processes (default: CPU count)")
+    p.add_argument("--base-port", type=int, default=int(os.getenv("DS2_HTTP_PORT", 8000)),
+                   help="HTTP port of worker 0; worker i listens on base + i (default 8000)")
+    p.add_argument("--group", default=os.getenv("DS2_CLUSTER_GROUP", "ds2"),
+                   help="MQTT shared subscription group (default ds2)")
+    p.add_argument("--wal-dir", default=os.getenv("DS2_WAL_DIR", "./wal"),
+                   help="Parent directory of the per-worker write-ahead logs")
+    p.add_argument("--restart-delay", type=float, default=1.0,
+                   help="Seconds before a crashed worker is restarted")
+    return p.parse_args(argv)
+
+
+def _worker_env(args: argparse.Namespace, index: int) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "DS2_CLUSTER_WORKERS": str(args.workers),
+        "DS2_WORKER_INDEX": str(index),
+        "DS2_CLUSTER_GROUP": args.group,
+        "DS2_HTTP_PORT": str(args.base_port),
+        "DS2_WAL_DIR": str(Path(args.wal_dir) / f"worker-{index}"),
+        "PYTHONUNBUFFERED": "1",
+    })
+    return env
+
+
+def _spawn(args: argparse.Namespace, index: int) -> subprocess.Popen:
+    proc = subprocess.Popen([sys.executable, str(HERE / "main.py")], cwd=HERE, env=_worker_env(args, index))
+    print(f"▶ worker {index} (pid {proc.pid}) on port {args.base_port + index}")
+    return proc
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    if args.workers < 2:
+        print("✖ A cluster needs at least 2 workers; run main.py directly for one.")
+        return 2
+
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    procs: Dict[int, subprocess.Popen] = {i: _spawn(args, i) for i in range(args.workers)}
+    restart_at: Dict[int, float] = {}
+    try:
+        while not stopping:
+            time.sleep(0.2)
+            now = time.monotonic()
+            for index, proc in procs.items():
+                if proc.poll() is None or index in restart_at:
+                    continue
+                print(f"⚠️  worker {index} exited with code {proc.returncode}; restarting in {args.restart_delay:g}s")
+                restart_at[index] = now + args.restart_delay
+            for index, at in list(restart_at.items()):
+                if at <= now:
+                    del restart_at[index]
+                    procs[index] = _spawn(args, index)
+    finally:
+        for proc in procs.values():
+            if proc.poll() is None:
+                proc.terminate()
+        deadline = time.monotonic() + 10
+        for index, proc in procs.items():
+            try:
+                proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                print(f"⚠️  worker {index} did not stop, killing it")
+                proc.kill()
+        print("✓ cluster stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
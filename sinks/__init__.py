@@ -0,0 +1,6 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# sinks/__init__.py
+
+from .parquet_archive import ParquetArchiveSink, read_archive
@@ -0,0 +1,350 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+ParquetArchiveSink
+==================
+
+Result sink that archives every processed batch to local Parquet files,
+next to what `ResultPublisher` sends over MQTT.  Per row it stores
+
+    ts                    record time (`timestamp_attribute`, UTC)
+    processed_at          when the batch went through the pipeline
+    <col>.raw             value as received
+    <col>.cleaned         value after correction
+    <col>.corrected       True where the cleaned value differs from the raw one
+    <col>.alarmed         True where a RaiseAlarm rule flagged the cell
+
+Layout (hive partitioning, readable by pyarrow / pandas / DuckDB / Spark)::
+
+    <root>/topic=<topic>/date=<YYYY-MM-DD>/part-<start>-<id>.parquet
+
+`emit()` only enqueues the batch; a writer thread converts it to Arrow,
+buffers rows per partition and writes them as one large row group
+(sorted by `ts`, with statistics) once `row_group_rows` are collected or
+`flush_interval` passed.  Files are rolled by size (`max_file_bytes`) or
+age (`max_file_age`) and carry a dot‑prefixed name until closed, so
+readers never see a file without footer.  `read_archive()` reads a time
+range with partition pruning and row‑group predicate pushdown on `ts`.
+"""
+from __future__ import annotations
+
+import importlib.util
+import math
+import os
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from monitoring.log import get_logger
+from monitoring.metrics import ARCHIVE_ROWS_WRITTEN, ARCHIVE_PENDING_BATCHES
+from utils.lazy import lazy_import
+
+log = get_logger(__name__)
+
+# optional dependency – only needed when a topic enables "archive"
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+ds = lazy_import("pyarrow.dataset")
+
+ARCHIVE_DIR_ENV = "DS2_ARCHIVE_DIR"
+
+_STOP = object()
+_FLUSH = object()
+
+
+def _require_pyarrow() -> None:
+    if importlib.util.find_spec("pyarrow") is None:
+        raise ImportError("The Parquet archive needs pyarrow: pip install pyarrow")
+
+
+def _to_arrow(series: pd.Series):
+    """Convert one column; mixed‑type object columns fall back to strings."""
+    try:
+        return pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        def _str(v):
+            if v is None or (isinstance(v, float) and math.isnan(v)):
+                return None
+            return str(v)
+        return pa.array(series.map(_str), type=pa.string())
+
+
+def _timestamps(values: pd.Series) -> pd.Series:
+    """Parse record timestamps to UTC; anything unparsable becomes NaT."""
+    try:
+        return pd.to_datetime(values, utc=True, errors="coerce", format="ISO8601")
+    except (TypeError, ValueError):
+        strings = values.map(lambda v: v if isinstance(v, str) else None)
+        return pd.to_datetime(strings, utc=True, errors="coerce", format="ISO8601")
+
+
+def _changed(raw: pd.Series, cleaned: pd.Series) -> np.ndarray:
+    r = raw.to_numpy(dtype=object)
+    c = cleaned.to_numpy(dtype=object)
+    both_na = pd.isna(r) & pd.isna(c)
+    try:
+        equal = np.asarray(r == c, dtype=bool)
+    except (ValueError, TypeError):
+        equal = np.fromiter((a == b for a, b in zip(r, c)), dtype=bool, count=len(r))
+    return ~(equal | both_na)
+
+
+class _PartitionFile:
+    """One open Parquet file of a partition (written under a hidden name until closed)."""
+
+    def __init__(self, directory: Path, schema, compression: str) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"part-{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:8]}.parquet"
+        self.final_path = directory / name
+        self.path = directory / f".{name}.inprogress"
+        self.schema = schema
+        self.opened_at = time.monotonic()
+        self.writer = pq.ParquetWriter(str(self.path), schema, compression=compression, write_statistics=True)
+
+    def write(self, table) -> None:
+        self.writer.write_table(table, row_group_size=max(1, table.num_rows))
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def close(self) -> None:
+        self.writer.close()
+        os.replace(self.path, self.final_path)
+
+
+class ParquetArchiveSink:
+    """Archive processed batches of one topic to Parquet, written off the processing thread."""
+
+    def __init__(
+        self,
+        topic: str,
+        timestamp_attribute: Optional[str] = None,
+        root: Optional[str | Path] = None,
+        row_group_rows: int = 65_536,
+        max_file_bytes: int = 128 << 20,
+        max_file_age: float = 3600.0,
+        flush_interval: float = 60.0,
+        max_pending: int = 256,
+        compression: str = "zstd",
+    ) -> None:
+        _require_pyarrow()
+        self.topic = topic
+        self.timestamp_attribute = timestamp_attribute
+        self.root = Path(root or os.getenv(ARCHIVE_DIR_ENV, "./archive"))
+        self.directory = self.root / f"topic={quote(topic, safe='')}"
+        self.row_group_rows = row_group_rows
+        self.max_file_bytes = max_file_bytes
+        self.max_file_age = max_file_age
+        self.flush_interval = flush_interval
+        self.compression = compression
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._buffers: Dict[str, List] = {}           # date → [tables]
+        self._buffered_rows: Dict[str, int] = {}
+        self._buffered_since: Dict[str, float] = {}
+        self._files: Dict[str, _PartitionFile] = {}
+        self._flushed = threading.Event()
+        self._rows_written = ARCHIVE_ROWS_WRITTEN.labels(topic)
+        ARCHIVE_PENDING_BATCHES.labels(topic).set_function(self._queue.qsize)
+        self._thread = threading.Thread(target=self._run, name=f"archive-{topic}", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, topic: str, topic_cfg: Dict) -> Optional["ParquetArchiveSink"]:
+        """Build from a topic's `"archive"` setting (`true` or a dict of constructor options)."""
+        archive = topic_cfg.get("archive")
+        if not archive:
+            return None
+        opts = dict(archive) if isinstance(archive, dict) else {}
+        if "dir" in opts:
+            opts["root"] = opts.pop("dir")
+        if "max_file_mb" in opts:
+            opts["max_file_bytes"] = int(opts.pop("max_file_mb") * (1 << 20))
+        return cls(topic, timestamp_attribute=topic_cfg.get("timestamp_attribute"), **opts)
+
+    # ------------------------------------------------------------------ #
+    #  public API (processing thread)
+    # ------------------------------------------------------------------ #
+    def emit(self, cleaned_df: pd.DataFrame, raw_df: pd.DataFrame, alarm_events: Sequence = ()) -> None:
+        """Hand a processed batch to the writer thread (blocks only if `max_pending` batches are queued)."""
+        self._queue.put((time.time(), raw_df, cleaned_df, list(alarm_events)))
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Write everything queued so far and close the open files (makes them readable)."""
+        self._flushed.clear()
+        self._queue.put(_FLUSH)
+        self._flushed.wait(timeout)
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+        # a sink replacing this one (pipeline swap) already took the series over
+        ARCHIVE_PENDING_BATCHES.remove_function(self._queue.qsize, self.topic)
+
+    # ------------------------------------------------------------------ #
+    #  writer thread
+    # ------------------------------------------------------------------ #
+    def _run(self) -> None:
+        tick = min(1.0, self.flush_interval)
+        while True:
+            try:
+                item = self._queue.get(timeout=tick)
+            except queue.Empty:
+                item = None
+            try:
+                if item is _STOP:
+                    self._flush_all(close=True)
+                    return
+                if item is _FLUSH:
+                    self._flush_all(close=True)
+                    self._flushed.set()
+                    continue
+                if item is not None:
+                    self._append(*item)
+                self._flush_due()
+            except Exception as e:   # keep archiving the next batches
+                log.warning("⚠️  Archive write failed for topic '%s': %s", self.topic, e)
+
+    def _append(self, processed_at: float, raw_df: pd.DataFrame, cleaned_df: pd.DataFrame, alarm_events) -> None:
+        frame = self._archive_frame(processed_at, raw_df, cleaned_df, alarm_events)
+        table = pa.Table.from_arrays([_to_arrow(frame[c]) for c in frame.columns], names=list(frame.columns))
+        days = frame["ts"].dt.strftime("%Y-%m-%d")
+        for day in days.unique():
+            part = table if len(days) == 1 or (days == day).all() else table.filter(pa.array((days == day).to_numpy()))
+            self._buffers.setdefault(day, []).append(part)
+            self._buffered_rows[day] = self._buffered_rows.get(day, 0) + part.num_rows
+            self._buffered_since.setdefault(day, time.monotonic())
+            if self._buffered_rows[day] >= self.row_group_rows:
+                self._write_partition(day)
+
+    def _archive_frame(self, processed_at: float, raw_df: pd.DataFrame, cleaned_df: pd.DataFrame,
+                       alarm_events) -> pd.DataFrame:
+        n = len(raw_df)
+        processed = pd.Timestamp(processed_at, unit="s", tz="UTC")
+        ts_attr = self.timestamp_attribute
+        if ts_attr and ts_attr in cleaned_df.columns:
+            ts = _timestamps(cleaned_df[ts_attr]).fillna(processed)
+        else:
+            ts = pd.Series(processed, index=cleaned_df.index)
+
+        alarmed: Dict[str, np.ndarray] = {}
+        for res in alarm_events:
+            col = res["expectation_config"]["kwargs"].get("column")
+            idx = res["result"].get("unexpected_index_list") or []
+            if col is None:
+                continue
+            pos = raw_df.index.get_indexer(idx)
+            flags = alarmed.setdefault(col, np.zeros(n, dtype=bool))
+            flags[pos[pos >= 0]] = True
+
+        columns = {"ts": ts.reset_index(drop=True), "processed_at": pd.Series(processed, index=range(n))}
+        no_flags = np.zeros(n, dtype=bool)
+        for col in dict.fromkeys(list(raw_df.columns) + list(cleaned_df.columns)):
+            raw = raw_df[col] if col in raw_df.columns else pd.Series([None] * n, index=raw_df.index)
+            cleaned = cleaned_df[col] if col in cleaned_df.columns else pd.Series([None] * n, index=raw_df.index)
+            columns[f"{col}.raw"] = raw.to_numpy()
+            columns[f"{col}.cleaned"] = cleaned.to_numpy()
+            columns[f"{col}.corrected"] = _changed(raw, cleaned)
+            columns[f"{col}.alarmed"] = alarmed.get(col, no_flags)
+        return pd.DataFrame(columns)
+
+    def _flush_due(self) -> None:
+        now = time.monotonic()
+        for day in [d for d, since in self._buffered_since.items() if now - since >= self.flush_interval]:
+            self._write_partition(day)
+        for day in [d for d, f in self._files.items() if now - f.opened_at >= self.max_file_age]:
+            self._roll(day)
+
+    def _flush_all(self, close: bool) -> None:
+        for day in list(self._buffers):
+            self._write_partition(day)
+        if close:
+            for day in list(self._files):
+                self._roll(day)
+
+    def _write_partition(self, day: str) -> None:
+        tables = self._buffers.pop(day, [])
+        self._buffered_rows.pop(day, None)
+        self._buffered_since.pop(day, None)
+        if not tables:
+            return
+        try:
+            table = pa.concat_tables(tables, promote_options="permissive")
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            for t in tables:            # incompatible batches: one row group each
+                self._write_table(day, t)
+            return
+        self._write_table(day, table)
+
+    def _write_table(self, day: str, table) -> None:
+        table = table.sort_by("ts")
+        current = self._files.get(day)
+        if current is not None and not table.schema.equals(current.schema):
+            try:
+                table = table.cast(current.schema)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, ValueError):
+                self._roll(day)         # schema drift: start a new file
+                current = None
+        if current is None:
+            current = self._files[day] = _PartitionFile(self.directory / f"date={day}", table.schema, self.compression)
+        current.write(table)
+        self._rows_written.inc(table.num_rows)
+        if current.size() >= self.max_file_bytes:
+            self._roll(day)
+
+    def _roll(self, day: str) -> None:
+        f = self._files.pop(day, None)
+        if f is not None:
+            f.close()
+
+
+# ---------------------------------------------------------------------- #
+#  reading
+# ---------------------------------------------------------------------- #
+def _utc(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def read_archive(
+    root: str | Path | None = None,
+    topic: Optional[str] = None,
+    start=None,
+    end=None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read archived rows with `start <= ts < end`.  The time range prunes
+    `date=` partitions and is pushed down to the row‑group statistics.
+    """
+    _require_pyarrow()
+    root = Path(root or os.getenv(ARCHIVE_DIR_ENV, "./archive"))
+    partitioning = ds.partitioning(pa.schema([("topic", pa.string()), ("date", pa.string())]), flavor="hive")
+    dataset = ds.dataset(str(root), format="parquet", partitioning=partitioning)
+
+    conditions = []
+    if topic is not None:
+        conditions.append(ds.field("topic") == topic)
+    if start is not None:
+        start = _utc(start)
+        conditions.append(ds.field("date") >= start.strftime("%Y-%m-%d"))
+        conditions.append(ds.field("ts") >= pa.scalar(start.to_pydatetime(), type=pa.timestamp("ns", "UTC")))
+    if end is not None:
+        end = _utc(end)
+        conditions.append(ds.field("date") <= end.strftime("%Y-%m-%d"))
+        conditions.append(ds.field("ts") < pa.scalar(end.to_pydatetime(), type=pa.timestamp("ns", "UTC")))
+    expr = None
+    for c in conditions:
+        expr = c if expr is None else expr & c
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
@@ -0,0 +1,108 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_async_transport.py
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from batch import DataQueue
+from loadtest.transport_bench import _fake_broker, _trigger_flood
+from mqtt import AsyncMqttClient
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ---------------------------------------------------------------------------
+# 1)  Offloaded batches run in order, off the adding thread
+# ---------------------------------------------------------------------------
+def test_queue_hands_batches_to_executor_in_order():
+    seen, threads = [], set()
+
+    def on_batch(df):
+        threads.add(threading.get_ident())
+        seen.append(df["i"].tolist())
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    queue = DataQueue(3, on_batch, executor=executor)
+    for i in range(9):
+        queue.add({"i": i})
+    executor.shutdown(wait=True)
+
+    assert seen == [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
+    assert threading.get_ident() not in threads
+
+
+# ---------------------------------------------------------------------------
+# 2)  AsyncMqttClient receives and publishes on the event loop
+# ---------------------------------------------------------------------------
+def test_async_client_receives_on_the_loop():
+    port, n = _free_port(), 500
+    ready = threading.Event()
+    threading.Thread(target=_fake_broker, args=(port, n, ready), daemon=True).start()
+    assert ready.wait(5)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        client = AsyncMqttClient("127.0.0.1", port, loop=loop)
+        received, on_loop = [], []
+
+        def listener(topic, payload):
+            on_loop.append(threading.get_ident() == loop_thread)
+            received.append((topic, payload))
+
+        loop_thread = threading.get_ident()
+        client.add_listener(listener)
+        client.subscribe("bench/t")                    # before connecting: sent on CONNACK
+        client.start()
+        await client.wait_connected(timeout=5)
+        await client.subscribe_async("bench/u")
+        await loop.run_in_executor(None, _trigger_flood, "127.0.0.1", port, "", n)
+        for _ in range(500):
+            if len(received) >= 2 * n:
+                break
+            await asyncio.sleep(0.01)
+        await client.publish_async("bench/out", {"ok": True})
+        await client.aclose()
+        return received, on_loop
+
+    received, on_loop = asyncio.run(run())
+    assert len(received) == 2 * n
+    assert {topic for topic, _ in received} == {"bench/t", "bench/u"}
+    assert received[0][1]["stationId"] == "E403"
+    assert all(on_loop)
+
+
+# ---------------------------------------------------------------------------
+# 3)  A slow connect does not block the event loop
+# ---------------------------------------------------------------------------
+def test_connect_runs_off_the_loop():
+    async def run():
+        loop = asyncio.get_running_loop()
+        client = AsyncMqttClient("127.0.0.1", _free_port(), loop=loop, reconnect_delay=(0.05, 0.05))
+        attempts = []
+
+        def slow_connect(*args, **kwargs):           # DNS lookup / TCP connect to an unreachable broker
+            attempts.append(threading.get_ident())
+            time.sleep(0.3)
+            raise OSError("unreachable")
+
+        client._client.connect = slow_connect
+        client.start()
+        ticks = 0
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < 0.5:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        await client.aclose()
+        return attempts, ticks, threading.get_ident()
+
+    attempts, ticks, loop_thread = asyncio.run(run())
+    assert attempts and loop_thread not in attempts
+    assert ticks > 20                                  # a blocked loop would tick about once per attempt
@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_backfill.py
+import json
+
+import pandas as pd
+
+from backfill import clean_chunk, detect_format, read_chunks, with_neighbours
+from data_correction import CorrectionEngine, DataCorrection
+from data_correction.rule_index import RuleIndex
+
+RULES = {
+    "co": [
+        {"rule": "expect_column_values_to_be_between", "params": {"column": "co", "min_value": 0, "max_value": 0.9},
+         "handler": "SmoothingOutliers"},
+        {"rule": "expect_column_values_to_not_be_null", "params": {"column": "co"}, "handler": "RaiseAlarm"},
+    ],
+}
+
+
+def _validate(df):
+    """What GX reports for RULES, without a context."""
+    too_high = df.index[df["co"] > 0.9].tolist()
+    missing = df.index[df["co"].isna()].tolist()
+
+    def res(rule, rule_id, unexpected):
+        return {"success": not unexpected, "result": {"unexpected_index_list": unexpected},
+                "expectation_config": {"type": rule, "kwargs": {"column": "co"}, "meta": {"rule_id": rule_id}}}
+    return {"results": [res("expect_column_values_to_be_between", "air-quality/co/0", too_high),
+                        res("expect_column_values_to_not_be_null", "air-quality/co/1", missing)]}
+
+
+def _engine():
+    engine = CorrectionEngine.__new__(CorrectionEngine)     # rules from RULES, not config/validations
+    engine._config_name = "backfill-test_air-quality"
+    engine._own_index = RuleIndex("air-quality", RULES)
+    engine._corrector = DataCorrection()
+    return engine
+
+
+# ---------------------------------------------------------------------------
+# 1)  Chunks are exact and carry their neighbours
+# ---------------------------------------------------------------------------
+def test_chunks_and_neighbours(tmp_path):
+    path = tmp_path / "rows.ndjson"
+    path.write_text("".join(json.dumps({"n": i, "m": {"v": i * 2}}) + "\n" for i in range(10)))
+    assert detect_format(path) == "ndjson"
+
+    chunks = list(read_chunks(path, "ndjson", 4, flatten=True))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    assert list(chunks[0].columns) == ["n", "m.v"]
+
+    windows = list(with_neighbours(iter(chunks), 2))
+    assert [(no, start) for no, start, *_ in windows] == [(0, 0), (1, 4), (2, 8)]
+    _no, _start, before, core, after = windows[1]
+    assert before["n"].tolist() == [2, 3] and core["n"].tolist() == [4, 5, 6, 7] and after["n"].tolist() == [8, 9]
+    assert windows[0][2].empty and windows[2][4].empty
+
+    csv = tmp_path / "rows.csv"
+    pd.concat(chunks, ignore_index=True).to_csv(csv, index=False)
+    assert [len(c) for c in read_chunks(csv, "csv", 3)] == [3, 3, 3, 1]
+
+
+# ---------------------------------------------------------------------------
+# 2)  Cleaning chunk by chunk gives what one long run gives
+# ---------------------------------------------------------------------------
+def test_chunked_cleaning_matches_whole_run():
+    co = [0.2, 0.3, 0.4, 5.0, 0.2, 0.5, 0.3, 0.25, 7.0, 0.1, 0.2, 0.3, 0.4, None, 0.2]
+    df = pd.DataFrame({"co": co, "station": ["LJ"] * len(co)})
+    engine = _engine()
+
+    whole, whole_report = clean_chunk(_validate, engine, 0, pd.DataFrame(), df, pd.DataFrame())
+    assert whole.loc[3, "co"] <= 0.9 and whole.loc[8, "co"] <= 0.9
+    assert [line["row"] for line in whole_report if line["kind"] == "alarm"] == [13]
+
+    parts, report = [], []
+    for _no, start, before, core, after in with_neighbours(
+            (df.iloc[i:i + 4].reset_index(drop=True) for i in range(0, len(df), 4)), 3):
+        cleaned, lines = clean_chunk(_validate, engine, start, before, core, after)
+        parts.append(cleaned)
+        report += lines
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), whole)
+    assert report == whole_report
+    assert {(line["row"], line["before"]) for line in report if line["kind"] == "correction"} == {(3, 5.0), (8, 7.0)}
+
+
+# ---------------------------------------------------------------------------
+# 3)  --restart discards only what a run wrote
+# ---------------------------------------------------------------------------
+def test_restart_keeps_foreign_files(tmp_path):
+    from backfill import _discard
+
+    for name in ("checkpoint.json", "summary.json", "cleaned/part-00000.csv", "report/part-00000.ndjson",
+                 "notes.txt", "data/raw.csv", "cleaned/keep.csv"):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("x")
+
+    _discard(tmp_path)
+    left = sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*") if p.is_file())
+    assert left == ["cleaned/keep.csv", "data/raw.csv", "notes.txt"]
@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_batch_sizer.py
+import pytest
+
+from batch.batch_sizer import AdaptiveBatchSizer, from_config
+from batch.data_queue import DataQueue
+
+
+def _run(sizer, rate, fixed, per_row, batches=40):
+    """Feed `batches` batches arriving at `rate` rows/s and costing fixed + per_row·n seconds."""
+    for _ in range(batches):
+        n = sizer.size
+        sizer.processed(n, fixed + per_row * n)
+        sizer.sealed(n, n / rate)
+    return sizer.size
+
+
+# ---------------------------------------------------------------------------
+# 1)  The size follows the arrival rate within the latency target
+# ---------------------------------------------------------------------------
+def test_size_meets_latency_target():
+    sizer = AdaptiveBatchSizer("air-quality", initial=10, max_size=5000, target_latency_s=1.0)
+    size = _run(sizer, rate=200.0, fixed=0.1, per_row=0.0005)
+    # (n-1)/200 + 0.1 + 0.0005 n <= 1  →  n <= 164
+    assert 150 <= size <= 164
+
+    size = _run(sizer, rate=20.0, fixed=0.1, per_row=0.0005)
+    assert 15 <= size <= 18                        # slow nights: smaller batches
+
+
+# ---------------------------------------------------------------------------
+# 2)  Keeping up wins over the latency target; bounds and step limit hold
+# ---------------------------------------------------------------------------
+def test_size_keeps_up_when_target_is_unreachable():
+    sizer = AdaptiveBatchSizer("air-quality", initial=10, max_size=5000, target_latency_s=0.2)
+    # 0.15 s fixed cost at 1000 rows/s: needs n >= 1.25 · 150 / 0.5 = 375
+    size = _run(sizer, rate=1000.0, fixed=0.15, per_row=0.0005)
+    assert 375 <= size <= 400
+
+    bounded = AdaptiveBatchSizer("air-quality", initial=10, min_size=5, max_size=50)
+    assert _run(bounded, rate=1000.0, fixed=0.15, per_row=0.0005) == 50
+
+    stepped = AdaptiveBatchSizer("air-quality", initial=10, max_size=5000)
+    stepped.processed(10, 0.01)
+    assert stepped.sealed(10, 0.001) == 20         # at most doubles per batch
+
+
+def test_from_config():
+    assert from_config(5, "air-quality") == (5, None)
+    size, sizer = from_config("auto", "air-quality")
+    assert size == 50 and sizer.target_latency_s == 1.0
+    size, sizer = from_config({"min": 100, "max": 200, "target_latency_s": 0.5}, "air-quality")
+    assert size == 100 and sizer.max_size == 200
+    with pytest.raises(ValueError):
+        from_config({"min": 10, "max": 5}, "air-quality")
+
+
+# ---------------------------------------------------------------------------
+# 3)  The queue asks the sizer for the size of the next batch
+# ---------------------------------------------------------------------------
+def test_queue_applies_sized_batches():
+    class Fixed:
+        sizes = iter([3, 5, 4])
+
+        def sealed(self, rows, fill_seconds):
+            return next(self.sizes)
+
+    seen = []
+    queue = DataQueue(2, lambda df: seen.append(len(df.index)), sizer=Fixed())
+    for i in range(10):
+        queue.add({"co": i})
+
+    assert seen == [2, 3, 5]
+    assert queue.batch_size == 4
+
+
+# ---------------------------------------------------------------------------
+# 4)  Building a size does not touch the topic's gauge (only a managed pipeline exports it)
+# ---------------------------------------------------------------------------
+def test_from_config_leaves_gauge_alone():
+    from monitoring.metrics import REGISTRY
+
+    from_config(1, "gauge-test")
+    from_config("auto", "gauge-test")
+    assert 'ds2_batch_size_rows{topic="gauge-test"}' not in REGISTRY.render()
@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_cluster.py
+from collections import Counter
+
+import pytest
+
+from cluster import ClusterConfig, ClusterRouter, TopicSharding, owner
+
+
+class RecordingClient:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, topic, obj, qos=0):
+        self.published.append((topic, obj, qos))
+
+
+def _router(index, workers=3, **topics):
+    router = ClusterRouter(ClusterConfig(workers=workers, index=index), RecordingClient())
+    for topic, cfg in topics.items():
+        router.configure(topic, cfg)
+    return router
+
+
+# ---------------------------------------------------------------------------
+# 1)  Rendezvous hashing: balanced, and resizing moves only the lost keys
+# ---------------------------------------------------------------------------
+def test_owner_is_balanced_and_stable_on_resize():
+    keys = [f"station-{i}" for i in range(3000)]
+    before = {k: owner(k, 4) for k in keys}
+    counts = Counter(before.values())
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > 600
+
+    after = {k: owner(k, 3) for k in keys}           # worker 3 leaves
+    moved = [k for k in keys if before[k] != after[k]]
+    assert all(before[k] == 3 for k in moved)
+
+
+def test_shard_key_config():
+    topic_level = TopicSharding.from_config("air-quality", None)
+    assert not topic_level.per_device
+    assert topic_level.key({"stationId": "E403"}) == topic_level.key({})
+
+    per_device = TopicSharding.from_config("air-quality", {"shard_key": "stationId"})
+    assert per_device.per_device and per_device.ingress == "shared"
+    assert per_device.key({"stationId": "E403", "co": 1}) == per_device.key({"stationId": "E403", "co": 2})
+    assert per_device.key({"stationId": "E403"}) != per_device.key({"stationId": "E404"})
+
+    with pytest.raises(ValueError):
+        TopicSharding.from_config("air-quality", {"shard_key": ["stationId"], "ingress": "fanout"})
+
+
+# ---------------------------------------------------------------------------
+# 2)  Subscriptions and routing per mode
+# ---------------------------------------------------------------------------
+def test_topic_sharding_subscribes_only_on_owner():
+    routers = [_router(i, **{"air-quality": None}) for i in range(3)]
+    hosts = [r for r in routers if r.hosts("air-quality")]
+    assert len(hosts) == 1
+    assert hosts[0].subscription("air-quality") == "air-quality"
+    assert [r.subscription("air-quality") for r in routers].count(None) == 2
+
+
+def test_shared_ingress_forwards_rows_to_owner():
+    cfg = {"air-quality": {"shard_key": ["stationId"]}}
+    routers = [_router(i, **cfg) for i in range(3)]
+    assert routers[0].subscription("air-quality") == "$share/ds2/air-quality"
+
+    rows = [{"stationId": f"E{i}", "co": 0.1} for i in range(30)]
+    receiver = routers[0]
+    local = [row for row in rows if receiver.route("air-quality", row)]
+    forwarded = receiver._mqtt.published
+    assert len(local) + len(forwarded) == len(rows)
+    for topic, row, qos in forwarded:
+        target = receiver.owner_of("air-quality", row)
+        assert topic == f"ds2/cluster/ds2/{target}/air-quality" and qos == 1
+        assert routers[target].config.forwarded_topic(topic) == "air-quality"
+        assert routers[target].route("air-quality", row)
+
+
+def test_broadcast_ingress_processes_each_row_exactly_once():
+    cfg = {"air-quality": {"shard_key": ["stationId"], "ingress": "broadcast"}}
+    routers = [_router(i, **cfg) for i in range(3)]
+    assert {r.subscription("air-quality") for r in routers} == {"air-quality"}
+
+    rows = [{"stationId": f"E{i}"} for i in range(50)]
+    taken = Counter(id(row) for r in routers for row in rows if r.route("air-quality", row))
+    assert len(taken) == 50 and set(taken.values()) == {1}
+    assert all(not r._mqtt.published for r in routers)
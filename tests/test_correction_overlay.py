@@ -0,0 +1,131 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_correction_overlay.py
+import json
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from data_correction import CorrectionEngine, CorrectionOverlay, DataCorrection
+from data_correction.rule_index import RuleIndex
+from mqtt import AlarmPublisher, ResultPublisher
+from mqtt.result_publisher import SLICE_ROWS
+
+RULES = {
+    "no2": [
+        {"rule": "expect_column_values_to_be_between", "params": {"column": "no2", "min_value": 2, "max_value": 25},
+         "handler": "SmoothingOutliers"},
+        {"rule": "expect_column_values_to_be_between", "params": {"column": "no2", "min_value": 2, "max_value": 20},
+         "handler": "SmoothingOutliers"},
+    ],
+    "o3": [{"rule": "expect_column_values_to_not_be_null", "params": {"column": "o3"}, "handler": "RaiseAlarm"}],
+}
+TOPIC = {"publish": {"validated": "out", "alarm": "alarm"}, "timestamp_attribute": "dateTo"}
+
+
+def _batch():
+    return pd.DataFrame({
+        "no2": [10, 12, 90, 11, 24, 13, 12],
+        "o3": [1.0, None, 3.0, 4.0, 5.0, 6.0, 7.0],
+        "dateTo": [f"2025-06-01T0{i}:00:00" for i in range(7)],
+        "_seq": list(range(7)),
+    })
+
+
+def _results():
+    def res(rule_id, rule, column, unexpected):
+        return {"success": False, "result": {"unexpected_index_list": unexpected},
+                "expectation_config": {"type": rule, "kwargs": {"column": column}, "meta": {"rule_id": rule_id}}}
+    return {"results": [res("air-quality/no2/0", "expect_column_values_to_be_between", "no2", [2]),
+                        res("air-quality/no2/1", "expect_column_values_to_be_between", "no2", [4]),
+                        res("air-quality/o3/0", "expect_column_values_to_not_be_null", "o3", [1])]}
+
+
+def _engine():
+    engine = CorrectionEngine.__new__(CorrectionEngine)     # rules from RULES, not config/validations
+    engine._config_name = "overlay-test_air-quality"
+    engine._own_index = RuleIndex("air-quality", RULES)
+    engine._corrector = DataCorrection()
+    return engine
+
+
+def _copied(df):
+    """What the engine did before the overlay: a deep copy, one more copy per corrected column."""
+    cleaned = df.copy()
+    corrector, index = DataCorrection(), RuleIndex("air-quality", RULES)
+    for res in _results()["results"]:
+        rule = index.resolve(res)
+        if rule.strategy is not None:
+            cleaned[rule.column] = corrector.correct_column(
+                cleaned[rule.column], res["result"]["unexpected_index_list"], strategy=rule.strategy,
+                min=rule.min_value, max=rule.max_value)
+    return cleaned
+
+
+# ---------------------------------------------------------------------------
+# 1)  Same cleaned values and dtypes as a corrected copy; the raw batch is untouched
+# ---------------------------------------------------------------------------
+def test_overlay_matches_corrected_copy():
+    df = _batch()
+    raw = df.copy()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)      # float into an int column, as before
+        expected = _copied(df)
+        overlay, alarms, corrected = _engine().overlay(_results(), df)
+        frame = overlay.to_frame()
+
+    assert isinstance(overlay, CorrectionOverlay)
+    assert set(overlay.patches) == {"no2"} and set(overlay.patches["no2"]) == {2, 4}
+    assert corrected == {2, 4} and len(alarms) == 1
+    pd.testing.assert_frame_equal(frame, expected)
+    pd.testing.assert_frame_equal(df, raw)
+    # the second rule smoothed row 4 with the first rule's correction of row 2 as a neighbour
+    assert overlay.at[4, "no2"] == expected.at[4, "no2"] and overlay.at[0, "dateTo"] == "2025-06-01T00:00:00"
+    assert np.shares_memory(frame["o3"].to_numpy(), df["o3"].to_numpy())
+    assert not np.shares_memory(frame["no2"].to_numpy(), df["no2"].to_numpy())
+
+
+# ---------------------------------------------------------------------------
+# 2)  Publishers emit the same messages from an overlay as from the copy
+# ---------------------------------------------------------------------------
+def test_publishers_accept_overlay():
+    df = _batch()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        expected = _copied(df)
+        overlay, alarms, _ = _engine().overlay(_results(), df)
+
+    def published(cleaned):
+        sent = []
+        publish = lambda topic, obj: sent.append((topic, json.dumps(obj)))
+        for alarm in alarms:
+            AlarmPublisher(TOPIC, publish).emit(cleaned, alarm)
+        ResultPublisher(TOPIC, publish).emit(cleaned, df)
+        return sent
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)    # the patched column is materialized here
+        assert published(overlay) == published(expected)
+    assert json.loads(published(overlay)[3][1])["no2.cleaned"] != 90
+    assert published(CorrectionOverlay(df)) == published(df)
+
+
+# ---------------------------------------------------------------------------
+# 3)  Rows are serialized in slices; per-row flags keep their row
+# ---------------------------------------------------------------------------
+def test_result_rows_across_slices():
+    n = SLICE_ROWS * 2 + 7
+    df = pd.DataFrame({"v": np.arange(n, dtype=float), "dateTo": [f"2025-06-01T00:{i % 60:02d}:00" for i in range(n)]})
+    overlay = CorrectionOverlay(df)
+    overlay.patch("v", {SLICE_ROWS: -1.0, n - 1: -2.0})
+    degraded = ["sample" if i % 3 == 0 else None for i in range(n)]
+
+    sent = []
+    ResultPublisher(TOPIC, lambda _topic, obj: sent.append(obj)).emit(overlay, df, degraded)
+
+    assert len(sent) == n
+    assert [row["v.cleaned"] for row in sent if row["v.cleaned"] < 0] == [-1.0, -2.0]
+    assert sent[SLICE_ROWS]["v.raw"] == float(SLICE_ROWS)
+    assert [i for i, row in enumerate(sent) if "degraded" in row] == [i for i in range(n) if i % 3 == 0]
@@ -0,0 +1,83 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_dedupe.py
+import pytest
+
+from batch.dedupe import BloomWindow, DedupeWindow, from_config
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _row(i, station="E403", co=0.2):
+    return {"dateFrom": f"2025-06-01T{i:02d}:00:00", "stationId": station, "co": co}
+
+
+# ---------------------------------------------------------------------------
+# 1)  Exact window: keys, payload hash, expiry and capacity
+# ---------------------------------------------------------------------------
+def test_key_fields_ignore_other_values():
+    window = DedupeWindow(key=["dateFrom", "stationId"])
+    assert not window.seen(_row(1))
+    assert window.seen(_row(1, co=99.0))            # same key, different value → duplicate
+    assert not window.seen(_row(1, station="E404"))
+
+
+def test_payload_hash_and_ignored_fields():
+    window = DedupeWindow(ignore=["_sent_ts"])
+    assert not window.seen({**_row(1), "_sent_ts": 1.0})
+    assert window.seen({**_row(1), "_sent_ts": 2.0})
+    assert not window.seen(_row(1, co=0.3))
+
+
+def test_payload_hash_ignores_key_order_and_number_format():
+    window = DedupeWindow()
+    assert not window.seen({"co": 1, "stationId": "E403", "pm": {"a": 2.0, "b": [1, 2]}})
+    assert window.seen({"pm": {"b": [1.0, 2], "a": 2}, "stationId": "E403", "co": 1.0})   # re-serialized retry
+    assert not window.seen({"co": 1.5, "stationId": "E403", "pm": {"a": 2, "b": [1, 2]}})
+
+
+def test_entries_expire_and_are_capped():
+    clock = FakeClock()
+    window = DedupeWindow(window=10, max_entries=3, clock=clock)
+    for i in range(3):
+        window.seen(_row(i))
+    clock.now = 5
+    assert window.seen(_row(0))
+    window.seen(_row(3))                            # evicts the oldest key
+    assert len(window) == 3
+    assert not window.seen(_row(0))
+
+    clock.now = 100
+    assert not window.seen(_row(3))
+    assert len(window) == 1
+
+
+# ---------------------------------------------------------------------------
+# 2)  Bloom window: no false negatives, rotation forgets old keys
+# ---------------------------------------------------------------------------
+def test_bloom_window_detects_duplicates_and_rotates():
+    clock = FakeClock()
+    window = BloomWindow(window=10, capacity=10_000, error_rate=0.001, clock=clock)
+    assert not any(window.seen(_row(i % 24, station=str(i))) for i in range(1000))
+    assert all(window.seen(_row(i % 24, station=str(i))) for i in range(1000))
+
+    clock.now = 6                                   # one rotation: still remembered
+    assert window.seen(_row(0, station="0"))
+    clock.now = 30                                  # beyond a full window: forgotten
+    assert not window.seen(_row(0, station="0"))
+
+
+def test_from_config_resolves_timestamp_placeholder():
+    window = from_config({"key": ["$timestamp", "stationId"], "window_s": 60}, "dateFrom")
+    assert isinstance(window, DedupeWindow)
+    assert not window.seen(_row(1))
+    assert window.seen(_row(1, co=1.0))
+    assert from_config(None) is None
+    assert isinstance(from_config({"mode": "bloom"}), BloomWindow)
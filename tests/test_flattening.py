@@ -0,0 +1,74 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_flattening.py
+import json
+import pathlib
+
+import pytest
+
+from batch.flattening import Flattener, from_config, parse_path
+
+DEMO = pathlib.Path(__file__).resolve().parents[1] / "demo_data"
+
+PAYLOAD = {
+    "station": {"id": "LJ", "geo": {"lat": 46.05, "lon": 14.5}},
+    "a/b": 1,
+    "readings": [{"co": 0.3, "q": {"flag": "ok"}}, {"co": 0.9}],
+    "dateTo": "2025-06-01T01:00:00",
+}
+
+
+# ---------------------------------------------------------------------------
+# 1)  `true` flattens like the shipped pre-flattened demo file
+# ---------------------------------------------------------------------------
+def test_flatten_all_matches_flattened_demo_file():
+    nested = json.loads((DEMO / "ARSO_weather_data.json").read_text())
+    flattened = json.loads((DEMO / "ARSO_weather_data_flattened.json").read_text())
+    flatten = from_config(True)
+    assert [row for payload in nested for row in flatten(payload)] == flattened
+    assert from_config(None) is None and from_config(False) is None
+
+
+# ---------------------------------------------------------------------------
+# 2)  Field paths: dotted, JSON pointer, array index; what happens to the rest
+# ---------------------------------------------------------------------------
+def test_fields_and_rest():
+    assert parse_path("/a~1b/c~0d") == ("a/b", "c~d")
+    assert parse_path("x.y") == ("x", "y")
+
+    fields = {"station.id": "station", "/station/geo/lat": "lat", "/a~1b": "ab",
+              "readings.1.co": "second_co", "station.missing": "gone"}
+    assert Flattener(fields)(PAYLOAD) == [{"station": "LJ", "lat": 46.05, "ab": 1, "second_co": 0.9}]
+
+    [kept] = Flattener({"station.id": "station"}, rest="keep")(PAYLOAD)
+    assert kept == {"station": "LJ", "a/b": 1, "readings": PAYLOAD["readings"], "dateTo": "2025-06-01T01:00:00"}
+
+    [flat] = Flattener({"readings.0.co": "co"}, rest="flatten", separator="_")(PAYLOAD)
+    assert flat == {"co": 0.3, "station_id": "LJ", "station_geo_lat": 46.05, "station_geo_lon": 14.5,
+                    "a/b": 1, "dateTo": "2025-06-01T01:00:00"}
+
+    with pytest.raises(ValueError):
+        Flattener(rest="everything")
+    with pytest.raises(ValueError):
+        Flattener(rest="drop")
+
+
+# ---------------------------------------------------------------------------
+# 3)  Explode: one row per array element
+# ---------------------------------------------------------------------------
+def test_explode_array():
+    rows = from_config({"explode": "readings", "explode_prefix": ""})(PAYLOAD)
+    assert rows == [
+        {"station.id": "LJ", "station.geo.lat": 46.05, "station.geo.lon": 14.5, "a/b": 1,
+         "dateTo": "2025-06-01T01:00:00", "co": 0.3, "q.flag": "ok"},
+        {"station.id": "LJ", "station.geo.lat": 46.05, "station.geo.lon": 14.5, "a/b": 1,
+         "dateTo": "2025-06-01T01:00:00", "co": 0.9},
+    ]
+
+    rows = from_config({"fields": {"station.id": "station"}, "explode": "readings"})(PAYLOAD)
+    assert rows == [{"station": "LJ", "readings.co": 0.3, "readings.q.flag": "ok"},
+                    {"station": "LJ", "readings.co": 0.9}]
+
+    assert from_config({"explode": "readings"})({"station": "LJ", "readings": []}) == \
+        [{"station": "LJ", "readings": []}]
@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_lazy_suites.py
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+gx = pytest.importorskip("great_expectations")
+
+RULES = {"air-quality": {"co": [{"rule": "expect_column_values_to_be_between",
+                                 "params": {"column": "co", "min_value": 0, "max_value": 1},
+                                 "handler": "SmoothingOutliers"}]}}
+
+
+@pytest.fixture
+def gx_init(tmp_path, monkeypatch):
+    config = tmp_path / "config"
+    (config / "validations").mkdir(parents=True)
+    for tenant in ("used", "orphan-1", "orphan-2"):
+        (config / "validations" / f"{tenant}.json").write_text(json.dumps(RULES))
+    (config / "generated_mqtt_config.json").write_text(json.dumps(
+        {"topics": {"air-quality": {"topic": "air-quality", "validation_config": "used_air-quality"}}}))
+    monkeypatch.chdir(tmp_path)
+
+    from validation.gx_init import GXInitializer
+    return GXInitializer(str(tmp_path / "gx"))
+
+
+# ---------------------------------------------------------------------------
+# 1)  Only referenced configs are built up front; others on first use, once
+# ---------------------------------------------------------------------------
+def test_suites_are_built_on_first_use(gx_init):
+    from validation.gx_validation import validate_batch
+
+    assert set(gx_init.plans) == {"used_air-quality"}
+    assert len(gx_init.rule_indexes) == 3
+
+    plans = []
+    threads = [threading.Thread(target=lambda: plans.append(gx_init._plan(gx_init._live, "orphan-1_air-quality")))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(p) for p in plans}) == 1
+
+    result = validate_batch(pd.DataFrame({"co": [0.5, 3.0]}), "orphan-2_air-quality")
+    assert result["results"][0]["result"]["unexpected_index_list"] == [1]
+    assert set(gx_init.plans) == {"used_air-quality", "orphan-1_air-quality", "orphan-2_air-quality"}
+    assert validate_batch(pd.DataFrame({"co": [0.5]}), "missing_air-quality") is None
+
+
+# ---------------------------------------------------------------------------
+# 2)  A reload builds the configs in use again, not the whole directory
+# ---------------------------------------------------------------------------
+def test_reload_keeps_configs_in_use(gx_init):
+    gx_init._plan(gx_init._live, "orphan-1_air-quality")
+    gx_init.reload_gx()
+    assert set(gx_init.plans) == {"used_air-quality", "orphan-1_air-quality"}
+    assert all(plan.generation == 1 for plan in gx_init.plans.values())
+
+
+# ---------------------------------------------------------------------------
+# 3)  A reload publishes the rule index before the plans that emit its ids
+# ---------------------------------------------------------------------------
+def test_reload_publishes_rule_index_first(gx_init, monkeypatch):
+    from data_correction import rule_index
+    from validation import gx_validation
+
+    order = []
+    publish, use_context = rule_index.publish, gx_validation.use_context
+    monkeypatch.setattr(rule_index, "publish", lambda *a: (order.append("index"), publish(*a)))
+    monkeypatch.setattr(gx_validation, "use_context", lambda *a: (order.append("plans"), use_context(*a)))
+
+    gx_init.reload_gx()
+    assert order == ["index", "plans"]
@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_loadtest_measurement.py
+import json
+
+import pytest
+
+from loadtest.measurement import GateThresholds, LatencyRecorder, topic_map_from_config
+
+
+TOPIC_MAP = {
+    "out/validated": ("air-quality", "validated"),
+    "out/alarm": ("air-quality", "alarm"),
+}
+
+
+def _row(seq, sent, run="r1"):
+    return {"co.raw": 1.0, "_run.raw": run, "_seq.raw": seq, "_sent_ts.raw": sent}
+
+
+# ---------------------------------------------------------------------------
+# 1)  Latency, missing and duplicated rows per input topic
+# ---------------------------------------------------------------------------
+def test_report_counts_latency_missing_and_duplicates():
+    rec = LatencyRecorder(TOPIC_MAP, run_id="r1", expected={"air-quality": 5})
+    for seq in (0, 1, 1, 3):
+        rec.observe("out/validated", _row(seq, sent=100.0), recv_ts=100.2)
+    rec.observe("out/validated", _row(4, sent=100.0, run="other"), recv_ts=100.2)
+    rec.observe("out/alarm", {"_run": "r1", "_seq": 3, "_sent_ts": 100.0, "type": "x"}, recv_ts=100.5)
+    rec.observe("out/alarm", {"_run": "r1", "_seq": 3, "_sent_ts": 100.0, "type": "x"}, recv_ts=100.5)
+    rec.observe("out/validated", {"co.raw": 1.0}, recv_ts=100.5)
+
+    report = rec.report()
+    topic = report["topics"]["air-quality"]
+    assert topic["received"] == 3
+    assert topic["missing"] == 2 and topic["missing_sample"] == [2, 4]
+    assert topic["duplicates"] == 1
+    assert topic["alarms"] == 2 and topic["alarm_duplicates"] == 1
+    assert report["latency"]["validated"]["p50_ms"] == pytest.approx(200.0, abs=1e-3)
+    assert report["latency"]["alarm"]["max_ms"] == pytest.approx(500.0, abs=1e-3)
+    assert report["other_runs"] == 1 and report["untraced"] == 1
+
+
+# ---------------------------------------------------------------------------
+# 2)  Manifest + gate
+# ---------------------------------------------------------------------------
+def test_manifest_and_gate(tmp_path):
+    manifest = tmp_path / "run.json"
+    manifest.write_text(json.dumps({"run_id": "r9", "per_topic": {"air-quality": 3}}), encoding="utf-8")
+    rec = LatencyRecorder(TOPIC_MAP)
+    rec.load_manifest(manifest)
+    assert rec.run_id == "r9"
+
+    for seq in range(3):
+        rec.observe("out/validated", _row(seq, sent=10.0 + seq, run="r9"), recv_ts=10.05 + seq)
+    report = rec.report()
+    assert LatencyRecorder.check(report, GateThresholds(max_p99_ms=100, max_missing=0, max_duplicates=0)) == []
+    failures = LatencyRecorder.check(report, GateThresholds(max_p99_ms=10, min_throughput=1000))
+    assert len(failures) == 2
+
+
+def test_topic_map_from_config(tmp_path):
+    cfg = tmp_path / "mqtt.json"
+    cfg.write_text(json.dumps({"topics": {"air-quality": {
+        "subscribe": "air-quality",
+        "publish": {"validated": "out/validated", "alarm": "out/alarm"},
+    }}}), encoding="utf-8")
+    assert topic_map_from_config(cfg) == TOPIC_MAP
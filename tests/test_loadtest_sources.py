@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_loadtest_sources.py
+import json
+
+import pytest
+
+from loadtest import sources
+from loadtest.pacing import RatePacer, TimestampScaler
+from loadtest.sources import iter_records, parse_timestamp
+
+
+RECORDS = [
+    {"dateTo": "2025-06-01T01:00:00", "co": 0.2, "o3": 78, "station": "LJ Bežigrad"},
+    {"dateTo": "2025-06-01T02:00:00", "co": 12345.678, "o3": None, "nested": {"a": [1, 2, 3]}},
+    {"dateTo": "2025-06-01T03:00:00", "co": 0.3, "o3": 41, "station": "]},{"},
+]
+
+
+# ---------------------------------------------------------------------------
+# 1)  JSON arrays are streamed correctly, even across tiny read chunks
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize("chunk", [1, 7, 64, 1 << 16])
+def test_json_array_streaming(tmp_path, monkeypatch, chunk):
+    monkeypatch.setattr(sources, "_CHUNK", chunk)
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(RECORDS, indent=2), encoding="utf-8")
+
+    assert list(iter_records(path)) == RECORDS
+
+
+def test_ndjson_streaming(tmp_path):
+    path = tmp_path / "data.ndjson"
+    path.write_text("\n".join(json.dumps(r) for r in RECORDS) + "\n\n", encoding="utf-8")
+
+    assert list(iter_records(path)) == RECORDS
+
+
+def test_non_list_root_is_rejected(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"not": "a list"}), encoding="utf-8")
+
+    # sniffed as NDJSON → a single object is a valid record
+    assert list(iter_records(path)) == [{"not": "a list"}]
+    with pytest.raises(ValueError):
+        list(iter_records(path, fmt="json"))
+
+
+# ---------------------------------------------------------------------------
+# 2)  Pacing: absolute deadlines, timestamp scaling
+# ---------------------------------------------------------------------------
+def test_rate_pacer_deadlines_do_not_drift():
+    pacer = RatePacer(rate=1000, start=10.0)
+    assert pacer.deadline(0) == 10.0
+    assert pacer.deadline(5000) == pytest.approx(15.0)
+
+
+def test_timestamp_scaler_compresses_record_time():
+    scaler = TimestampScaler(speedup=3600, start=0.0)
+    ts = [parse_timestamp(r["dateTo"]) for r in RECORDS]
+
+    assert [scaler.deadline(t) for t in ts] == pytest.approx([0.0, 1.0, 2.0])
+    # records without a timestamp follow the previous one
+    assert scaler.deadline(None) == pytest.approx(2.0)
+
+
+def test_parse_timestamp_formats():
+    assert parse_timestamp("2025-01-02T09:20:04Z") == parse_timestamp("2025-01-02T09:20:04")
+    assert parse_timestamp([2023, 1, 1, 23, 0]) == parse_timestamp("2023-01-01T23:00:00")
+    assert parse_timestamp("not a date") is None
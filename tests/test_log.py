@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_log.py
+import io
+import json
+import logging
+import queue
+import threading
+
+from monitoring.log import (
+    HotPathEvent, StructuredFormatter, _DroppingQueueHandler, configure_logging, get_logger, hot_path,
+    shutdown_logging,
+)
+from monitoring.metrics import LOG_RECORDS_DROPPED
+
+
+def _record(msg="hello", **fields):
+    record = logging.LogRecord("ds2.test", logging.DEBUG, __file__, 1, msg, None, None)
+    record.event, record.fields = "test.event", fields
+    return record
+
+
+# ---------------------------------------------------------------------------
+# 1)  Sampled events log every n-th call, and nothing below DEBUG
+# ---------------------------------------------------------------------------
+def test_hot_path_event_sampling():
+    seen = []
+    logger = get_logger("test.sampling")
+    logger.setLevel(logging.DEBUG)
+    logger.debug = lambda msg, extra: seen.append(extra["fields"]["i"])
+
+    event = HotPathEvent("test.sampling", logger, rate=0.1)
+    for i in range(50):
+        event("tick", i=i)
+    assert seen == [0, 10, 20, 30, 40]
+
+    seen.clear()
+    event.set_rate(0)
+    event("tick", i=1)
+    logger.setLevel(logging.INFO)
+    event.set_rate(1)
+    event("tick", i=2)
+    assert seen == []
+
+
+# ---------------------------------------------------------------------------
+# 2)  Field values are truncated, in text and JSON
+# ---------------------------------------------------------------------------
+def test_formatter_truncates_fields():
+    record = _record(payload=b"x" * 500, n=3)
+
+    text = StructuredFormatter(field_max=10).format(record)
+    assert text.endswith("payload=xxxxxxxxxx…(+490 B) n=3")
+
+    doc = json.loads(StructuredFormatter(json_lines=True, field_max=10).format(record))
+    assert doc["payload"] == "xxxxxxxxxx…(+490 B)"
+    assert doc["n"] == 3 and doc["event"] == "test.event" and doc["msg"] == "hello"
+
+
+# ---------------------------------------------------------------------------
+# 3)  A full queue drops records instead of blocking
+# ---------------------------------------------------------------------------
+def test_full_queue_drops_records():
+    handler = _DroppingQueueHandler(queue.Queue(maxsize=1))
+    before = LOG_RECORDS_DROPPED.labels().value()
+    for _ in range(3):
+        handler.handle(_record())
+    assert handler.queue.qsize() == 1
+    assert LOG_RECORDS_DROPPED.labels().value() - before == 2
+
+
+# ---------------------------------------------------------------------------
+# 4)  Formatting happens on the listener thread, not the caller
+# ---------------------------------------------------------------------------
+def test_fields_are_formatted_off_the_calling_thread():
+    formatted_on = []
+
+    class Probe:
+        def __repr__(self):
+            formatted_on.append(threading.get_ident())
+            return "probe"
+
+    stream = io.StringIO()
+    configure_logging(level="DEBUG", fmt="text", sample={"test.probe": 1}, stream=stream)
+    try:
+        hot_path("test.probe", "test.probe")("probe", value=Probe())
+    finally:
+        shutdown_logging()
+        configure_logging(level="INFO")
+
+    assert "value=probe" in stream.getvalue()
+    assert formatted_on and threading.get_ident() not in formatted_on
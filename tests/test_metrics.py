@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_metrics.py
+import threading
+
+import pytest
+
+from monitoring.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+# ---------------------------------------------------------------------------
+# 1)  Counters sum up the per-thread cells on scrape
+# ---------------------------------------------------------------------------
+def test_counter_is_exact_across_threads(registry):
+    counter = registry.counter("ds2_test_total", "test counter", ("topic",))
+    child = counter.labels("air-quality")
+
+    def work():
+        for _ in range(10_000):
+            child.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert child.value() == 80_000
+    assert 'ds2_test_total{topic="air-quality"} 80000' in registry.render()
+
+
+# ---------------------------------------------------------------------------
+# 2)  Histograms render cumulative buckets, sum and count
+# ---------------------------------------------------------------------------
+def test_histogram_exposition(registry):
+    hist = registry.histogram("ds2_test_seconds", "test histogram", ("stage",), buckets=(0.1, 1.0))
+    child = hist.labels("validate")
+    for value in (0.05, 0.5, 0.5, 5.0):
+        child.observe(value)
+
+    text = registry.render()
+    assert "# TYPE ds2_test_seconds histogram" in text
+    assert 'ds2_test_seconds_bucket{stage="validate",le="0.1"} 1' in text
+    assert 'ds2_test_seconds_bucket{stage="validate",le="1"} 3' in text
+    assert 'ds2_test_seconds_bucket{stage="validate",le="+Inf"} 4' in text
+    assert 'ds2_test_seconds_count{stage="validate"} 4' in text
+    assert 'ds2_test_seconds_sum{stage="validate"} 6.05' in text
+
+
+# ---------------------------------------------------------------------------
+# 3)  Function gauges are evaluated at scrape time and can be removed
+# ---------------------------------------------------------------------------
+def test_function_gauge_and_remove(registry):
+    gauge = registry.gauge("ds2_test_depth", "test gauge", ("topic",))
+    buffer = [1, 2, 3]
+    gauge.labels("iot-data").set_function(lambda: len(buffer))
+
+    assert 'ds2_test_depth{topic="iot-data"} 3' in registry.render()
+    buffer.append(4)
+    assert 'ds2_test_depth{topic="iot-data"} 4' in registry.render()
+
+    gauge.remove("iot-data")
+    assert 'topic="iot-data"' not in registry.render()
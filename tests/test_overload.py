@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_overload.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from batch.data_queue import DataQueue
+from batch.overload import CheapSuite, OverloadController, from_config
+
+
+RULES = {
+    "co": [
+        {"rule": "expect_column_values_to_be_between",
+         "params": {"column": "co", "min_value": 0, "max_value": 10}, "handler": "RaiseAlarm"},
+        {"rule": "expect_column_values_to_match_regex", "params": {"column": "co", "regex": "^[0-9.]+$"}},
+    ],
+    "station": [
+        {"rule": "expect_column_values_to_be_in_set",
+         "params": {"column": "station", "value_set": ["LJ", "MB"]}},
+        {"rule": "expect_column_values_to_not_be_null", "params": {"column": "station"}},
+    ],
+}
+
+
+# ---------------------------------------------------------------------------
+# 1)  Cheap checks: range, set and null rules only, GX-shaped results
+# ---------------------------------------------------------------------------
+def test_cheap_suite_keeps_range_set_and_null_checks():
+    suite = CheapSuite("air-quality", RULES)
+    assert len(suite) == 3                         # the regex rule is skipped
+
+    df = pd.DataFrame({"co": [1.0, 12.0, None, -1.0], "station": ["LJ", "XX", None, "MB"]})
+    out = suite.validate(df)
+    by_id = {res["expectation_config"]["meta"]["rule_id"]: res for res in out["results"]}
+
+    assert by_id["air-quality/co/0"]["result"]["unexpected_index_list"] == [1, 3]   # nulls pass
+    assert by_id["air-quality/station/0"]["result"]["unexpected_index_list"] == [1]
+    assert by_id["air-quality/station/1"]["result"]["unexpected_index_list"] == [2]
+    assert out["success"] is False
+
+
+# ---------------------------------------------------------------------------
+# 2)  Escalation, recovery and back-off
+# ---------------------------------------------------------------------------
+def test_controller_escalates_and_recovers():
+    ctl = OverloadController("air-quality", RULES, max_backlog=100, escalate_after=2, recover_after=3)
+    assert ctl.mode == "normal"
+
+    ctl.observe(500, 0.01)
+    assert ctl.observe(500, 0.01) == "sample"
+    ctl.observe(500, 0.01)
+    assert ctl.observe(500, 0.01) == "cheap"
+
+    assert ctl.observe(80, 0.01) == "cheap"       # between half and the threshold: hold
+    for _ in range(2):
+        ctl.observe(10, 0.01)
+    assert ctl.observe(10, 0.01) == "sample"
+
+    # stepping back was premature: the next recovery needs twice the calm batches
+    ctl.observe(500, 0.01)
+    assert ctl.observe(500, 0.01) == "cheap"
+    for _ in range(5):
+        assert ctl.observe(10, 0.01) == "cheap"
+    assert ctl.observe(10, 0.01) == "sample"
+
+
+def test_latency_threshold_and_config():
+    ctl = from_config({"max_batch_latency_s": 0.1, "modes": ["passthrough"], "escalate_after": 1},
+                      "air-quality", RULES)
+    assert ctl.observe(0, 0.5) == "passthrough"
+    results, degraded = ctl.validate(pd.DataFrame({"co": [1.0]}), validator=None)
+    assert results["results"] == [] and degraded == "passthrough"
+
+    assert from_config(None, "air-quality") is None
+    with pytest.raises(ValueError):
+        from_config({"max_backlog": 10, "modes": ["drop"]}, "air-quality")
+
+
+# ---------------------------------------------------------------------------
+# 3)  Sample mode validates a subset and flags the other rows
+# ---------------------------------------------------------------------------
+def test_sample_mode_flags_unvalidated_rows():
+    ctl = OverloadController("air-quality", RULES, max_backlog=1, escalate_after=1, sample_rate=0.25, seed=7)
+    ctl.observe(10, 0.0)
+    assert ctl.mode == "sample"
+
+    df = pd.DataFrame({"co": range(8)})
+    seen = []
+    ctl.validate(df, lambda part: seen.append(list(part.index)))
+    _, flags = ctl.validate(df, lambda part: seen.append(list(part.index)))
+
+    assert len(seen[1]) == 2
+    assert [i for i, flag in enumerate(flags) if flag is None] == seen[1]
+    assert flags.count("sample") == 6
+
+
+# ---------------------------------------------------------------------------
+# 4)  The backlog counts batches waiting for the worker
+# ---------------------------------------------------------------------------
+def test_queue_backlog_includes_waiting_batches():
+    gate = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    queue = DataQueue(2, lambda df: gate.wait(), executor=executor)
+    for i in range(5):
+        queue.add({"co": i})
+
+    assert queue.depth() == 1
+    assert queue.backlog() == 5
+    gate.set()
+    executor.shutdown(wait=True)
+    assert queue.backlog() == 1
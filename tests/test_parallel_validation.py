@@ -0,0 +1,132 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_parallel_validation.py
+import pandas as pd
+import pytest
+
+from validation.parallel import column_groups, kind_of
+from validation.streaming_aggregates import StreamingSuite
+from validation.suite_plan import SuitePlan
+
+gx = pytest.importorskip("great_expectations")
+
+RULES = {
+    "tavg": [
+        {"rule": "expect_column_values_to_be_between",
+         "params": {"column": "tavg", "min_value": -30, "max_value": 40}, "handler": "SmoothingOutliers"},
+        {"rule": "expect_column_pair_values_a_to_be_greater_than_b",
+         "params": {"column_A": "tx", "column_B": "tavg", "or_equal": True}},
+    ],
+    "rh": [{"rule": "expect_column_values_to_be_between",
+            "params": {"column": "rh", "min_value": 0, "max_value": 100}, "handler": "RaiseAlarm"}],
+    "station": [{"rule": "expect_column_values_to_match_regex",
+                 "params": {"column": "station", "regex": "^[A-Z]+$"}}],
+    "tx": [{"rule": "expect_column_values_to_not_be_null", "params": {"column": "tx"}}],
+    "_table": [{"rule": "expect_table_row_count_to_be_between", "params": {"min_value": 1}}],
+    "pavg": [{"rule": "expect_column_mean_to_be_between",
+              "params": {"column": "pavg", "min_value": 900, "max_value": 1100}, "evaluation": "streaming"}],
+}
+
+DF = pd.DataFrame({
+    "tavg": [1.0, 55.0, 3.0, -2.0],
+    "tx": [2.0, 56.0, 2.0, None],
+    "rh": [50.0, 101.0, 20.0, 99.0],
+    "station": ["LJ", "mb", "CE", "KP"],
+    "pavg": [1000.0, 990.0, 1010.0, 1005.0],
+})
+
+
+def _compile(*plans):
+    """Both plans in one context: GX checks freshness against the last one created."""
+    from validation.gx_init import expectation_classes
+    classes = expectation_classes()
+    context = gx.get_context(mode="ephemeral")
+    batch = (context.data_sources.add_pandas("p").add_dataframe_asset("a")
+             .add_batch_definition_whole_dataframe("b"))
+    for plan in plans:
+        _add(context, batch, classes, plan)
+    return plans
+
+
+def _add(context, batch, classes, plan):
+    for key, entries in plan.entries.items():
+        suite = context.suites.add(gx.ExpectationSuite(name=plan.suite_name(key)))
+        for rule_id, entry in entries:
+            suite.add_expectation(classes[entry["rule"]](**entry["params"], meta={"rule_id": rule_id}))
+        plan.definitions[key] = context.validation_definitions.add(
+            gx.ValidationDefinition(data=batch, suite=suite, name=plan.definition_name(key)))
+
+
+def _outcome(result):
+    return [(res["expectation_config"]["meta"]["rule_id"], bool(res["success"]),
+             res["result"].get("unexpected_index_list")) for res in result["results"]]
+
+
+# ---------------------------------------------------------------------------
+# 1)  Groups never share a column; table rules stay in the first group
+# ---------------------------------------------------------------------------
+def test_column_groups_are_disjoint():
+    entries = [(f"r{i}", entry) for i, entry in
+               enumerate(e for rules in RULES.values() for e in rules if "evaluation" not in e)]
+    groups = column_groups(entries, 3)
+
+    assert len(groups) == 3
+    assert "expect_table_row_count_to_be_between" in [e["rule"] for _r, e in groups[0]]
+    # the pair rule ties tx and tavg together
+    tied = [g for g in groups if any(e["params"].get("column") == "tavg" for _r, e in g)][0]
+    assert {e["params"].get("column") for _r, e in tied} >= {"tavg", "tx"}
+    assert sorted(r for g in groups for r, _e in g) == sorted(r for r, _e in entries)
+
+    assert kind_of([entries[3]], "auto") == "process"        # regex
+    assert kind_of([entries[0]], "auto") == "thread"
+    assert kind_of([entries[3]], "thread") == "thread"
+
+
+# ---------------------------------------------------------------------------
+# 2)  Parallel runs give the serial results, in config order
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize("mode", ["thread", "auto"])
+def test_parallel_plan_matches_serial(mode):
+    serial, parallel = _compile(SuitePlan("cfg", "weather", RULES),
+                                SuitePlan("cfg", "weather", RULES, parallel={"workers": 3, "mode": mode}))
+    assert len(parallel.definitions) > len(serial.definitions)
+
+    expected = sorted(_outcome(serial.run(DF)))
+    result = parallel.run(DF)
+    assert sorted(_outcome(result)) == expected
+    assert [rid for rid, _s, _i in _outcome(result)] == [
+        "weather/tavg/0", "weather/tavg/1", "weather/rh/0", "weather/station/0", "weather/tx/0", "weather/_table/0"]
+    assert result.success is False and result.statistics["evaluated_expectations"] == 6
+
+    # streaming rules are merged into the parallel result as into a GX result
+    merged = StreamingSuite(RULES, "weather").merge(result, DF)
+    assert len(merged.results) == 7
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        SuitePlan("cfg", "weather", RULES, parallel={"workers": 2, "mode": "gpu"})
+
+
+# ---------------------------------------------------------------------------
+# 3)  Worker processes drop suites of superseded generations
+# ---------------------------------------------------------------------------
+def test_worker_keeps_only_recent_generations(monkeypatch):
+    from validation import parallel
+
+    monkeypatch.setattr(parallel, "_worker_context", None)
+    monkeypatch.setattr(parallel, "_worker_definitions", {})
+    monkeypatch.setattr(parallel, "_worker_generations", {})
+    entries = [("weather/rh/0", RULES["rh"][0])]
+
+    for generation in (1, 2, 3):
+        plan = SuitePlan("cfg", "weather", {"rh": RULES["rh"]}, generation=generation)
+        key = next(iter(plan.entries))
+        result = parallel.run_in_process(plan.suite_name(key), entries, "COMPLETE", DF[["rh"]],
+                                         plan.slot(key), generation)
+        assert result["success"] is False
+
+    assert sorted(parallel._worker_definitions) == [plan.suite_name(key).replace("_g3", f"_g{g}") for g in (2, 3)]
+    assert list(parallel._worker_generations[plan.slot(key)]) == [2, 3]
+    assert sorted(s.name for s in parallel._worker_context.suites.all()) == sorted(parallel._worker_definitions)
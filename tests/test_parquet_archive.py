@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_parquet_archive.py
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from sinks import ParquetArchiveSink, read_archive
+
+
+def _batch(day: str, values):
+    raw = pd.DataFrame({
+        "dateFrom": [f"{day}T{h:02d}:00:00" for h in range(len(values))],
+        "co": values,
+        "station": ["LJ Bežigrad"] * len(values),
+    })
+    cleaned = raw.copy()
+    cleaned.loc[1, "co"] = 0.5                                 # corrected cell
+    alarm = {
+        "expectation_config": {"kwargs": {"column": "co"}},
+        "result": {"unexpected_index_list": [2]},
+    }
+    return raw, cleaned, [alarm]
+
+
+@pytest.fixture
+def sink(tmp_path):
+    s = ParquetArchiveSink("air-quality", timestamp_attribute="dateFrom", root=tmp_path / "archive",
+                           row_group_rows=1_000, flush_interval=3600)
+    yield s
+    s.close()
+
+
+# ---------------------------------------------------------------------------
+# 1)  Raw, cleaned and per-cell flags land in topic/day partitions
+# ---------------------------------------------------------------------------
+def test_batches_are_archived_with_flags(sink, tmp_path):
+    for day in ("2025-06-01", "2025-06-02"):
+        raw, cleaned, alarms = _batch(day, [0.1, 99.0, 42.0, 0.2])
+        sink.emit(cleaned, raw, alarms)
+    sink.flush(timeout=10)
+
+    parts = sorted(p.relative_to(tmp_path / "archive").parent.as_posix()
+                   for p in (tmp_path / "archive").rglob("*.parquet"))
+    assert parts == ["topic=air-quality/date=2025-06-01", "topic=air-quality/date=2025-06-02"]
+
+    df = read_archive(tmp_path / "archive", topic="air-quality").sort_values("ts").reset_index(drop=True)
+    assert len(df) == 8
+    assert df["co.raw"].tolist()[:4] == [0.1, 99.0, 42.0, 0.2]
+    assert df["co.cleaned"].tolist()[:4] == [0.1, 0.5, 42.0, 0.2]
+    assert df["co.corrected"].tolist()[:4] == [False, True, False, False]
+    assert df["co.alarmed"].tolist()[:4] == [False, False, True, False]
+    assert not df["station.corrected"].any()
+
+
+# ---------------------------------------------------------------------------
+# 2)  Time-range reads
+# ---------------------------------------------------------------------------
+def test_read_archive_time_range(sink, tmp_path):
+    for day in ("2025-06-01", "2025-06-02", "2025-06-03"):
+        raw, cleaned, alarms = _batch(day, [1.0, 2.0, 3.0])
+        sink.emit(cleaned, raw, alarms)
+    sink.flush(timeout=10)
+
+    df = read_archive(tmp_path / "archive", start="2025-06-02T01:00:00", end="2025-06-03T00:00:00")
+    assert sorted(df["dateFrom.raw"]) == ["2025-06-02T01:00:00", "2025-06-02T02:00:00"]
+
+
+def test_mixed_type_columns_fall_back_to_strings(sink, tmp_path):
+    raw = pd.DataFrame({"dateFrom": ["2025-06-01T00:00:00"] * 3, "co": [0.1, "n/a", None]})
+    sink.emit(raw.copy(), raw, [])
+    sink.flush(timeout=10)
+
+    df = read_archive(tmp_path / "archive")
+    assert df["co.raw"].tolist() == ["0.1", "n/a", None]
+
+
+# ---------------------------------------------------------------------------
+# 3)  Closing a replaced sink keeps its successor's pending-batches series
+# ---------------------------------------------------------------------------
+def test_close_keeps_successors_gauge(tmp_path):
+    from monitoring.metrics import REGISTRY
+
+    series = 'ds2_archive_pending_batches{topic="swap-test"}'
+    old = ParquetArchiveSink("swap-test", timestamp_attribute="dateFrom", root=tmp_path / "archive")
+    new = ParquetArchiveSink("swap-test", timestamp_attribute="dateFrom", root=tmp_path / "archive")
+    old.close()
+    assert series in REGISTRY.render()
+    new.close()
+    assert series not in REGISTRY.render()
@@ -0,0 +1,57 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_projection.py
+from batch.projection import from_config
+
+TOPIC_CFG = {"variables": ["co", "no2"], "timestamp_attribute": "dateFrom"}
+RULES = {
+    "co": [{"rule": "expect_column_values_to_be_between", "params": {"column": "co", "min_value": 0}}],
+    "neuerTest": [{"rule": "expect_column_values_to_not_be_null", "params": {"column": "neuerTest"}}],
+}
+
+
+# ---------------------------------------------------------------------------
+# 1)  Only declared, rule, alarm and passthrough keys survive
+# ---------------------------------------------------------------------------
+def test_projection_keeps_declared_and_referenced_keys():
+    project = from_config({"passthrough": ["stationId"]}, TOPIC_CFG, RULES)
+    row = {"co": 0.2, "no2": 17, "dateFrom": "2025-06-01T00:00:00", "dateTo": "2025-06-01T01:00:00",
+           "neuerTest": 1, "_seq": 7, "stationId": "E403", "stationName": "LJ Bežigrad", "pm10": 17}
+
+    assert project(row) == {"co": 0.2, "no2": 17, "dateFrom": "2025-06-01T00:00:00", "neuerTest": 1,
+                            "dateTo": "2025-06-01T01:00:00", "_seq": 7, "stationId": "E403"}
+    assert "pm10" in row                       # the input row is left untouched
+
+
+# ---------------------------------------------------------------------------
+# 2)  Missing keys stay absent; no setting means no projection
+# ---------------------------------------------------------------------------
+def test_projection_missing_keys_and_disabled():
+    project = from_config(True, TOPIC_CFG)
+    assert project({"co": 1, "other": 2}) == {"co": 1}
+    assert from_config(None, TOPIC_CFG) is None
+    assert from_config(False, TOPIC_CFG) is None
+
+
+# ---------------------------------------------------------------------------
+# 3)  A rule added by a validation reload marks the pipeline for a rebuild
+# ---------------------------------------------------------------------------
+def test_new_rule_column_outdates_projection(monkeypatch):
+    from batch import batch_validator
+
+    configs = {"cfg": {"air-quality": RULES}}
+
+    class Provider:
+        def validation(self):
+            return configs
+
+    monkeypatch.setattr(batch_validator, "ConfigProvider", Provider)
+    validator = batch_validator.BatchValidator("cfg_air-quality", "air-quality")
+    assert "pm10" not in from_config(True, TOPIC_CFG, validator.rules).keys
+
+    pm10 = [{"rule": "expect_column_values_to_be_between", "params": {"column": "pm10", "max_value": 50}}]
+    configs["cfg"] = {"air-quality": {**RULES, "pm10": pm10}}
+    assert validator.outdated()
+    rebuilt = batch_validator.BatchValidator("cfg_air-quality", "air-quality")
+    assert "pm10" in from_config(True, TOPIC_CFG, rebuilt.rules).keys
@@ -0,0 +1,140 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_reconfigure.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from batch.data_queue import DataQueue
+from batch.wal import WriteAheadLog, read_segment
+
+
+ROWS = [{"co": 0.1 * i, "station": "LJ Bežigrad", "seq": i} for i in range(10)]
+
+
+def _logged_rows(wal: WriteAheadLog):
+    return [row for path in sorted(wal.directory.iterdir()) for row in read_segment(path)]
+
+
+# ---------------------------------------------------------------------------
+# 1)  Buffered rows move to the new queue, late adds are forwarded
+# ---------------------------------------------------------------------------
+def test_hand_over_moves_buffer_and_forwards_late_rows():
+    old_batches, new_batches = [], []
+    old = DataQueue(4, lambda df: old_batches.append(df.to_dict("records")))
+    new = DataQueue(4, lambda df: new_batches.append(df.to_dict("records")))
+    for row in ROWS[:6]:
+        old.add(row)
+
+    published = []
+    moved, held = old.hand_over(new, lambda: published.append(new))
+    assert moved == 2 and held >= 0.0
+    assert published == [new]
+
+    old.add(ROWS[6])          # a producer still holding the old queue
+    new.add(ROWS[7])
+    assert old.depth() == 0
+    assert old_batches == [ROWS[0:4]]
+    assert new_batches == [ROWS[4:8]]     # every row exactly once, in order
+
+
+# ---------------------------------------------------------------------------
+# 2)  A smaller batch size flushes the handed-over rows right away
+# ---------------------------------------------------------------------------
+def test_hand_over_to_smaller_batch_size(tmp_path):
+    wal = WriteAheadLog(tmp_path / "wal", "air-quality", fsync_interval=0)
+    old = DataQueue(8, lambda df: None, wal=wal)
+    for row in ROWS[:7]:
+        old.add(row)
+
+    batches = []
+    executor = ThreadPoolExecutor(max_workers=1)
+    new = DataQueue(3, lambda df: batches.append(df.to_dict("records")), wal=wal, executor=executor)
+    old.hand_over(new)
+    executor.shutdown(wait=True)
+
+    assert batches == [ROWS[0:3], ROWS[3:6]]
+    assert _logged_rows(wal) == ROWS[6:7]   # only the remainder is still logged
+    old.close()                             # the shared log now belongs to `new`
+    new.add(ROWS[7])
+    assert _logged_rows(wal) == ROWS[6:8]
+    new.close()
+
+
+# ---------------------------------------------------------------------------
+# 3)  A new log takes over the rows before the old segment is dropped
+# ---------------------------------------------------------------------------
+def test_hand_over_between_logs(tmp_path):
+    old_wal = WriteAheadLog(tmp_path / "old", "air-quality", fsync_interval=0)
+    new_wal = WriteAheadLog.from_config("air-quality", {"dir": str(tmp_path / "new")}, reuse=old_wal)
+    assert new_wal is not old_wal
+    assert WriteAheadLog.from_config("air-quality", {"dir": str(tmp_path / "old"),
+                                                     "fsync_interval_ms": 0}, reuse=old_wal) is old_wal
+
+    old = DataQueue(5, lambda df: None, wal=old_wal)
+    for row in ROWS[:3]:
+        old.add(row)
+    new = DataQueue(5, lambda df: None, wal=new_wal)
+    old.hand_over(new)
+    old.close()
+
+    assert _logged_rows(old_wal) == []
+    assert _logged_rows(new_wal) == ROWS[:3]
+    new.close()
+
+
+# ---------------------------------------------------------------------------
+# 4)  drain() processes a partial batch and releases its segment
+# ---------------------------------------------------------------------------
+def test_drain_processes_partial_batch(tmp_path):
+    wal = WriteAheadLog(tmp_path / "wal", "air-quality", fsync_interval=0)
+    batches = []
+    queue = DataQueue(5, lambda df: batches.append(df.to_dict("records")), wal=wal)
+    for row in ROWS[:3]:
+        queue.add(row)
+
+    assert queue.drain() == 3
+    assert queue.drain() == 0
+    assert batches == [ROWS[:3]]
+    assert _logged_rows(wal) == []
+    queue.close()
+
+
+# ---------------------------------------------------------------------------
+# 5)  A validation reload rebuilds the pipelines whose rules changed, warms up the rest
+# ---------------------------------------------------------------------------
+def test_refresh_validation_rebuilds_changed_pipelines(monkeypatch):
+    from batch import batch_validator
+    from batch.pipeline_manager import PipelineManager
+
+    rules = {"co": [{"rule": "expect_column_values_to_not_be_null", "params": {"column": "co"}}]}
+    configs = {"cfg": {"air-quality": rules, "weather": rules}}
+
+    class Provider:
+        def validation(self):
+            return configs
+
+    monkeypatch.setattr(batch_validator, "ConfigProvider", Provider)
+
+    warmed = []
+
+    class Pipeline:
+        def __init__(self, topic):
+            self.validator = batch_validator.BatchValidator(f"cfg_{topic}", topic)
+
+        def warm_up(self, batches):
+            warmed.append(self.validator.topic)
+
+    manager = PipelineManager.__new__(PipelineManager)     # no MQTT client, no config files
+    manager._lock = threading.RLock()
+    manager._pipelines = {topic: Pipeline(topic) for topic in ("air-quality", "weather")}
+    manager._specs = {topic: {"validation_config": "cfg"} for topic in manager._pipelines}
+    replaced = []
+    manager._replace = lambda topic, spec: replaced.append(topic) or True
+
+    assert manager.refresh_validation() == 0
+    assert warmed == ["air-quality", "weather"]             # new suites, same rules: warmed up again
+    warmed.clear()
+    configs["cfg"] = {**configs["cfg"], "weather": {**rules, "o3": rules["co"]}}
+    assert manager.refresh_validation() == 1
+    assert replaced == ["weather"] and warmed == ["air-quality"]
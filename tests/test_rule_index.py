@@ -0,0 +1,58 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_rule_index.py
+import pandas as pd
+
+from data_correction import DataCorrection
+from data_correction.correction_strategies import SmoothingOutliers
+from data_correction.rule_index import RuleIndex
+
+RULES = {
+    "co": [
+        {"rule": "expect_column_values_to_not_be_null", "params": {"column": "co"}, "handler": "RaiseAlarm"},
+        {"rule": "expect_column_values_to_be_between", "params": {"column": "co", "min_value": 0, "max_value": 0.9},
+         "handler": "SmoothingOutliers"},
+    ],
+    "o3": [{"rule": "expect_column_values_to_not_be_null", "params": {"column": "o3"}, "id": "o3-present"}],
+}
+
+
+def _result(rule, column, rule_id=None):
+    config = {"type": rule, "kwargs": {"column": column}}
+    if rule_id:
+        config["meta"] = {"rule_id": rule_id}
+    return {"success": False, "expectation_config": config, "result": {"unexpected_index_list": [1]}}
+
+
+# ---------------------------------------------------------------------------
+# 1)  Results resolve by id, whatever their order; strategies are prebuilt
+# ---------------------------------------------------------------------------
+def test_index_resolves_by_rule_id():
+    index = RuleIndex("air-quality", RULES)
+    between = index.resolve(_result("expect_column_values_to_be_between", "co", "air-quality/co/1"))
+    alarm = index.resolve(_result("expect_column_values_to_not_be_null", "co", "air-quality/co/0"))
+
+    assert isinstance(between.strategy, SmoothingOutliers) and not between.alarm
+    assert (between.min_value, between.max_value) == (0, 0.9)
+    assert alarm.alarm and alarm.strategy is None
+    assert index.get("o3-present").column == "o3"
+    assert len(index) == 3
+
+
+# ---------------------------------------------------------------------------
+# 2)  Results without an id fall back to the rule type on that column
+# ---------------------------------------------------------------------------
+def test_index_falls_back_to_column_and_type():
+    index = RuleIndex("air-quality", RULES)
+    assert index.resolve(_result("expect_column_values_to_be_between", "co")).rule_id == "air-quality/co/1"
+    assert index.resolve(_result("expect_column_values_to_be_unique", "co")) is None
+
+
+# ---------------------------------------------------------------------------
+# 3)  DataCorrection takes a ready strategy instance
+# ---------------------------------------------------------------------------
+def test_correct_column_uses_given_strategy():
+    column = pd.Series([1.0, 100.0, 1.0, 1.0])
+    corrected = DataCorrection().correct_column(column, [1], strategy=SmoothingOutliers(), max=0.9)
+    assert corrected.tolist() == [1.0, 0.9, 1.0, 1.0]
@@ -0,0 +1,151 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_scheduler.py
+import threading
+import time
+
+import pytest
+
+from batch.scheduler import BatchScheduler
+
+
+@pytest.fixture
+def scheduler():
+    s = BatchScheduler(workers=1, quantum=0.004)
+    yield s
+    s.shutdown()
+
+
+def _hold(scheduler):
+    """Occupy the only worker until the returned event is set."""
+    gate, started = threading.Event(), threading.Event()
+    blocker = scheduler.lane("_gate")
+    blocker.submit(lambda: (started.set(), gate.wait()))
+    started.wait()
+    return gate
+
+
+def _work(order, topic, seconds=0.002):
+    def run():
+        order.append(topic)
+        time.sleep(seconds)
+    return run
+
+
+# ---------------------------------------------------------------------------
+# 1)  Deficit round-robin shares processing time by weight
+# ---------------------------------------------------------------------------
+def test_drr_shares_time_by_weight(scheduler):
+    order = []
+    heavy = scheduler.lane("air-quality", {"weight": 3})
+    light = scheduler.lane("weather", {"weight": 1})
+    gate = _hold(scheduler)
+    futures = [lane.submit(_work(order, lane.topic)) for _ in range(40) for lane in (light, heavy)]
+    gate.set()
+    for f in futures:
+        f.result()
+
+    first = order[:40]
+    assert 26 <= first.count("air-quality") <= 34
+    assert order.count("weather") == 40          # work-conserving: nothing is dropped
+
+
+# ---------------------------------------------------------------------------
+# 2)  Priorities first, latency SLOs at risk before everything
+# ---------------------------------------------------------------------------
+def test_priority_and_slo_boost(scheduler):
+    order = []
+    alarms = scheduler.lane("alarms", {"priority": 1})
+    weather = scheduler.lane("weather")
+    critical = scheduler.lane("critical", {"priority": -1, "latency_slo_s": 0.02})
+
+    gate = _hold(scheduler)
+    futures = [weather.submit(_work(order, "weather")) for _ in range(3)]
+    futures += [alarms.submit(_work(order, "alarms")) for _ in range(3)]
+    futures.append(critical.submit(_work(order, "critical")))
+    time.sleep(0.015)                             # `critical` has used 75 % of its SLO
+    gate.set()
+    for f in futures:
+        f.result()
+
+    assert order == ["critical", "alarms", "alarms", "alarms", "weather", "weather", "weather"]
+
+
+# ---------------------------------------------------------------------------
+# 3)  A topic's batches run one at a time and in order; shutdown drains them
+# ---------------------------------------------------------------------------
+def test_lane_keeps_order_and_shutdown_waits():
+    scheduler = BatchScheduler(workers=3)
+    lane = scheduler.lane("air-quality")
+    seen, running, overlap = [], [0], []
+
+    def batch(i):
+        running[0] += 1
+        overlap.append(running[0])
+        time.sleep(0.001)
+        seen.append(i)
+        running[0] -= 1
+
+    for i in range(20):
+        lane.submit(batch, i)
+    lane.shutdown(wait=True)
+
+    assert seen == list(range(20))
+    assert max(overlap) == 1
+    with pytest.raises(RuntimeError):
+        lane.submit(batch, 99)
+    scheduler.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# 4)  An SLO that cannot be met does not starve the other topics
+# ---------------------------------------------------------------------------
+def test_boost_borrows_bounded_credit():
+    scheduler = BatchScheduler(workers=1, quantum=0.004, boost_credit=2)
+    order = []
+    urgent = scheduler.lane("air-quality", {"latency_slo_s": 0.001})
+    other = scheduler.lane("weather")
+    gate = _hold(scheduler)
+    futures = [lane.submit(_work(order, lane.topic)) for _ in range(20) for lane in (urgent, other)]
+    gate.set()
+    for f in futures:
+        f.result()
+    scheduler.shutdown()
+
+    assert order[:20].count("weather") >= 6
+
+
+# ---------------------------------------------------------------------------
+# 5)  A sync request leaves the topic's lane alone
+# ---------------------------------------------------------------------------
+def test_sync_processing_does_not_touch_lanes(scheduler, monkeypatch):
+    import pandas as pd
+
+    from batch import BatchPipeline, batch_pipeline
+
+    class Validator:                    # no GX context or validation configs here
+        def __init__(self, config_name, topic):
+            pass
+
+        def __call__(self, df):
+            return {"results": []}
+
+    class Engine:
+        def __init__(self, topic, config_name, corrector):
+            pass
+
+        def run(self, results, df):
+            return df, [], set()
+
+    monkeypatch.setattr(batch_pipeline, "BatchValidator", Validator)
+    monkeypatch.setattr(batch_pipeline, "CorrectionEngine", Engine)
+    monkeypatch.setattr(BatchPipeline, "_scheduler", scheduler)
+    lane = scheduler.lane("air-quality", {"weight": 4, "priority": 1, "latency_slo_s": 2.0})
+
+    df = pd.DataFrame({"co": [0.1]})
+    assert batch_pipeline.process_sync("air-quality", "cfg_air-quality", df) is df
+    batch_pipeline.process_sync("no-such-topic", "cfg_no-such-topic", df)
+
+    assert (lane.weight, lane.priority, lane.latency_slo_s) == (4.0, 1, 2.0)
+    assert set(scheduler._lanes) == {"air-quality"}
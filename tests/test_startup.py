@@ -0,0 +1,47 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_startup.py
+import sys
+
+from monitoring.startup_trace import StartupTrace
+from utils.lazy import LazyModule, lazy_import
+
+
+# ---------------------------------------------------------------------------
+# 1)  Lazy imports resolve on first attribute access only
+# ---------------------------------------------------------------------------
+def test_lazy_import_defers_until_attribute_access(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    mod = lazy_import("colorsys")
+
+    assert isinstance(mod, LazyModule)
+    assert "colorsys" not in sys.modules
+    assert mod.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+
+
+def test_lazy_import_returns_loaded_module_directly():
+    assert lazy_import("json") is sys.modules["json"]
+
+
+# ---------------------------------------------------------------------------
+# 2)  Startup trace: phases and readiness
+# ---------------------------------------------------------------------------
+def test_startup_trace_phases_and_ready():
+    trace = StartupTrace()
+    with trace.phase("build GX suites"):
+        assert trace.current == "build GX suites"
+    assert not trace.ready
+
+    trace.mark_ready()
+    report = trace.report()
+    assert report["ready"] and report["current_phase"] is None
+    assert [p["phase"] for p in report["phases"]] == ["build GX suites"]
+
+
+def test_startup_trace_records_failure():
+    trace = StartupTrace()
+    trace.mark_failed(RuntimeError("broker down"))
+    assert not trace.ready
+    assert trace.report()["error"] == "RuntimeError: broker down"
@@ -0,0 +1,96 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_streaming_aggregates.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from validation.streaming_aggregates import (
+    Moments, QuantileSketch, StreamingExpectation, StreamingSuite, Window, is_streaming,
+)
+
+
+# ---------------------------------------------------------------------------
+# 1)  A sliding window of summaries matches recomputing over its batches
+# ---------------------------------------------------------------------------
+def test_sliding_moments_and_sketch_match_recomputation():
+    rng = np.random.default_rng(7)
+    batches = [rng.normal(50, 10, size=int(rng.integers(5, 40))) for _ in range(60)]
+    moments = Window(Moments, batches=8)
+    sketch = Window(QuantileSketch, batches=8)
+
+    for i, batch in enumerate(batches):
+        m = moments.push(Moments.of(batch))
+        q = sketch.push(QuantileSketch.of(batch))
+        window = np.concatenate(batches[max(0, i - 7):i + 1])
+        assert m.n == len(window)
+        assert m.mean == pytest.approx(window.mean())
+        assert m.stdev() == pytest.approx(window.std(ddof=1))
+        exact = np.sort(window)[int(0.5 * (len(window) - 1))]
+        assert q.quantile(0.5) == pytest.approx(exact, rel=0.011)
+
+
+# ---------------------------------------------------------------------------
+# 2)  Tumbling windows start over once they are full; min_rows gates results
+# ---------------------------------------------------------------------------
+def test_tumbling_window_and_min_rows():
+    rule = StreamingExpectation("expect_column_mean_to_be_between", {"column": "co", "max_value": 1.0},
+                                {"type": "tumbling", "rows": 6, "min_rows": 4})
+    first = rule.evaluate(pd.DataFrame({"co": [5.0, 5.0, 5.0]}))
+    assert first["success"] and first["result"]["window_rows"] == 3        # below min_rows
+    full = rule.evaluate(pd.DataFrame({"co": [5.0, 5.0, 5.0]}, index=[3, 4, 5]))
+    assert not full["success"] and full["result"]["unexpected_index_list"] == [5]
+    fresh = rule.evaluate(pd.DataFrame({"co": [0.5]}))
+    assert fresh["result"]["window_rows"] == 1
+
+
+# ---------------------------------------------------------------------------
+# 3)  KL divergence and most common value
+# ---------------------------------------------------------------------------
+def test_kl_divergence_and_most_common_value():
+    kl = StreamingExpectation("expect_column_kl_divergence_to_be_less_than",
+                              {"column": "x", "threshold": 0.1,
+                               "partition_object": {"bins": [0, 1, 2], "weights": [0.5, 0.5]}})
+    assert kl.evaluate(pd.DataFrame({"x": [0.5, 1.5, 0.2, 1.8]}))["result"]["observed_value"] == pytest.approx(0.0)
+    assert not kl.evaluate(pd.DataFrame({"x": [5.0]}))["success"]                 # mass outside the bins
+
+    mode = StreamingExpectation("expect_column_most_common_value_to_be_in_set",
+                                {"column": "s", "value_set": ["E403"]}, {"batches": 2})
+    assert mode.evaluate(pd.DataFrame({"s": ["E403", "E403", "E404"]}))["success"]
+    assert not mode.evaluate(pd.DataFrame({"s": ["E404"] * 3}))["success"]
+
+
+# ---------------------------------------------------------------------------
+# 4)  Streaming results are added to the GX results, tagged with their rule id
+# ---------------------------------------------------------------------------
+def test_suite_adds_streaming_results():
+    rules = {
+        "co": [
+            {"rule": "expect_column_values_to_be_between", "params": {"column": "co", "max_value": 9}},
+            {"rule": "expect_column_mean_to_be_between", "params": {"column": "co", "max_value": 1},
+             "evaluation": "streaming", "handler": "RaiseAlarm"},
+        ],
+        "o3": [{"rule": "expect_column_values_to_not_be_null", "params": {"column": "o3"}}],
+    }
+    assert is_streaming(rules["co"][1]) and not is_streaming(rules["co"][0])
+    validation = _ValidationResult([{"success": True, "result": {"unexpected_index_list": []},
+                                     "expectation_config": {"type": "expect_column_values_to_be_between",
+                                                            "kwargs": {"column": "co"}}}])
+
+    merged = StreamingSuite(rules, "air-quality").merge(validation, pd.DataFrame({"co": [2.0, 3.0], "o3": [1, 1]}))
+    assert len(merged["results"]) == 2
+    streamed = merged["results"][1]
+    assert streamed["expectation_config"]["meta"]["rule_id"] == "air-quality/co/1"
+    assert merged.success is False
+    assert not StreamingSuite({"o3": rules["o3"]})
+
+
+class _ValidationResult:
+    """Minimal stand-in for GX's ExpectationSuiteValidationResult (dict access and attributes)."""
+
+    def __init__(self, results):
+        self.success, self.results = True, results
+
+    def __getitem__(self, key):
+        return getattr(self, key)
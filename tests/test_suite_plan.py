@@ -0,0 +1,70 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_suite_plan.py
+import pandas as pd
+import pytest
+
+from validation.suite_plan import SuitePlan, result_format_of
+
+gx = pytest.importorskip("great_expectations")
+
+RULES = {
+    "co": [
+        {"rule": "expect_column_values_to_be_between",
+         "params": {"column": "co", "min_value": 0, "max_value": 1}, "handler": "SmoothingOutliers"},
+        {"rule": "expect_column_values_to_not_be_null", "params": {"column": "co"}},
+    ],
+    "o3": [{"rule": "expect_column_values_to_not_be_null", "params": {"column": "o3"}, "handler": "RaiseAlarm"}],
+    "no2": [{"rule": "expect_column_values_to_be_between", "params": {"column": "no2", "max_value": 5},
+             "result_format": "boolean_only"}],
+}
+
+
+def _compile(plan):
+    context = gx.get_context(mode="ephemeral")
+    batch = (context.data_sources.add_pandas("p").add_dataframe_asset("a")
+             .add_batch_definition_whole_dataframe("b"))
+    classes = {
+        "expect_column_values_to_be_between": gx.expectations.ExpectColumnValuesToBeBetween,
+        "expect_column_values_to_not_be_null": gx.expectations.ExpectColumnValuesToNotBeNull,
+    }
+    for fmt, entries in plan.entries.items():
+        suite = context.suites.add(gx.ExpectationSuite(name=plan.suite_name(fmt)))
+        for rule_id, entry in entries:
+            suite.add_expectation(classes[entry["rule"]](**entry["params"], meta={"rule_id": rule_id}))
+        plan.definitions[fmt] = context.validation_definitions.add(
+            gx.ValidationDefinition(data=batch, suite=suite, name=plan.definition_name(fmt)))
+
+
+# ---------------------------------------------------------------------------
+# 1)  Handlers get index lists, other rules a summary, pins win
+# ---------------------------------------------------------------------------
+def test_result_format_follows_handler():
+    assert [result_format_of(e) for e in RULES["co"]] == ["INDEX", "SUMMARY"]
+    assert result_format_of(RULES["no2"][0]) == "BOOLEAN_ONLY"
+    with pytest.raises(ValueError):
+        result_format_of({"rule": "r", "result_format": "everything"})
+
+
+# ---------------------------------------------------------------------------
+# 2)  Split runs come back as one result; every result carries its rule id
+# ---------------------------------------------------------------------------
+def test_plan_runs_each_format_and_merges_results():
+    plan = SuitePlan("cfg", "air-quality", RULES)
+    _compile(plan)
+    assert set(plan.definitions) == {"INDEX", "SUMMARY", "BOOLEAN_ONLY"}
+
+    df = pd.DataFrame({"co": [0.5, 3.0, None], "o3": [1.0, None, 2.0], "no2": [1, 9, 2]})
+    result = plan.run(df)
+    by_id = {r["expectation_config"]["meta"]["rule_id"]: r for r in result["results"]}
+    assert set(by_id) == {"air-quality/co/0", "air-quality/co/1", "air-quality/o3/0", "air-quality/no2/0"}
+
+    assert by_id["air-quality/co/0"]["result"]["unexpected_index_list"] == [1]
+    assert "unexpected_list" not in by_id["air-quality/co/0"]["result"]
+    assert by_id["air-quality/o3/0"]["result"]["unexpected_index_list"] == [1]
+    null_co = by_id["air-quality/co/1"]["result"]
+    assert "unexpected_index_list" not in null_co and null_co["unexpected_count"] == 1
+    assert not by_id["air-quality/no2/0"]["success"] and not by_id["air-quality/no2/0"]["result"]
+    assert result.success is False
+    assert result.statistics["evaluated_expectations"] == 4
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_wal.py
+import pytest
+
+from batch.data_queue import DataQueue
+from batch.wal import WriteAheadLog, read_segment
+
+
+ROWS = [{"co": 0.1 * i, "station": "LJ Bežigrad", "dateTo": f"2025-06-01T0{i}:00:00"} for i in range(7)]
+
+
+@pytest.fixture
+def wal_dir(tmp_path):
+    return tmp_path / "wal"
+
+
+def _segment_files(wal: WriteAheadLog):
+    return sorted(p.name for p in wal.directory.iterdir())
+
+
+# ---------------------------------------------------------------------------
+# 1)  Segments are released once their batch was processed
+# ---------------------------------------------------------------------------
+def test_published_batches_release_their_segment(wal_dir):
+    wal = WriteAheadLog(wal_dir, "air-quality", fsync_interval=0)
+    batches = []
+    queue = DataQueue(3, lambda df: batches.append(df.to_dict("records")), wal=wal)
+
+    for row in ROWS:
+        queue.add(row)
+
+    assert batches == [ROWS[0:3], ROWS[3:6]]
+    # only the segment of the partial batch is left
+    files = _segment_files(wal)
+    assert len(files) == 1
+    assert read_segment(wal.directory / files[0]) == ROWS[6:]
+    wal.close()
+
+
+# ---------------------------------------------------------------------------
+# 2)  A restart replays buffered and unpublished rows
+# ---------------------------------------------------------------------------
+def test_restart_replays_buffered_and_failed_batches(wal_dir):
+    wal = WriteAheadLog(wal_dir, "air-quality", fsync_interval=0.005)
+
+    def crash(df):
+        raise RuntimeError("broker gone")
+
+    queue = DataQueue(3, crash, wal=wal)
+    queue.add(ROWS[0])
+    queue.add(ROWS[1])
+    with pytest.raises(RuntimeError):
+        queue.add(ROWS[2])
+    for row in ROWS[3:5]:
+        queue.add(row)
+    queue.close()
+
+    batches = []
+    restarted = DataQueue(3, lambda df: batches.append(df.to_dict("records")),
+                          wal=WriteAheadLog(wal_dir, "air-quality", fsync_interval=0.005))
+    assert restarted.replay() == 5
+    assert batches == [ROWS[0:3]]
+    assert restarted.depth() == 2
+
+    restarted.add(ROWS[5])
+    assert batches == [ROWS[0:3], ROWS[3:6]]
+    restarted.close()
+    assert _segment_files(restarted._wal) == []
+
+
+def test_torn_tail_is_ignored(wal_dir):
+    wal = WriteAheadLog(wal_dir, "air-quality", fsync_interval=0)
+    for row in ROWS[:3]:
+        wal.append(row)
+    wal.close()
+    path = wal.directory / _segment_files(wal)[0]
+    path.write_bytes(path.read_bytes()[:-5])
+
+    assert read_segment(path) == ROWS[:2]
+
@@ -0,0 +1,40 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+# tests/test_warmup.py
+import re
+
+from batch.warmup import MAX_ROWS, synthetic_batch
+
+TOPIC = {"variables": ["co", "no2", "o3", "dateTo"], "timestamp_attribute": "dateFrom"}
+RULES = {
+    "co": [{"rule": "expect_column_values_to_be_between", "params": {"column": "co", "min_value": 0.0, "max_value": 0.9},
+            "handler": "SmoothingOutliers"}],
+    "o3": [{"rule": "expect_column_values_to_not_be_null", "params": {"column": "o3"}, "handler": "RaiseAlarm"}],
+    "station": [{"rule": "expect_column_values_to_be_in_set", "params": {"column": "station", "value_set": ["LJ", "MB"]}}],
+    "dateTo": [{"rule": "expect_column_values_to_match_regex",
+                "params": {"column": "dateTo", "regex": r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(Z|[+-]\d{2}(:?\d{2})?)$"},
+                "handler": "TimestampCorrection"}],
+}
+
+
+# ---------------------------------------------------------------------------
+# 1)  Columns of the topic; values pass the rules except in the middle rows
+# ---------------------------------------------------------------------------
+def test_synthetic_batch_follows_rules():
+    df = synthetic_batch(TOPIC, RULES, 10)
+
+    assert list(df.columns) == ["co", "no2", "o3", "dateTo", "dateFrom", "station"]
+    assert len(df.index) == 10
+    out_of_range = df.index[(df["co"] < 0.0) | (df["co"] > 0.9)].tolist()
+    assert out_of_range == [5]
+    assert df.index[df["o3"].isna()].tolist() == [6]
+    assert set(df["station"]) == {"LJ", "MB"}
+    regex = re.compile(RULES["dateTo"][0]["params"]["regex"])
+    assert [i for i, v in enumerate(df["dateTo"]) if not regex.match(v)] == [5]
+    assert df["no2"].notna().all()
+
+
+def test_synthetic_batch_size_is_bounded():
+    assert len(synthetic_batch(TOPIC, None, 1).index) == 2
+    assert len(synthetic_batch(TOPIC, None, 10 * MAX_ROWS).index) == MAX_ROWS
@@ -0,0 +1,54 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Lazy module imports.
+
+`lazy_import("great_expectations")` returns a stand‑in that imports the
+real module on first attribute access, so heavy dependencies are only
+paid for by the code path that actually needs them – not by `import
+main`.  The time the deferred import took is recorded as a startup phase.
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+import threading
+import types
+
+from monitoring.startup_trace import STARTUP
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that resolves itself on first use."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    with STARTUP.phase(f"import {self.__name__}"):
+                        module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, item: str):
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return the module if it is already imported, otherwise a `LazyModule`."""
+    return sys.modules.get(name) or LazyModule(name)
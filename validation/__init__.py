@@ -4,4 +4,5 @@
 # validation/__init__.py
 
 from .gx_validation import validate_batch
-from .gx_init import GXInitializer
\ No newline at end of file
+from .gx_init import GXInitializer
+from .streaming_aggregates import StreamingSuite
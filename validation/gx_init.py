@@ -1,17 +1,89 @@
 # SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
 # SPDX-License-Identifier: Apache-2.0
 
+import functools
 import os
 import shutil
-from typing import Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Set
 from config import ConfigProvider
 from utils.utils import topic_url_to_name
-import great_expectations as gx
+from utils.lazy import lazy_import
+from . import gx_validation
+from data_correction import rule_index
+from data_correction.rule_index import RuleIndex
+from .suite_plan import SuitePlan
+from monitoring.log import get_logger
+
+gx = lazy_import("great_expectations")
+log = get_logger(__name__)
+
+WARMUP_WORKERS = int(os.getenv("DS2_GX_WARMUP_WORKERS", "4"))   # threads building the suites in use
+
+
+def expectation_classes() -> Dict[str, type]:
+    """GX expectation class of every rule name a validation config may use."""
+    return {
+        "expect_column_values_to_be_between": gx.expectations.ExpectColumnValuesToBeBetween,
+        "expect_column_pair_values_a_to_be_greater_than_b": gx.expectations.ExpectColumnPairValuesAToBeGreaterThanB,
+        "expect_column_values_to_be_in_set": gx.expectations.ExpectColumnValuesToBeInSet,
+        "expect_column_values_to_match_regex": gx.expectations.ExpectColumnValuesToMatchRegex,
+        "expect_column_values_to_not_match_regex": gx.expectations.ExpectColumnValuesToNotMatchRegex,
+        "expect_column_values_to_match_regex_list": gx.expectations.ExpectColumnValuesToMatchRegexList,
+        "expect_column_values_to_not_match_regex_list": gx.expectations.ExpectColumnValuesToNotMatchRegexList,
+        "expect_column_values_to_be_unique": gx.expectations.ExpectColumnValuesToBeUnique,
+        "expect_column_values_to_not_be_null": gx.expectations.ExpectColumnValuesToNotBeNull,
+        "expect_column_values_to_be_null": gx.expectations.ExpectColumnValuesToBeNull,
+        "expect_column_values_to_match_json_schema": gx.expectations.ExpectColumnValuesToMatchJsonSchema,
+        "expect_column_values_to_be_of_type": gx.expectations.ExpectColumnValuesToBeOfType,
+        "expect_column_values_to_be_in_type_list": gx.expectations.ExpectColumnValuesToBeInTypeList,
+        "expect_column_pair_values_to_be_equal": gx.expectations.ExpectColumnPairValuesToBeEqual,
+        "expect_column_pair_values_to_be_in_set": gx.expectations.ExpectColumnPairValuesToBeInSet,
+        "expect_table_row_count_to_be_between": gx.expectations.ExpectTableRowCountToBeBetween,
+        "expect_table_row_count_to_equal": gx.expectations.ExpectTableRowCountToEqual,
+        "expect_table_column_count_to_be_between": gx.expectations.ExpectTableColumnCountToBeBetween,
+        "expect_table_column_count_to_equal": gx.expectations.ExpectTableColumnCountToEqual,
+        "expect_table_columns_to_match_ordered_list": gx.expectations.ExpectTableColumnsToMatchOrderedList,
+        "expect_table_columns_to_match_set": gx.expectations.ExpectTableColumnsToMatchSet,
+        "expect_column_kl_divergence_to_be_less_than": gx.expectations.ExpectColumnKLDivergenceToBeLessThan,
+        "expect_column_max_to_be_between": gx.expectations.ExpectColumnMaxToBeBetween,
+        "expect_column_mean_to_be_between": gx.expectations.ExpectColumnMeanToBeBetween,
+        "expect_column_median_to_be_between": gx.expectations.ExpectColumnMedianToBeBetween,
+        "expect_column_most_common_value_to_be_in_set": gx.expectations.ExpectColumnMostCommonValueToBeInSet,
+        "expect_column_stdev_to_be_between": gx.expectations.ExpectColumnStdevToBeBetween,
+        "expect_column_min_to_be_between": gx.expectations.ExpectColumnMinToBeBetween,
+        "expect_column_values_to_not_be_in_set": gx.expectations.ExpectColumnValuesToNotBeInSet,
+    }
+
+
+class _Generation:
+    """The suites compiled from one load of the validation configs."""
+
+    def __init__(self, number: int, sources: Dict[str, tuple], parallel: Dict[str, dict]):
+        self.number = number
+        self.sources = sources                      # config name → (config id, topic, rules)
+        self.parallel = parallel
+        self.suites: Dict[str, gx.ExpectationSuite] = {}
+        self.definitions: Dict[str, gx.ValidationDefinition] = {}
+        self.plans: Dict[str, SuitePlan] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def lock(self, config_name: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(config_name, threading.Lock())
+
 
 class GXInitializer:
     """
     Initializes the Great Expectations context, data source, expectation suites, and validation definitions
     based on a configuration file.
+
+    Suites are built per config name when a batch first needs them. Only the
+    configs a topic references (and those already in use, e.g. by sync
+    requests) are built up front, on up to `DS2_GX_WARMUP_WORKERS` threads.
     """
     def __init__(self, gx_root_dir: str = './validation'):
         self.gx_root_dir = gx_root_dir
@@ -19,31 +91,111 @@ class GXInitializer:
         self.context = None
         self.suites: Dict[str, gx.ExpectationSuite] = {}
         self.validation_definitions: Dict[str, gx.ValidationDefinition] = {}
+        self.plans: Dict[str, SuitePlan] = {}
+        self.rule_indexes: Dict[str, RuleIndex] = {}
+        self.parallel: Dict[str, dict] = {}         # config name → "parallel_validation" of its topic
+        self._generation = 0
+        self._live: Optional[_Generation] = None
+        self._previous: Optional[_Generation] = None   # the generation before the live one
+        self._reload_lock = threading.Lock()
 
         self._init_gx() 
         
     def _init_gx(self):
         """ Initializes the Great Expectations context and sets up the data source, expectation suites, and validation definitions.
         """
-        self.suites = {}
-        self.validation_definitions = {}
         # Delete existing gx folder for a fresh start.
         self._check_and_delete_gx_folder()
         # Initialize the GE context.
         self._initialize_context()
-        # Load validation configuration from JSON.
-        self._load_validation_config()
         # Create a data source and asset for MQTT data.
         self._create_data_source()
-        # Create expectation suites for each topic.
-        self._create_expectation_suites()
-        # Create validation definitions linking data and expectation suites.
-        self._create_validation_definitions()
+        self._compile()
+
+    def _compile(self):
+        """Load the current validation configs as a new generation, build the suites
+        in use and publish it in one step."""
+        # Load validation configuration from JSON.
+        self._load_validation_config()
+        parallel = self._parallel_options()
+        sources, rule_indexes = {}, {}
+        for id, topics in self.validation_config.items():
+            for topic, attributes in topics.items():
+                sources[f"{id}_{topic}"] = (id, topic, attributes)
+                rule_indexes[f"{id}_{topic}"] = RuleIndex(topic, attributes)
+        generation = _Generation(self._generation, sources, parallel)
+
+        in_use = (self._referenced() | set(self.plans)) & sources.keys()
+        t0 = time.perf_counter()
+        self._warm_up(generation, sorted(in_use))
+        log.info("✅ Built %d of %d validation plan(s) in %.2f s", len(in_use), len(sources), time.perf_counter() - t0)
+
+        self._live = generation
+        self.parallel = parallel
+        self.suites, self.validation_definitions = generation.suites, generation.definitions
+        self.plans, self.rule_indexes = generation.plans, rule_indexes
+        # Correct with the rule index compiled from the same config load.  It goes
+        # first: a batch still validating on the old plans looks its rule ids up in
+        # the new index (unchanged rules keep their ids, the rest resolve by column
+        # and type), while new ids against the old index would find nothing.
+        rule_index.publish(self.rule_indexes)
+        # Validate batches against this context instead of opening a second one;
+        # configs nobody referenced are built by the first batch that names them.
+        gx_validation.use_context(self.context, self.plans, functools.partial(self._plan, generation))
+
+    def _warm_up(self, generation: _Generation, names) -> None:
+        workers = min(WARMUP_WORKERS, len(names))
+        if workers <= 1:
+            for name in names:
+                self._plan(generation, name)
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gx-warmup") as pool:
+            list(pool.map(functools.partial(self._plan, generation), names))
+
+    def _referenced(self) -> Set[str]:
+        topics = ConfigProvider().mqtt().get("topics", {})
+        return {cfg["validation_config"] for cfg in topics.values() if cfg.get("validation_config")}
 
     def reload_gx(self):
-        """Reloads the Great Expectations context and its configurations."""
-        self._init_gx()
-        
+        """Reloads the validation configurations.
+
+        GX checks every run against the process‑wide project, so the context is
+        kept and the new generation of suites is added next to the running one;
+        batches keep validating on the old suites until the plans are swapped.
+        The generation before that is removed from the context afterwards.
+        """
+        with self._reload_lock:
+            t0 = time.perf_counter()
+            live = self._live
+            self._generation += 1
+            # nothing is published if this fails; the running generation stays in charge
+            self._compile()
+            stale, self._previous = self._previous, live
+            if stale is not None:
+                for plan in list(stale.plans.values()):
+                    self._remove_plan(plan)
+            log.info("✅ Reloaded %d validation plan(s) in %.2f s", len(self.plans), time.perf_counter() - t0)
+
+    def refresh_parallel(self) -> bool:
+        """Recompile if a topic's `"parallel_validation"` setting (kept in the MQTT
+        config) no longer matches the compiled plans; returns whether it did."""
+        if self._parallel_options() == self.parallel:
+            return False
+        self.reload_gx()
+        return True
+
+    def _parallel_options(self) -> Dict[str, dict]:
+        topics = ConfigProvider().mqtt().get("topics", {})
+        return {cfg["validation_config"]: cfg["parallel_validation"] for cfg in topics.values()
+                if cfg.get("parallel_validation") and cfg.get("validation_config")}
+
+    def _remove_plan(self, plan: SuitePlan):
+        for key in plan.entries:
+            try:
+                self.context.validation_definitions.delete(plan.definition_name(key))
+                self.context.suites.delete(plan.suite_name(key))
+            except Exception as e:
+                log.warning("⚠️  Could not remove superseded suite '%s': %s", plan.suite_name(key), e)
 
     def _check_and_delete_gx_folder(self):
         gx_folder_path = os.path.join(self.gx_root_dir, 'gx')
@@ -69,65 +221,51 @@ class GXInitializer:
         batch_definition_name = "mqtt-batch"
         self.batch_definition = self.data_asset.add_batch_definition_whole_dataframe(batch_definition_name)
 
-    def _create_expectation_suites(self):
-        expectation_mapping = {
-            "expect_column_values_to_be_between": gx.expectations.ExpectColumnValuesToBeBetween,
-            "expect_column_pair_values_a_to_be_greater_than_b": gx.expectations.ExpectColumnPairValuesAToBeGreaterThanB,
-            "expect_column_values_to_be_in_set": gx.expectations.ExpectColumnValuesToBeInSet,
-            "expect_column_values_to_match_regex": gx.expectations.ExpectColumnValuesToMatchRegex,
-            "expect_column_values_to_not_match_regex": gx.expectations.ExpectColumnValuesToNotMatchRegex,
-            "expect_column_values_to_match_regex_list": gx.expectations.ExpectColumnValuesToMatchRegexList,
-            "expect_column_values_to_not_match_regex_list": gx.expectations.ExpectColumnValuesToNotMatchRegexList,
-            "expect_column_values_to_be_unique": gx.expectations.ExpectColumnValuesToBeUnique,
-            "expect_column_values_to_not_be_null": gx.expectations.ExpectColumnValuesToNotBeNull,
-            "expect_column_values_to_be_null": gx.expectations.ExpectColumnValuesToBeNull,
-            "expect_column_values_to_match_json_schema": gx.expectations.ExpectColumnValuesToMatchJsonSchema,
-            "expect_column_values_to_be_of_type": gx.expectations.ExpectColumnValuesToBeOfType,
-            "expect_column_values_to_be_in_type_list": gx.expectations.ExpectColumnValuesToBeInTypeList,
-            "expect_column_pair_values_to_be_equal": gx.expectations.ExpectColumnPairValuesToBeEqual,
-            "expect_column_pair_values_to_be_in_set": gx.expectations.ExpectColumnPairValuesToBeInSet,
-            "expect_table_row_count_to_be_between": gx.expectations.ExpectTableRowCountToBeBetween,
-            "expect_table_row_count_to_equal": gx.expectations.ExpectTableRowCountToEqual,
-            "expect_table_column_count_to_be_between": gx.expectations.ExpectTableColumnCountToBeBetween,
-            "expect_table_column_count_to_equal": gx.expectations.ExpectTableColumnCountToEqual,
-            "expect_table_columns_to_match_ordered_list": gx.expectations.ExpectTableColumnsToMatchOrderedList,
-            "expect_table_columns_to_match_set": gx.expectations.ExpectTableColumnsToMatchSet,
-            "expect_column_kl_divergence_to_be_less_than": gx.expectations.ExpectColumnKLDivergenceToBeLessThan,
-            "expect_column_max_to_be_between": gx.expectations.ExpectColumnMaxToBeBetween,
-            "expect_column_mean_to_be_between": gx.expectations.ExpectColumnMeanToBeBetween,
-            "expect_column_median_to_be_between": gx.expectations.ExpectColumnMedianToBeBetween,
-            "expect_column_most_common_value_to_be_in_set": gx.expectations.ExpectColumnMostCommonValueToBeInSet,
-            "expect_column_stdev_to_be_between": gx.expectations.ExpectColumnStdevToBeBetween,
-            "expect_column_min_to_be_between": gx.expectations.ExpectColumnMinToBeBetween,
-            "expect_column_values_to_not_be_in_set": gx.expectations.ExpectColumnValuesToNotBeInSet,
-        }
-
-        for id in self.validation_config:
-            for topic, attributes in self.validation_config[id].items():
-                suite_name = f"{id}_{topic}_expectation_suite"
-                suite = gx.ExpectationSuite(name=suite_name)
-                self.suites[suite_name] = self.context.suites.add(suite)
-
-                for attribute, expectations in attributes.items():
-                    for expectation in expectations:
-                        rule = expectation['rule']
-                        params = expectation['params']
-        
-                        expectation_class = expectation_mapping.get(rule)
-                        if expectation_class:
-                
-                            expectation_obj = expectation_class(**params)
-            
-                            suite.add_expectation(expectation_obj)
+    def _plan(self, generation: _Generation, config_name: str) -> Optional[SuitePlan]:
+        """The plan of `config_name` in `generation`, built on first use; None if no
+        validation config defines it."""
+        plan = generation.plans.get(config_name)
+        if plan is not None or config_name not in generation.sources:
+            return plan
+        with generation.lock(config_name):
+            plan = generation.plans.get(config_name)
+            if plan is None:
+                t0 = time.perf_counter()
+                plan = self._build_plan(generation, config_name)
+                generation.plans[config_name] = plan
+                if generation is self._live:
+                    log.info("↻ Built validation plan '%s' on first use in %.2f s",
+                             config_name, time.perf_counter() - t0)
+        return plan
+
+    def _build_plan(self, generation: _Generation, config_name: str) -> SuitePlan:
+        id, topic, attributes = generation.sources[config_name]
+        expectation_mapping = expectation_classes()
+        # one suite per result format; streaming rules are evaluated by StreamingSuite
+        plan = SuitePlan(id, topic, attributes, known=expectation_mapping.__contains__,
+                         generation=generation.number, parallel=generation.parallel.get(config_name))
+        for key, expectations in plan.entries.items():
+            suite_name = plan.suite_name(key)
+            suite = self.context.suites.add(gx.ExpectationSuite(name=suite_name))
+            generation.suites[suite_name] = suite
 
+            for rule_id, expectation in expectations:
+                rule = expectation['rule']
+                params = expectation['params']
 
-    def _create_validation_definitions(self):
+                expectation_class = expectation_mapping[rule]
+                # the id travels with every result, see data_correction.rule_index
+                expectation_obj = expectation_class(**params, meta={"rule_id": rule_id})
+                suite.add_expectation(expectation_obj)
 
-        for suite_name, suite in self.suites.items():
-            definition_name = f"{suite_name.removesuffix("_expectation_suite")}_validation_definition"
+            # link the data and the suite
+            definition_name = plan.definition_name(key)
             validation_definition = gx.ValidationDefinition(
                 data=self.batch_definition,
                 suite=suite,
                 name=definition_name
             )
-            self.validation_definitions[definition_name] = self.context.validation_definitions.add(validation_definition)
+            added = self.context.validation_definitions.add(validation_definition)
+            generation.definitions[definition_name] = added
+            plan.definitions[key] = added
+        return plan
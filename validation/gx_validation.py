@@ -1,41 +1,66 @@
 # SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
 # SPDX-License-Identifier: Apache-2.0
 
-import great_expectations as gx
+import threading
+from typing import Callable, Dict, Optional
+
 import pandas as pd
-from utils.utils import topic_url_to_name
-from datetime import datetime
-import great_expectations as gx
+from monitoring.log import get_logger
+from utils.lazy import lazy_import
+from .suite_plan import SuitePlan
+
+log = get_logger(__name__)
+
+gx = lazy_import("great_expectations")
+
+# Great Expectations setup – created on first use (or handed over by GXInitializer),
+# never at import time.
+_context = None
+_context_lock = threading.Lock()
+_plans: Dict[str, SuitePlan] = {}
+_resolve: Optional[Callable[[str], Optional[SuitePlan]]] = None
 
 
-from urllib3 import Retry
+def use_context(context, plans: Optional[Dict[str, SuitePlan]] = None,
+                resolve: Optional[Callable[[str], Optional[SuitePlan]]] = None) -> None:
+    """Validate against an existing context (the one GXInitializer built the suites in).
 
-# Great Expectations setup
-context = gx.get_context(mode='file', project_root_dir='./validation')  # Or use EphemeralDataContext if you don't want to use great_expectations.yml
+    `resolve` builds the plan of a config name that is not in `plans` yet."""
+    global _context, _plans, _resolve
+    _context = context
+    _plans = plans if plans is not None else {}
+    _resolve = resolve
+
+
+def get_context():
+    global _context
+    if _context is None:
+        with _context_lock:
+            if _context is None:
+                _context = gx.get_context(mode='file', project_root_dir='./validation')  # Or use EphemeralDataContext if you don't want to use great_expectations.yml
+    return _context
 
 
 def validate_batch(df: pd.DataFrame, config_name):
+    plan = _plans.get(config_name)
+    if plan is None and _resolve is not None:
+        plan = _resolve(config_name)
+    if plan is not None:
+        # one run per result format, merged back into rule order
+        return plan.run(df)
+
     batch_parameters = {"dataframe": df}
-    
+
     # Creating a Validation Definition
     definition_name = f"{config_name}_validation_definition"
-    
+
     try:
-        validation_definition = context.validation_definitions.get(definition_name)
-    except Exception: 
-        print(f'Error: {definition_name} does not exist!')
+        validation_definition = get_context().validation_definitions.get(definition_name)
+    except Exception:
+        log.error("Error: %s does not exist!", definition_name)
         return None  # Return early if definition does not exist
-        
+
     # Run the validation definition with the batch parameters
     validation_result = validation_definition.run(batch_parameters=batch_parameters, result_format="COMPLETE")
-    
-    return validation_result
-
-    
 
-    
-    
-    
-    
-    
-    
+    return validation_result
@@ -0,0 +1,192 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Parallel suite evaluation
+=========================
+
+A wide topic (dozens of columns, e.g. the flattened ARSO weather data)
+validates every rule one after another in a single GX run.  With
+`"parallel_validation"` on the topic its rules are split into
+column‑disjoint groups – rules sharing a column (a pair rule joins two
+columns) always end up in the same group – and the groups are validated
+at the same time:
+
+    thread    in a thread of this process; enough for rules whose
+              kernels are vectorised NumPy/pandas operations that
+              release the GIL (ranges, nulls, sets, pairs, aggregates)
+    process   in a worker process with its own GX context, which gets
+              only the columns of its group; for rules evaluated value
+              by value in Python (regex, JSON schema, types, uniqueness)
+    auto      per group: `process` if it holds such a rule, else `thread`
+
+    "weather": { ..., "parallel_validation": { "workers": 4, "mode": "auto" } }
+
+Table rules (row or column counts, column sets) see the whole frame and
+stay in the first group.  The results of all groups are merged into one
+result in config order, so correction does not see a difference.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from monitoring.log import get_logger
+
+log = get_logger(__name__)
+
+MODES = ("auto", "thread", "process")
+
+# evaluated per value in Python: they hold the GIL for the whole run
+PYTHON_KERNELS = frozenset({
+    "expect_column_values_to_match_regex",
+    "expect_column_values_to_not_match_regex",
+    "expect_column_values_to_match_regex_list",
+    "expect_column_values_to_not_match_regex_list",
+    "expect_column_values_to_match_json_schema",
+    "expect_column_values_to_be_of_type",
+    "expect_column_values_to_be_in_type_list",
+    "expect_column_values_to_be_unique",
+})
+
+_COLUMN_PARAMS = ("column", "column_A", "column_B")
+
+
+def columns_of(entry: Mapping[str, Any]) -> Optional[Tuple[str, ...]]:
+    """Columns a rule reads, or None for a table rule (it needs the whole frame)."""
+    params = entry.get("params", {})
+    columns = [params[key] for key in _COLUMN_PARAMS if key in params]
+    columns += list(params.get("column_list", ()))
+    return tuple(columns) if columns else None
+
+
+def column_groups(entries: Sequence[Tuple[str, Mapping[str, Any]]], groups: int
+                  ) -> List[List[Tuple[str, Mapping[str, Any]]]]:
+    """Split `(rule_id, entry)` pairs into at most `groups` column‑disjoint groups of
+    similar size; rules keep their order within a group, table rules go to the first."""
+    parent: Dict[str, str] = {}
+
+    def find(column: str) -> str:
+        while parent.setdefault(column, column) != column:
+            parent[column] = parent[parent[column]]
+            column = parent[column]
+        return column
+
+    table: List[Tuple[str, Mapping[str, Any]]] = []
+    for item in entries:
+        columns = columns_of(item[1])
+        if columns is None:
+            table.append(item)
+            continue
+        for column in columns[1:]:
+            parent[find(column)] = find(columns[0])
+
+    components: Dict[str, List[Tuple[str, Mapping[str, Any]]]] = {}
+    for item in entries:
+        columns = columns_of(item[1])
+        if columns is not None:
+            components.setdefault(find(columns[0]), []).append(item)
+
+    # largest first onto the smallest group
+    bins: List[List[Tuple[str, Mapping[str, Any]]]] = [list(table)] + [[] for _ in range(max(1, groups) - 1)]
+    for component in sorted(components.values(), key=len, reverse=True):
+        min(bins, key=len).extend(component)
+    order = {rid: position for position, (rid, _entry) in enumerate(entries)}
+    return [sorted(group, key=lambda item: order[item[0]]) for group in bins if group]
+
+
+def kind_of(entries: Sequence[Tuple[str, Mapping[str, Any]]], mode: str) -> str:
+    if mode != "auto":
+        return mode
+    return "process" if any(entry.get("rule") in PYTHON_KERNELS for _rid, entry in entries) else "thread"
+
+
+# ---------------------------------------------------------------------- #
+#  executors (shared by all topics)
+# ---------------------------------------------------------------------- #
+_executors: Dict[Tuple[str, int], Executor] = {}
+_executors_lock = threading.Lock()
+
+
+def executor(kind: str, workers: int) -> Executor:
+    with _executors_lock:
+        pool = _executors.get((kind, workers))
+        if pool is None:
+            if kind == "process":
+                # spawned, not forked: the parent runs MQTT and scheduler threads
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gx-group")
+            _executors[(kind, workers)] = pool
+    return pool
+
+
+# ---------------------------------------------------------------------- #
+#  worker processes
+# ---------------------------------------------------------------------- #
+_worker_context = None
+_worker_definitions: Dict[str, Any] = {}                 # suite name → definition
+_worker_generations: Dict[str, Dict[int, str]] = {}      # plan slot → generation → suite name
+KEEP_GENERATIONS = 2        # the live one and the one before, as GXInitializer keeps them
+
+
+def run_in_process(suite_name: str, entries: Sequence[Tuple[str, Mapping[str, Any]]],
+                   result_format: Any, df: pd.DataFrame, slot: Optional[str] = None,
+                   generation: int = 0) -> Dict[str, Any]:
+    """Validate `df` against a suite built (once per worker) from `entries`; returns
+    the result as a plain dict.  `slot` names the suite independent of its generation:
+    once a newer generation of it arrives, the older ones are dropped from the worker."""
+    global _worker_context
+    from .gx_init import expectation_classes
+    import great_expectations as gx
+
+    definition = _worker_definitions.get(suite_name)
+    if definition is None:
+        if _worker_context is None:
+            _worker_context = gx.get_context(mode="ephemeral")
+            (_worker_context.data_sources.add_pandas("pandas-data-source")
+             .add_dataframe_asset("mqtt-data-asset").add_batch_definition_whole_dataframe("mqtt-batch"))
+        batch = _worker_context.data_sources.get("pandas-data-source").get_asset("mqtt-data-asset") \
+            .get_batch_definition("mqtt-batch")
+        classes = expectation_classes()
+        suite = _worker_context.suites.add(gx.ExpectationSuite(name=suite_name))
+        for rule_id, entry in entries:
+            suite.add_expectation(classes[entry["rule"]](**entry["params"], meta={"rule_id": rule_id}))
+        definition = _worker_definitions[suite_name] = _worker_context.validation_definitions.add(
+            gx.ValidationDefinition(data=batch, suite=suite, name=f"{suite_name}_definition"))
+        if slot is not None:
+            _retire(slot, generation, suite_name)
+    result = definition.run(batch_parameters={"dataframe": df}, result_format=result_format)
+    return result.to_json_dict()
+
+
+def _retire(slot: str, generation: int, suite_name: str) -> None:
+    """Record `suite_name` as `generation` of `slot`; drop all but the newest generations."""
+    generations = _worker_generations.setdefault(slot, {})
+    generations[generation] = suite_name
+    for old in sorted(generations)[:-KEEP_GENERATIONS]:
+        name = generations.pop(old)
+        _worker_definitions.pop(name, None)
+        try:
+            _worker_context.validation_definitions.delete(f"{name}_definition")
+            _worker_context.suites.delete(name)
+        except Exception as e:
+            log.warning("⚠️  Could not remove superseded worker suite '%s': %s", name, e)
+
+
+class MergedResult(dict):
+    """The results of several runs as one; readable like a GX result (`["results"]`,
+    `.results`) and updatable by `StreamingSuite.merge`."""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self[name] = value
@@ -0,0 +1,411 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Streaming aggregate expectations
+================================
+
+Aggregate rules (mean, stdev, median, KL divergence, most common value)
+evaluated per batch are noisy for small batches and costly to recompute
+over large ones.  A rule marked `"evaluation": "streaming"` is taken out
+of the Great‑Expectations suite and evaluated here instead, against a
+window of per‑batch summaries that is updated incrementally:
+
+    Moments          – count / mean / M2 (Welford, Chan merge); mean, stdev
+    QuantileSketch   – log‑bucketed sketch with relative accuracy `alpha`
+                       (DDSketch); median
+    Histogram        – counts over the rule's partition bins; KL divergence
+    ValueCounts      – heavy‑hitter counter, exact up to `capacity`
+                       distinct values; most common value
+
+All four summaries can be merged and subtracted, so a window is a running
+total: a batch is summarised once (O(batch)), added to the total, and the
+batch that falls out of a sliding window is subtracted again.  Evaluating
+the rule reads the total only, independent of batch and window size.
+
+Window settings on the rule::
+
+    "window": {"type": "sliding", "batches": 20, "min_rows": 50}    (default: sliding, 20 batches)
+    "window": {"type": "tumbling", "rows": 1000, "min_rows": 100}
+
+Until a window holds `min_rows` values the rule reports success.  A failing
+rule lists the last row of the batch as unexpected, so `RaiseAlarm` emits
+one alarm per failing batch, stamped with that row's time.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from data_correction.rule_index import iter_rules
+from monitoring.log import get_logger
+
+log = get_logger(__name__)
+
+
+# ---------------------------------------------------------------------- #
+#  mergeable summaries
+# ---------------------------------------------------------------------- #
+class Moments:
+    """Count, mean and sum of squared deviations; merge / remove in O(1)."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0) -> None:
+        self.n, self.mean, self.m2 = n, mean, m2
+
+    @classmethod
+    def of(cls, values: np.ndarray) -> "Moments":
+        if not len(values):
+            return cls()
+        mean = float(values.mean())
+        return cls(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    def merge(self, other: "Moments") -> None:
+        if not other.n:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+
+    def remove(self, other: "Moments") -> None:
+        n = self.n - other.n
+        if n <= 0:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        mean = (self.n * self.mean - other.n * other.mean) / n
+        delta = other.mean - mean
+        self.m2 = max(self.m2 - other.m2 - delta * delta * n * other.n / self.n, 0.0)
+        self.n, self.mean = n, mean
+
+    def stdev(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else float("nan")
+
+
+def _add_counts(into: Dict[Any, int], other: Mapping[Any, int], sign: int = 1) -> None:
+    for key, count in other.items():
+        left = into.get(key, 0) + sign * count
+        if left > 0:
+            into[key] = left
+        else:
+            into.pop(key, None)
+
+
+class QuantileSketch:
+    """Values bucketed by ⌈log_γ |x|⌉ with γ = (1+α)/(1−α): quantiles within relative error α."""
+
+    __slots__ = ("alpha", "_log_gamma", "pos", "neg", "zeros", "n")
+
+    def __init__(self, alpha: float = 0.01) -> None:
+        self.alpha = alpha
+        self._log_gamma = math.log((1 + alpha) / (1 - alpha))
+        self.pos: Dict[int, int] = {}
+        self.neg: Dict[int, int] = {}
+        self.zeros = 0
+        self.n = 0
+
+    def _buckets(self, magnitudes: np.ndarray) -> Dict[int, int]:
+        if not len(magnitudes):
+            return {}
+        keys, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64), return_counts=True)
+        return dict(zip(keys.tolist(), counts.tolist()))
+
+    @classmethod
+    def of(cls, values: np.ndarray, alpha: float = 0.01) -> "QuantileSketch":
+        sketch = cls(alpha)
+        sketch.pos = sketch._buckets(values[values > 0])
+        sketch.neg = sketch._buckets(-values[values < 0])
+        sketch.zeros = int((values == 0).sum())
+        sketch.n = len(values)
+        return sketch
+
+    def merge(self, other: "QuantileSketch") -> None:
+        _add_counts(self.pos, other.pos)
+        _add_counts(self.neg, other.neg)
+        self.zeros += other.zeros
+        self.n += other.n
+
+    def remove(self, other: "QuantileSketch") -> None:
+        _add_counts(self.pos, other.pos, -1)
+        _add_counts(self.neg, other.neg, -1)
+        self.zeros -= other.zeros
+        self.n -= other.n
+
+    def _value(self, key: int) -> float:
+        gamma = math.exp(self._log_gamma)
+        return 2 * gamma ** key / (gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        if not self.n:
+            return float("nan")
+        rank = q * (self.n - 1)
+        seen = 0
+        for key in sorted(self.neg, reverse=True):          # most negative first
+            seen += self.neg[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.pos):
+            seen += self.pos[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.pos)) if self.pos else 0.0
+
+
+class Histogram:
+    """Counts over fixed bin edges, plus one bucket below and one above them."""
+
+    __slots__ = ("edges", "counts", "n")
+
+    def __init__(self, edges: Sequence[float]) -> None:
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.n = 0
+
+    @classmethod
+    def of(cls, values: np.ndarray, edges: Sequence[float]) -> "Histogram":
+        hist = cls(edges)
+        slots = np.searchsorted(hist.edges, values, side="right")
+        slots[values == hist.edges[-1]] = len(hist.edges) - 1     # last bin is closed
+        hist.counts = np.bincount(slots, minlength=len(hist.edges) + 1)
+        hist.n = len(values)
+        return hist
+
+    def merge(self, other: "Histogram") -> None:
+        self.counts += other.counts
+        self.n += other.n
+
+    def remove(self, other: "Histogram") -> None:
+        self.counts -= other.counts
+        self.n -= other.n
+
+
+class ValueCounts:
+    """Occurrences per value; beyond `capacity` distinct values the rarest are dropped."""
+
+    __slots__ = ("capacity", "counts", "n")
+
+    def __init__(self, capacity: int = 1000) -> None:
+        self.capacity = capacity
+        self.counts: Dict[Any, int] = {}
+        self.n = 0
+
+    @classmethod
+    def of(cls, values: pd.Series, capacity: int = 1000) -> "ValueCounts":
+        summary = cls(capacity)
+        summary.counts = values.value_counts(dropna=True).to_dict()
+        summary.n = int(sum(summary.counts.values()))
+        return summary
+
+    def merge(self, other: "ValueCounts") -> None:
+        _add_counts(self.counts, other.counts)
+        self.n += other.n
+        if len(self.counts) > self.capacity:
+            keep = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:self.capacity]
+            self.counts = dict(keep)
+
+    def remove(self, other: "ValueCounts") -> None:
+        _add_counts(self.counts, other.counts, -1)
+        self.n -= other.n
+
+    def modes(self) -> List[Any]:
+        if not self.counts:
+            return []
+        top = max(self.counts.values())
+        return [value for value, count in self.counts.items() if count == top]
+
+
+# ---------------------------------------------------------------------- #
+#  windows
+# ---------------------------------------------------------------------- #
+class Window:
+    """Running total over the last `batches` summaries (sliding) or until `rows` values (tumbling)."""
+
+    def __init__(self, empty: Callable[[], Any], kind: str = "sliding",
+                 batches: int = 20, rows: int = 1000) -> None:
+        if kind not in ("sliding", "tumbling"):
+            raise ValueError(f"Unknown window type '{kind}' (use 'sliding' or 'tumbling')")
+        self.kind = kind
+        self._empty = empty
+        self._batches = max(1, batches)
+        self._rows = max(1, rows)
+        self._panes: deque = deque()
+        self._removed = 0
+        self._closed = False
+        self.total = empty()
+
+    def push(self, pane: Any) -> Any:
+        if self.kind == "tumbling":
+            if self._closed:
+                self.total, self._closed = self._empty(), False
+            self.total.merge(pane)
+            self._closed = self.total.n >= self._rows
+            return self.total
+
+        self._panes.append(pane)
+        self.total.merge(pane)
+        if len(self._panes) > self._batches:
+            self.total.remove(self._panes.popleft())
+            self._removed += 1
+            if self._removed % self._batches == 0:
+                # subtraction accumulates float error (and heavy-hitter pruning
+                # loses counts) – rebuild once per window length, O(1) amortised
+                self.total = self._empty()
+                for kept in self._panes:
+                    self.total.merge(kept)
+        return self.total
+
+
+# ---------------------------------------------------------------------- #
+#  rules
+# ---------------------------------------------------------------------- #
+def _numeric(series: pd.Series) -> np.ndarray:
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return values[~np.isnan(values)]
+
+
+def _between(value: float, params: Mapping[str, Any]) -> bool:
+    if value is None or math.isnan(value):
+        return False
+    low, high = params.get("min_value"), params.get("max_value")
+    if low is not None and (value <= low if params.get("strict_min") else value < low):
+        return False
+    if high is not None and (value >= high if params.get("strict_max") else value > high):
+        return False
+    return True
+
+
+def _kl_divergence(hist: Histogram, partition: Mapping[str, Any]) -> float:
+    weights = np.asarray(partition["weights"], dtype=float)
+    tails = partition.get("tail_weights")
+    expected = np.concatenate(([tails[0]], weights, [tails[1]])) if tails else np.concatenate(([0.0], weights, [0.0]))
+    if not hist.n:
+        return float("nan")
+    observed = hist.counts / hist.n
+    mask = observed > 0
+    if np.any(expected[mask] <= 0):
+        return float("inf")
+    return float(np.sum(observed[mask] * np.log(observed[mask] / expected[mask])))
+
+
+def _most_common_ok(modes: List[Any], params: Mapping[str, Any]) -> bool:
+    value_set = set(params.get("value_set") or ())
+    if params.get("ties_okay"):
+        return any(mode in value_set for mode in modes)
+    return len(modes) == 1 and modes[0] in value_set
+
+
+class _Spec:
+    __slots__ = ("empty", "summarize", "observe", "check")
+
+    def __init__(self, empty, summarize, observe, check) -> None:
+        self.empty, self.summarize, self.observe, self.check = empty, summarize, observe, check
+
+
+def _spec(rule: str, params: Mapping[str, Any], opts: Mapping[str, Any]) -> _Spec:
+    if rule == "expect_column_mean_to_be_between":
+        return _Spec(Moments, lambda s: Moments.of(_numeric(s)), lambda t: t.mean if t.n else float("nan"),
+                     lambda v: _between(v, params))
+    if rule == "expect_column_stdev_to_be_between":
+        return _Spec(Moments, lambda s: Moments.of(_numeric(s)), Moments.stdev, lambda v: _between(v, params))
+    if rule == "expect_column_median_to_be_between":
+        alpha = float(opts.get("alpha", 0.01))
+        return _Spec(lambda: QuantileSketch(alpha), lambda s: QuantileSketch.of(_numeric(s), alpha),
+                     lambda t: t.quantile(0.5), lambda v: _between(v, params))
+    if rule == "expect_column_kl_divergence_to_be_less_than":
+        partition = params["partition_object"]
+        edges = partition["bins"]
+        threshold = params.get("threshold")
+        return _Spec(lambda: Histogram(edges), lambda s: Histogram.of(_numeric(s), edges),
+                     lambda t: _kl_divergence(t, partition),
+                     lambda v: threshold is None or (not math.isnan(v) and v < threshold))
+    if rule == "expect_column_most_common_value_to_be_in_set":
+        capacity = int(opts.get("capacity", 1000))
+        return _Spec(lambda: ValueCounts(capacity), lambda s: ValueCounts.of(s, capacity),
+                     ValueCounts.modes, lambda v: _most_common_ok(v, params))
+    raise ValueError(f"Rule '{rule}' has no streaming evaluation")
+
+
+STREAMING_RULES = frozenset({
+    "expect_column_mean_to_be_between",
+    "expect_column_stdev_to_be_between",
+    "expect_column_median_to_be_between",
+    "expect_column_kl_divergence_to_be_less_than",
+    "expect_column_most_common_value_to_be_in_set",
+})
+
+
+def is_streaming(entry: Mapping[str, Any]) -> bool:
+    """True for a rule entry that is evaluated here instead of by Great Expectations."""
+    return entry.get("evaluation") == "streaming" and entry.get("rule") in STREAMING_RULES
+
+
+class StreamingExpectation:
+    """One aggregate rule over a window of batches; returns GX‑shaped result dicts."""
+
+    def __init__(self, rule: str, params: Mapping[str, Any], window: Optional[Mapping[str, Any]] = None,
+                 rule_id: Optional[str] = None) -> None:
+        opts = dict(window or {})
+        self.rule = rule
+        self.params = dict(params)
+        self.column = params["column"]
+        self._spec = _spec(rule, self.params, opts)
+        self._min_rows = int(opts.get("min_rows", 1))
+        self._window = Window(self._spec.empty, kind=opts.get("type", "sliding"),
+                              batches=int(opts.get("batches", 20)), rows=int(opts.get("rows", 1000)))
+        self._meta = {"evaluation": "streaming", "window": self._window.kind, "rule_id": rule_id}
+
+    def evaluate(self, df: pd.DataFrame) -> Dict[str, Any]:
+        series = df[self.column] if self.column in df.columns else pd.Series([], dtype=float)
+        total = self._window.push(self._spec.summarize(series))
+        observed = self._spec.observe(total) if total.n else None
+        success = total.n < self._min_rows or self._spec.check(observed)
+        unexpected = [] if success or not len(df.index) else [df.index[-1]]
+        return {
+            "success": bool(success),
+            "expectation_config": {"type": self.rule, "kwargs": self.params, "meta": self._meta},
+            "result": {"observed_value": observed, "window_rows": total.n,
+                       "unexpected_index_list": unexpected},
+            "exception_info": {"raised_exception": False, "exception_message": None, "exception_traceback": None},
+        }
+
+
+# ---------------------------------------------------------------------- #
+#  per-topic suite
+# ---------------------------------------------------------------------- #
+class StreamingSuite:
+    """The streaming rules of one topic; their results are appended to the GX results."""
+
+    def __init__(self, rules: Optional[Mapping[str, Sequence[Mapping[str, Any]]]], topic: str = "") -> None:
+        self._expectations: List[StreamingExpectation] = []
+        for rid, column, entry in iter_rules(topic, rules):
+            if is_streaming(entry):
+                self._expectations.append(
+                    StreamingExpectation(entry["rule"], entry["params"], entry.get("window"), rule_id=rid))
+            elif entry.get("evaluation") == "streaming":
+                log.warning("⚠️  Rule '%s' on '%s' has no streaming evaluation; validated per batch",
+                            entry.get("rule"), column)
+        self._lock = threading.Lock()       # batches of a topic may be flushed by different threads
+
+    def __bool__(self) -> bool:
+        return bool(self._expectations)
+
+    def merge(self, validation_result, df: pd.DataFrame):
+        """Evaluate the streaming rules on `df` and add their results to `validation_result`."""
+        if not self._expectations or validation_result is None:
+            return validation_result
+        with self._lock:
+            streamed = [expectation.evaluate(df) for expectation in self._expectations]
+        merged = list(validation_result["results"]) + streamed
+        validation_result.results = merged
+        validation_result.success = all(res["success"] for res in merged)
+        return validation_result
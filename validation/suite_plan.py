@@ -0,0 +1,180 @@
+# SPDX-FileCopyrightText: 2025 - 2025 Software GmbH, Darmstadt, Germany and/or its subsidiaries and/or its affiliates
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Suite plans
+===========
+
+How much result data GX materialises is set per run, not per
+expectation.  `COMPLETE` builds unexpected value lists, index lists and
+an index query string for every rule, although only rules with a
+`handler` (a correction strategy or `RaiseAlarm`) read the indices.
+
+A `SuitePlan` therefore compiles a topic's rules into one suite per
+result format and runs each with its own format:
+
+    INDEX     rules with a handler – `unexpected_index_list` only
+              (no value lists, no partial lists, no index query)
+    SUMMARY   rules without a handler – counts and a short sample
+
+A rule can pin any GX format with `"result_format": "COMPLETE"`,
+`"SUMMARY"`, `"BASIC"` or `"BOOLEAN_ONLY"`.  The results of all runs are
+returned as one; each carries its rule id in `meta`, so `CorrectionEngine`
+does not depend on their order.
+
+With `"parallel_validation"` on the topic (see `parallel`) the rules are
+first split into column‑disjoint groups, each group into its formats
+(`…_index_p1_expectation_suite`), and the runs go to a thread or process
+pool; their results are merged in config order.
+
+Plans compiled by a reload carry a generation tag in their suite names
+(`…_index_g3_expectation_suite`), so batches still running on the previous
+generation keep valid suites while the next one is added to the context.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from data_correction.rule_index import iter_rules
+from .streaming_aggregates import is_streaming
+from . import parallel as par
+
+RESULT_FORMATS: Dict[str, Any] = {
+    "INDEX": {
+        "result_format": "COMPLETE",
+        "return_unexpected_index_query": False,
+        "exclude_unexpected_values": True,
+        "partial_unexpected_count": 0,
+    },
+    "COMPLETE": "COMPLETE",
+    "SUMMARY": "SUMMARY",
+    "BASIC": "BASIC",
+    "BOOLEAN_ONLY": "BOOLEAN_ONLY",
+}
+
+
+def result_format_of(entry: Mapping[str, Any]) -> str:
+    """Key into RESULT_FORMATS for one rule entry of `config/validations/*.json`."""
+    pinned = entry.get("result_format")
+    if pinned:
+        pinned = str(pinned).upper()
+        if pinned not in RESULT_FORMATS:
+            raise ValueError(f"Unknown result_format '{entry['result_format']}' for rule '{entry.get('rule')}'")
+        return pinned
+    return "INDEX" if entry.get("handler") else "SUMMARY"
+
+
+class SuitePlan:
+    """The GX suites of one topic, split by result format, and how to run them."""
+
+    def __init__(self, config_id: str, topic: str,
+                 rules: Optional[Mapping[str, Sequence[Mapping[str, Any]]]],
+                 known: Callable[[str], bool] = lambda rule: True, generation: int = 0,
+                 parallel: Optional[Mapping[str, Any]] = None) -> None:
+        self.config_name = f"{config_id}_{topic}"
+        self.generation = generation
+        selected = [(rid, entry) for rid, _column, entry in iter_rules(topic, rules)
+                    if not is_streaming(entry) and known(entry.get("rule"))]
+        self.workers = int((parallel or {}).get("workers", 1))
+        self.mode = (parallel or {}).get("mode", "auto")
+        if self.mode not in par.MODES:
+            raise ValueError(f"Unknown parallel_validation mode '{self.mode}' for topic '{topic}'")
+
+        # suite key → [(rule_id, entry)]; the key is the result format, or `<format>_P<group>`
+        self.entries: Dict[str, List[Tuple[str, Mapping[str, Any]]]] = {}
+        self.formats: Dict[str, str] = {}              # suite key → result format
+        self.kinds: Dict[str, str] = {}                # suite key → "thread" / "process" (parallel only)
+        self.columns: Dict[str, Optional[List[str]]] = {}   # suite key → columns its group reads
+        groups = par.column_groups(selected, self.workers) if self.workers > 1 else [selected]
+        for number, group in enumerate(groups):
+            kind = par.kind_of(group, self.mode)
+            for rid, entry in group:
+                fmt = result_format_of(entry)
+                key = f"{fmt}_P{number}" if self.workers > 1 else fmt
+                self.entries.setdefault(key, []).append((rid, entry))
+                self.formats[key] = fmt
+                self.kinds[key] = kind
+        for key, entries in self.entries.items():
+            read = [par.columns_of(entry) for _rid, entry in entries]
+            self.columns[key] = None if None in read else list(dict.fromkeys(c for cs in read for c in cs))
+        if not self.entries:
+            self.entries["SUMMARY"] = []               # an empty suite still yields a result object
+            self.formats["SUMMARY"] = "SUMMARY"
+        self._order = {rid: position for position, (rid, _entry) in enumerate(selected)}
+        self.definitions: Dict[str, Any] = {}          # suite key → ValidationDefinition, set by GXInitializer
+
+    def slot(self, key: str) -> str:
+        """The suite's name without the generation tag."""
+        return f"{self.config_name}_{key.lower()}"
+
+    def _stem(self, key: str) -> str:
+        tag = f"_g{self.generation}" if self.generation else ""
+        return f"{self.slot(key)}{tag}"
+
+    def suite_name(self, key: str) -> str:
+        return f"{self._stem(key)}_expectation_suite"
+
+    def definition_name(self, key: str) -> str:
+        return f"{self._stem(key)}_validation_definition"
+
+    def run(self, df: pd.DataFrame):
+        """Validate `df` against every suite and return one result holding all rules
+        (results carry their rule_id, so their order does not matter)."""
+        if self.workers > 1 and len(self.definitions) > 1:
+            return self._run_parallel(df)
+        batch_parameters = {"dataframe": df}
+        runs = [definition.run(batch_parameters=batch_parameters, result_format=RESULT_FORMATS[self.formats[key]])
+                for key, definition in self.definitions.items()]
+        if len(runs) == 1:
+            return runs[0]
+
+        merged = [res for run in runs for res in run["results"]]
+        result = runs[0]
+        result.results = merged
+        result.success = all(res["success"] for res in merged)
+        successful = sum(1 for res in merged if res["success"])
+        result.statistics = {
+            **(result.statistics or {}),
+            "evaluated_expectations": len(merged),
+            "successful_expectations": successful,
+            "unsuccessful_expectations": len(merged) - successful,
+            "success_percent": 100.0 * successful / len(merged) if merged else None,
+        }
+        return result
+
+    def _run_parallel(self, df: pd.DataFrame) -> "par.MergedResult":
+        futures = []
+        for key, definition in self.definitions.items():
+            result_format = RESULT_FORMATS[self.formats[key]]
+            if self.kinds[key] == "process":
+                columns = self.columns[key]
+                frame = df if columns is None else df[[c for c in columns if c in df.columns]]
+                futures.append(par.executor("process", self.workers).submit(
+                    par.run_in_process, self.suite_name(key), self.entries[key], result_format, frame,
+                    self.slot(key), self.generation))
+            else:
+                futures.append(par.executor("thread", self.workers).submit(
+                    definition.run, batch_parameters={"dataframe": df}, result_format=result_format))
+
+        merged = [res for future in futures for res in future.result()["results"]]
+        last = len(self._order)
+        merged.sort(key=lambda res: self._order.get(_rule_id(res), last))
+        successful = sum(1 for res in merged if res["success"])
+        return par.MergedResult(
+            success=successful == len(merged),
+            results=merged,
+            statistics={
+                "evaluated_expectations": len(merged),
+                "successful_expectations": successful,
+                "unsuccessful_expectations": len(merged) - successful,
+                "success_percent": 100.0 * successful / len(merged) if merged else None,
+            },
+        )
+
+
+def _rule_id(result: Mapping[str, Any]) -> Optional[str]:
+    config = result["expectation_config"]
+    meta = config.get("meta") if hasattr(config, "get") else getattr(config, "meta", None)
+    return (meta or {}).get("rule_id")